@@ -0,0 +1,219 @@
+import argparse
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+import numpy as np
+
+from Benchmarks.Scenarios import Scenario, scenarios
+from Path_Algo.Astar import Astar, CompactAstar
+from Path_Algo.Hamiltonian import ExhaustiveSearch, PlannerPool, TourSearch, k_nearest_neighour
+
+logger = logging.getLogger('BENCH')
+
+PLANNERS = ("astar", "compact", "knn", "exhaustive", "tour")
+
+# metric -> True if higher is better, used by compare
+METRICS = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'expansions_per_s': True,
+    'peak_kib': False,
+    'cost_mean': False,
+    'unreachable': False,
+}
+
+
+def leg_cost(path : list) -> float :
+    return path[-1].g if path else None
+
+
+# run one case, returns (seconds, expansions or None, cost or None, tracemalloc peak in KiB or None)
+def timed(case : Callable[[], tuple], memory : bool) -> tuple :
+    if memory :
+        tracemalloc.start()
+    st = time.perf_counter()
+    cost, expansions = case()
+    dt = time.perf_counter() - st
+    peak = None
+    if memory :
+        peak = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return dt, expansions, cost, peak
+
+
+# one case per (layout, obstacle) : a point-to-point search from the start to the viewing pose
+def point_cases(scenario : Scenario, cls : type, lazy : bool = False) -> List[Callable[[], tuple]] :
+    mp = scenario.map()
+
+    # a planner per case : its collision memo would carry the checks of the earlier cases over
+    def case(end) :
+        astar = cls(mp, lazy=lazy)
+
+        def run() :
+            path = astar.search(scenario.start, end)
+            return leg_cost(path), astar.expanded
+        return run
+    return [case(o.to_pos()) for o in mp.obstacles]
+
+
+# one case per layout : the whole tour, unreachable legs make the tour unreachable
+def tour_cases(scenario : Scenario, planner : str, pool : PlannerPool) -> List[Callable[[], tuple]] :
+    def run() :
+        mp = scenario.map()
+        if planner == "knn" :
+            legs = k_nearest_neighour(mp, scenario.start)
+        else :
+            cls = TourSearch if planner == "tour" else ExhaustiveSearch
+            legs = cls(mp, scenario.start, pool=pool).search()[1]
+        if len(legs) != len(mp.obstacles) or not all(legs) :
+            return None, None
+        return sum(leg_cost(leg) for leg in legs), None
+    return [run]
+
+
+def summarise(samples : List[tuple]) -> dict :
+    times = np.array([dt for dt, _, _, _ in samples]) * 1000
+    expansions = [e for _, e, _, _ in samples if e is not None]
+    costs = [c for _, _, c, _ in samples if c is not None]
+    peaks = [p for _, _, _, p in samples if p is not None]
+    searched = sum(dt for dt, e, _, _ in samples if e is not None)
+    return {
+        'runs': len(samples),
+        'mean_ms': float(times.mean()),
+        'p50_ms': float(np.percentile(times, 50)),
+        'p95_ms': float(np.percentile(times, 95)),
+        'p99_ms': float(np.percentile(times, 99)),
+        'expansions': sum(expansions) if expansions else None,
+        'expansions_per_s': sum(expansions) / searched if expansions and searched else None,
+        'peak_kib': max(peaks) if peaks else None,
+        'cost_mean': float(np.mean(costs)) if costs else None,
+        'unreachable': len(samples) - len(costs),
+    }
+
+
+def commit() -> str :
+    try :
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError) :
+        return None
+
+
+def run(args) -> dict :
+    layouts = scenarios(args.seed, args.counts, args.layouts)
+    results = {}
+    pool = PlannerPool(args.workers, lazy=args.lazy) if {"exhaustive", "tour"} & set(args.planners) else None
+    try :
+        for planner in args.planners :
+            samples = []
+            for scenario in layouts :
+                if planner in ("astar", "compact") :
+                    cases = point_cases(scenario, Astar if planner == "astar" else CompactAstar, args.lazy)
+                else :
+                    cases = tour_cases(scenario, planner, pool)
+                for case in cases :
+                    samples.append(timed(case, args.memory))
+                logger.info(f'{planner} {scenario.name} done')
+            results[planner] = summarise(samples)
+            print(f'{planner:>10} ' + ' '.join(f'{k}={_fmt(v)}' for k, v in results[planner].items()))
+    finally :
+        if pool is not None :
+            pool.close()
+
+    return {
+        'meta': {
+            'commit': commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': args.seed,
+            'counts': args.counts,
+            'layouts': args.layouts,
+            'memory': args.memory,
+            'lazy': args.lazy,
+            'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        'scenarios': [s.to_dict() for s in layouts],
+        'results': results,
+    }
+
+
+def _fmt(v) -> str :
+    return f'{v:.2f}' if isinstance(v, float) else str(v)
+
+
+# relative change of every metric from base to new, worse beyond threshold is a regression
+def compare(base : dict, new : dict, threshold : float) -> List[str] :
+    regressions = []
+    if any(base['meta'].get(k) != new['meta'].get(k) for k in ('seed', 'counts', 'layouts')) :
+        print('warning : the two runs used different scenarios')
+    if base['meta'].get('memory') != new['meta'].get('memory') :
+        print('warning : only one run traced memory, its latencies are inflated')
+    print(f"{'planner':>10} {'metric':>17} {'base':>12} {'new':>12} {'change':>8}")
+    for planner, old in base['results'].items() :
+        cur = new['results'].get(planner)
+        if cur is None :
+            continue
+        for metric, higher in METRICS.items() :
+            a, b = old.get(metric), cur.get(metric)
+            if a is None or b is None :
+                continue
+            change = (b - a) / a if a else (0.0 if a == b else float('inf'))
+            worse = change < -threshold if higher else change > threshold
+            flag = '  REGRESSION' if worse else ''
+            print(f'{planner:>10} {metric:>17} {_fmt(float(a)):>12} {_fmt(float(b)):>12} {change:>+8.1%}{flag}')
+            if worse :
+                regressions.append(f'{planner} {metric}')
+    return regressions
+
+
+def main(argv : List[str] = None) -> int :
+    parser = argparse.ArgumentParser(description='Planner benchmarks on seeded random layouts')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    r = sub.add_parser('run', help='run the benchmarks and write the results as JSON')
+    r.add_argument('--seed', type=int, default=0)
+    r.add_argument('--counts', type=int, nargs='+', default=[3, 5, 8], help='obstacle counts')
+    r.add_argument('--layouts', type=int, default=3, help='layouts per obstacle count')
+    r.add_argument('--planners', nargs='+', choices=PLANNERS, default=list(PLANNERS))
+    r.add_argument('--workers', type=int, default=8, help='pool size for the exhaustive and tour searches')
+    r.add_argument('--memory', action='store_true', help='trace peak Python memory per case (slower)')
+    r.add_argument('--lazy', action='store_true', help='lazy collision checking in the A* searches')
+    r.add_argument('--out', default='bench_output.json')
+
+    c = sub.add_parser('compare', help='compare two result files, exit 1 on a regression')
+    c.add_argument('base')
+    c.add_argument('new')
+    c.add_argument('--threshold', type=float, default=0.1, help='relative change tolerated')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.cmd == 'run' :
+        report = run(args)
+        with open(args.out, 'w') as f :
+            json.dump(report, f, indent=2)
+        print(f'Results written to {args.out}')
+        return 0
+
+    with open(args.base) as f :
+        base = json.load(f)
+    with open(args.new) as f :
+        new = json.load(f)
+    regressions = compare(base, new, args.threshold)
+    if regressions :
+        print(f'{len(regressions)} regression(s) : {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__' :
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import random
+from math import pi
+from typing import List, Optional
+
+from Commons.Constants import MAP_HEIGHT, MAP_WIDTH, OBSTACLE_WIDTH
+from Commons.Enums import Direction
+from Commons.Types import Position
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Astar import Astar
+from Path_Algo.Hamiltonian import view_poses
+
+
+START = Position(5, 5, pi/2) # robot start in the bottom left corner, facing north
+START_ZONE = 40 # square kept clear of obstacles around the start
+GRID = 10 # obstacles are placed on a 10 unit grid
+GAP = 10 # minimum free space between two obstacle squares
+REACH_WEIGHT = 3.0 # inflation of the reachability search, it only has to find a path
+
+
+class Scenario :
+    # one reproducible layout : obstacles as (x, y, facing) and the robot start
+
+    def __init__(self, seed : int, layout : List[tuple], start : Position = START) :
+        self.seed = seed
+        self.layout = layout
+        self.start = start
+
+    @property
+    def name(self) -> str :
+        return f'{len(self.layout)}obs-{self.seed}'
+
+    def obstacles(self) -> List[Obstacle] :
+        return [Obstacle(x, y, facing) for x, y, facing in self.layout]
+
+    # a fresh map per run, planners never share obstacle objects
+    def map(self) -> Map :
+        return Map(self.obstacles())
+
+    def to_dict(self) -> dict :
+        return {
+            'seed': self.seed,
+            'start': self.start.getPositionTuple(),
+            'obstacles': [(x, y, facing.name) for x, y, facing in self.layout],
+        }
+
+
+def _overlaps(x : float, y : float, layout : List[tuple]) -> bool :
+    reach = OBSTACLE_WIDTH + GAP
+    return any(abs(x - ox) < reach and abs(y - oy) < reach for ox, oy, _ in layout)
+
+
+# every viewing pose must be a valid robot pose once all the obstacles are placed
+def _viewable(layout : List[tuple]) -> bool :
+    mp = Map([Obstacle(x, y, facing) for x, y, facing in layout])
+    return all(mp.is_valid(o.to_pos()) for o in mp.obstacles)
+
+
+# every obstacle must be reachable from the start : one weighted search to all of them at once. an unreachable
+# one makes it flood every lattice pose the robot can drive to (the start boxed in by an obstacle, a view pose
+# no turn gets into) before the layout is rejected
+def _reachable(layout : List[tuple], start : Position) -> bool :
+    mp = Map([Obstacle(x, y, facing) for x, y, facing in layout])
+    astar = Astar(mp)
+    astar.weight = REACH_WEIGHT
+    return all(astar.search_many(start, [view_poses(mp, o) for o in mp.obstacles]))
+
+
+# n obstacles with random facings, the same (seed, n) always gives the same layout
+def generate(seed : int, n : int, start : Position = START, attempts : int = 2000) -> Scenario :
+    rng = random.Random(f'{seed}:{n}')
+    xs = range(0, int(MAP_WIDTH - OBSTACLE_WIDTH) + 1, GRID)
+    ys = range(0, int(MAP_HEIGHT - OBSTACLE_WIDTH) + 1, GRID)
+    facings = list(Direction)
+
+    for _ in range(attempts) :
+        layout = []
+        for _ in range(100 * n) :
+            if len(layout) == n :
+                break
+            x, y = rng.choice(xs), rng.choice(ys)
+            if x < start.x + START_ZONE and y < start.y + START_ZONE :
+                continue
+            if _overlaps(x, y, layout) :
+                continue
+            layout.append((x, y, rng.choice(facings)))
+        if len(layout) == n and _viewable(layout) and _reachable(layout, start) :
+            return Scenario(seed, layout, start)
+    raise ValueError(f'No layout with {n} viewable and reachable obstacles after {attempts} attempts (seed {seed})')
+
+
+# layouts for every obstacle count, seeds seed .. seed + per_count - 1
+def scenarios(seed : int, counts : List[int], per_count : int, start : Optional[Position] = None) -> List[Scenario] :
+    return [generate(seed + i, n, start or START) for n in counts for i in range(per_count)]
@@ -1 +1,286 @@
-
+import hashlib
+from math import cos, hypot, pi, sin
+from typing import List, Optional
+import numpy as np
+
+from Commons.Constants import (
+    EDGE_ERR,
+    HEIGHT_GRADIENT,
+    MAP_HEIGHT,
+    MAP_WIDTH,
+    OBSTACLE_WIDTH,
+    ROBOT_HEIGHT,
+    ROBOT_WIDTH,
+    SNAP_COORD,
+    WIDTH_GRADIENT,
+    WPS_FL,
+    WPS_FR,
+    WPS_BL,
+    WPS_BR,
+    DIST_FW,
+    DIST_BW,
+)
+from Commons.Enums import Direction, Movement
+from Commons.Types import Position
+from Grid.Obstacles import Obstacle
+from Robot_Movements.Primitives import N_HEADINGS, heading_index, heading_of
+
+
+# the robot pose is its rear-left corner (see Obstacle.to_pos), the body spans
+# ROBOT_HEIGHT along the heading and ROBOT_WIDTH along heading - pi/2
+_HALF_H = HEIGHT_GRADIENT / 2  # buffered half extents used against obstacles
+_HALF_W = WIDTH_GRADIENT / 2
+_HALF_O = OBSTACLE_WIDTH / 2
+
+# distance from the reference point beyond which an obstacle can never touch the robot
+_BODY_REACH = hypot(ROBOT_HEIGHT, ROBOT_WIDTH) + hypot(_HALF_H - ROBOT_HEIGHT/2, _HALF_W - ROBOT_WIDTH/2) + _HALF_O * 2**.5
+
+# box swept by the reference point during a movement, in the robot frame of its start pose :
+# (lateral min, lateral max, forward min, forward max), lateral along heading - pi/2 as in the WPS_* tables
+def _extents(wps) -> tuple :
+    lxs = [0] + [lx for lx, _, _ in wps]
+    lys = [0] + [ly for _, ly, _ in wps]
+    return min(lxs), max(lxs), min(lys), max(lys)
+
+_EXTENTS = {
+    Movement.FWD: (0, 0, 0, DIST_FW),
+    Movement.BWD: (0, 0, -DIST_BW, 0),
+    Movement.FWD_LEFT: _extents(WPS_FL),
+    Movement.FWD_RIGHT: _extents(WPS_FR),
+    Movement.BWD_LEFT: _extents(WPS_BL),
+    Movement.BWD_RIGHT: _extents(WPS_BR),
+}
+
+# _EXTENTS rotated to a heading and grown by the body reach : offsets (x min, x max, y min, y max)
+# from the start pose, memoised as searches only ever use the lattice headings
+_BOXES = {}
+
+def _swept_box(movement : Movement, theta : float) -> tuple :
+    box = _BOXES.get((movement, theta))
+    if box is None :
+        lx0, lx1, ly0, ly1 = _EXTENTS[movement]
+        fx, fy = cos(theta), sin(theta)
+        sx, sy = fy, -fx # lateral vector
+        xs = (lx0 * sx + ly0 * fx, lx0 * sx + ly1 * fx, lx1 * sx + ly0 * fx, lx1 * sx + ly1 * fx)
+        ys = (lx0 * sy + ly0 * fy, lx0 * sy + ly1 * fy, lx1 * sy + ly0 * fy, lx1 * sy + ly1 * fy)
+        box = (min(xs) - _BODY_REACH, max(xs) + _BODY_REACH, min(ys) - _BODY_REACH, max(ys) + _BODY_REACH)
+        if len(_BOXES) < 4096 :
+            _BOXES[(movement, theta)] = box
+    return box
+
+# configuration space lattice
+NX = int(MAP_WIDTH // SNAP_COORD) + 1
+NY = int(MAP_HEIGHT // SNAP_COORD) + 1
+_COORD_EPS = 1e-6
+
+# a pose within half a lattice step (in x, y and heading) of a lattice pose moves no point of the footprint
+# further than this from where it is at the lattice pose, the buffered rectangle reaching furthest on a turn
+_SNAP_REACH = hypot(SNAP_COORD/2, SNAP_COORD/2) + 2 * sin(pi / (2 * N_HEADINGS)) * \
+    max(hypot(ROBOT_HEIGHT, ROBOT_WIDTH), hypot(ROBOT_HEIGHT/2, ROBOT_WIDTH/2) + hypot(_HALF_H, _HALF_W))
+# obstacle squares grown by this are kept clear of the lattice poses of Map._clear, with room for the
+# EDGE_ERR tolerance of the tests
+_CLEAR_GROW = _SNAP_REACH + 2 * EDGE_ERR
+
+
+# vectorised footprint tests, xs / ys / thetas are broadcastable arrays of reference poses
+# frame : robot centre and heading vector, shared by the bounds and obstacle tests
+def footprint_frame(xs, ys, thetas) -> tuple :
+    ux, uy = np.cos(thetas), np.sin(thetas)
+    cx = xs + ux * ROBOT_HEIGHT/2 + uy * ROBOT_WIDTH/2
+    cy = ys + uy * ROBOT_HEIGHT/2 - ux * ROBOT_WIDTH/2
+    return cx, cy, ux, uy
+
+
+# margin : distance the footprint keeps from the walls on top of the test
+def frame_in_bounds(cx, cy, ux, uy, margin : float = 0.0) -> np.ndarray :
+    aux, auy = np.abs(ux), np.abs(uy)
+    ex = aux * ROBOT_HEIGHT/2 + auy * ROBOT_WIDTH/2 + margin
+    ey = auy * ROBOT_HEIGHT/2 + aux * ROBOT_WIDTH/2 + margin
+    return (cx - ex >= -EDGE_ERR) & (cx + ex <= MAP_WIDTH + EDGE_ERR) & \
+           (cy - ey >= -EDGE_ERR) & (cy + ey <= MAP_HEIGHT + EDGE_ERR)
+
+
+# grow : added to the half width of the obstacle square
+def frame_hits_obstacle(cx, cy, ux, uy, mx, my, grow : float = 0.0) -> np.ndarray :
+    # separating axis test between the buffered robot rectangle and the obstacle square
+    # side vector r = (uy, -ux)
+    dx = cx - mx
+    dy = cy - my
+    aux, auy = np.abs(ux), np.abs(uy)
+    half = _HALF_O + grow
+    return (np.abs(dx) < half + _HALF_H * aux + _HALF_W * auy - EDGE_ERR) & \
+           (np.abs(dy) < half + _HALF_H * auy + _HALF_W * aux - EDGE_ERR) & \
+           (np.abs(dx * ux + dy * uy) < _HALF_H + half * (aux + auy) - EDGE_ERR) & \
+           (np.abs(dx * uy - dy * ux) < _HALF_W + half * (aux + auy) - EDGE_ERR)
+
+
+def in_bounds(xs, ys, thetas, margin : float = 0.0) -> np.ndarray :
+    return frame_in_bounds(*footprint_frame(xs, ys, thetas), margin)
+
+
+def hits_obstacle(xs, ys, thetas, mx, my, grow : float = 0.0) -> np.ndarray :
+    return frame_hits_obstacle(*footprint_frame(xs, ys, thetas), mx, my, grow)
+
+
+# scalar versions of the same tests for single continuous poses
+def _in_bounds(x : float, y : float, theta : float) -> bool :
+    ux, uy = cos(theta), sin(theta)
+    rx, ry = uy, -ux
+    cx = x + ux * ROBOT_HEIGHT/2 + rx * ROBOT_WIDTH/2
+    cy = y + uy * ROBOT_HEIGHT/2 + ry * ROBOT_WIDTH/2
+    ex = abs(ux) * ROBOT_HEIGHT/2 + abs(rx) * ROBOT_WIDTH/2
+    ey = abs(uy) * ROBOT_HEIGHT/2 + abs(ry) * ROBOT_WIDTH/2
+    return cx - ex >= -EDGE_ERR and cx + ex <= MAP_WIDTH + EDGE_ERR and \
+           cy - ey >= -EDGE_ERR and cy + ey <= MAP_HEIGHT + EDGE_ERR
+
+
+def _hits_obstacle(x : float, y : float, theta : float, mx : float, my : float) -> bool :
+    ux, uy = cos(theta), sin(theta)
+    rx, ry = uy, -ux
+    dx = x + ux * ROBOT_HEIGHT/2 + rx * ROBOT_WIDTH/2 - mx
+    dy = y + uy * ROBOT_HEIGHT/2 + ry * ROBOT_WIDTH/2 - my
+    aux, auy, arx, ary = abs(ux), abs(uy), abs(rx), abs(ry)
+    return abs(dx) < _HALF_O + _HALF_H * aux + _HALF_W * arx - EDGE_ERR and \
+           abs(dy) < _HALF_O + _HALF_H * auy + _HALF_W * ary - EDGE_ERR and \
+           abs(dx * ux + dy * uy) < _HALF_H + _HALF_O * (aux + auy) - EDGE_ERR and \
+           abs(dx * rx + dy * ry) < _HALF_W + _HALF_O * (arx + ary) - EDGE_ERR
+
+
+class Map :
+    def __init__(self, obstacles : Optional[List[Obstacle]] = None) :
+        self.obstacles = []
+        self.version = 0  # bumped on every layout change
+        self._hash = None  # (version, layout hash)
+
+        # configuration space : one layer per snapped heading at SNAP_COORD resolution
+        # blocked counts the obstacles touching each pose, so a single obstacle can be added or removed in place
+        xs = (np.arange(NX) * SNAP_COORD)[:, None]
+        ys = (np.arange(NY) * SNAP_COORD)[None, :]
+        self._inside = np.stack([in_bounds(xs, ys, heading_of(i)) for i in range(N_HEADINGS)])
+        self._blocked = np.zeros((N_HEADINGS, NX, NY), dtype=np.uint16)
+        self._free = self._inside.copy()
+        # clear poses : free with room to spare, every pose within half a lattice step of one is valid too.
+        # near counts the obstacles grown by _CLEAR_GROW touching each pose
+        self._inside_clear = np.stack([in_bounds(xs, ys, heading_of(i), _SNAP_REACH) for i in range(N_HEADINGS)])
+        self._near = np.zeros((N_HEADINGS, NX, NY), dtype=np.uint16)
+        self._clear = self._inside_clear.copy()
+
+        for o in obstacles or [] :
+            self.add_obstacle(o)
+
+    def add_obstacle(self, obstacle : Obstacle) :
+        self.obstacles.append(obstacle)
+        self._rasterise(obstacle, 1)
+
+    def remove_obstacle(self, obstacle : Obstacle) :
+        self.obstacles.remove(obstacle)
+        self._rasterise(obstacle, -1)
+
+    # the obstacle square does not move, only the layout hash changes
+    def set_facing(self, obstacle : Obstacle, facing : Direction) :
+        obstacle.facing = facing
+        self.version += 1
+
+    # valid viewing poses of an obstacle, best first (see Obstacle.view_poses), at most limit of them
+    def view_poses(self, obstacle : Obstacle, limit : Optional[int] = None) -> List[Position] :
+        return [pos for pos in obstacle.view_poses() if self.is_valid(pos)][:limit]
+
+    # update the configuration space in the window of poses the obstacle (grown for the clear poses) can touch
+    def _rasterise(self, obstacle : Obstacle, sign : int) :
+        mx, my = obstacle.middle
+        reach = _BODY_REACH + _CLEAR_GROW * 2**.5
+        x0 = max(0, int((mx - reach) // SNAP_COORD))
+        x1 = min(NX, int((mx + reach) // SNAP_COORD) + 2)
+        y0 = max(0, int((my - reach) // SNAP_COORD))
+        y1 = min(NY, int((my + reach) // SNAP_COORD) + 2)
+        if x0 >= x1 or y0 >= y1 :
+            return
+
+        xs = (np.arange(x0, x1) * SNAP_COORD)[:, None]
+        ys = (np.arange(y0, y1) * SNAP_COORD)[None, :]
+        for i in range(N_HEADINGS) :
+            frame = footprint_frame(xs, ys, heading_of(i))
+            hit = frame_hits_obstacle(*frame, mx, my)
+            near = frame_hits_obstacle(*frame, mx, my, _CLEAR_GROW)
+            if sign > 0 :
+                self._blocked[i, x0:x1, y0:y1] += hit
+                self._near[i, x0:x1, y0:y1] += near
+            else :
+                self._blocked[i, x0:x1, y0:y1] -= hit
+                self._near[i, x0:x1, y0:y1] -= near
+
+        self._free[:, x0:x1, y0:y1] = self._inside[:, x0:x1, y0:y1] & (self._blocked[:, x0:x1, y0:y1] == 0)
+        self._clear[:, x0:x1, y0:y1] = self._inside_clear[:, x0:x1, y0:y1] & (self._near[:, x0:x1, y0:y1] == 0)
+        self.version += 1
+
+    # content hash of the obstacle layout, independent of insertion order
+    def layout_hash(self) -> str :
+        if self._hash is None or self._hash[0] != self.version :
+            layout = sorted((o.x, o.y, o.facing.value) for o in self.obstacles)
+            self._hash = (self.version, hashlib.sha1(repr(layout).encode()).hexdigest()[:16])
+        return self._hash[1]
+
+    # O(1) validity of a lattice pose given by its indices
+    def is_free(self, xi : int, yi : int, ti : int) -> bool :
+        if 0 <= xi < NX and 0 <= yi < NY :
+            return bool(self._free[ti, xi, yi])
+        return False
+
+    # free lattice poses at heading index ti, a read only (NX, NY) view of the configuration space
+    def free_layer(self, ti : int) -> np.ndarray :
+        layer = self._free[ti]
+        layer.flags.writeable = False
+        return layer
+
+    # lattice indices of a pose, None if it is not exactly on the lattice
+    def lattice_index(self, pos : Position) -> Optional[tuple] :
+        ti = heading_index(pos.theta)
+        if ti is None :
+            return None
+        fx = pos.x / SNAP_COORD
+        fy = pos.y / SNAP_COORD
+        xi = round(fx)
+        yi = round(fy)
+        if abs(fx - xi) > _COORD_EPS or abs(fy - yi) > _COORD_EPS :
+            return None
+        return xi, yi, ti
+
+    # lattice poses are looked up. off the lattice a pose is valid when the lattice pose nearest to it is
+    # clear, only the others are tested against the geometry
+    def is_valid(self, pos : Position, obs : Optional[List[Obstacle]] = None) -> bool :
+        idx = self.lattice_index(pos)
+        if idx is not None :
+            return self.is_free(*idx)
+        xi = round(pos.x / SNAP_COORD)
+        yi = round(pos.y / SNAP_COORD)
+        if 0 <= xi < NX and 0 <= yi < NY :
+            ti = round(pos.theta % (2*pi) / (2*pi) * N_HEADINGS) % N_HEADINGS
+            if self._clear[ti, xi, yi] :
+                return True
+
+        if not _in_bounds(pos.x, pos.y, pos.theta) :
+            return False
+        for o in self.obstacles if obs is None else obs :
+            if _hits_obstacle(pos.x, pos.y, pos.theta, *o.middle) :
+                return False
+        return True
+
+    # all poses valid, waypoint footprints tested against every obstacle at once
+    def is_valid_batch(self, xs : np.ndarray, ys : np.ndarray, thetas : np.ndarray,
+                       obs : Optional[List[Obstacle]] = None) -> bool :
+        cx, cy, ux, uy = footprint_frame(xs, ys, thetas)
+        if not frame_in_bounds(cx, cy, ux, uy).all() :
+            return False
+        obs = self.obstacles if obs is None else obs
+        if not obs :
+            return True
+        mid = np.array([o.middle for o in obs])
+        return not frame_hits_obstacle(cx, cy, ux, uy, mid[:, 0:1], mid[:, 1:2]).any()
+
+    # obstacles that can be touched while performing the movement from pos : those whose middle lies in
+    # the world bounding box of the swept reference points grown by the body reach. a scan of the list :
+    # the box spans a good part of the arena, so a grid index over it never paid off, not even at 100 obstacles
+    def priority_obs(self, pos : Position, movement : Movement) -> List[Obstacle] :
+        dx0, dx1, dy0, dy1 = _swept_box(movement, pos.theta)
+        x0, x1, y0, y1 = pos.x + dx0, pos.x + dx1, pos.y + dy0, pos.y + dy1
+        return [o for o in self.obstacles if x0 <= o.middle[0] <= x1 and y0 <= o.middle[1] <= y1]
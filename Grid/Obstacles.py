@@ -1,27 +1,87 @@
-from math import pi
-
-from Commons.Constants import (OBSTACLE_WIDTH, ROBOT_MIN_CAMERA_DIST, ROBOT_HEIGHT, ROBOT_WIDTH)
-from Commons.Enums import Direction
-from Commons.Types import Position
-
-
-class Obstacle :
-    def __init__(self, x : float, y : float, facing : Direction) : 
-        self.x = x
-        self.y = y 
-        self.facing = facing
-        self.middle = (x + OBSTACLE_WIDTH/2, y + OBSTACLE_WIDTH/2) #obstacle center point
-
-
-
-    def to_pos(self) -> Position :
-        x = self.x
-        y = self.y
-        theta = None 
-
-        centering_pad = (ROBOT_WIDTH - OBSTACLE_WIDTH)/ 2
-
-        if self.facing == Direction.NORTH :
-            y += ROBOT_MIN_CAMERA_DIST + OBSTACLE_WIDTH + ROBOT_HEIGHT
-            x += centering_pad + OBSTACLE_WIDTH
-            theta = -pi/2
+from math import atan2, cos, pi, sin
+from typing import List
+
+from Commons.Constants import (CONE, OBSTACLE_WIDTH, ROBOT_MIN_CAMERA_DIST, ROBOT_HEIGHT, ROBOT_WIDTH)
+from Commons.Enums import Direction
+from Commons.Types import Position
+
+
+# viewing pose candidates around to_pos : the camera shifted up to VIEW_LEFT / VIEW_RIGHT sideways,
+# backed off by up to VIEW_EXTRA in VIEW_STEPS steps, and yawed by VIEW_YAW back towards the image
+VIEW_LEFT, VIEW_RIGHT, VIEW_STEPS, VIEW_EXTRA = CONE
+VIEW_YAW = pi / 12 # one lattice heading, the goal tolerance of a search
+
+class Obstacle :
+    def __init__(self, x : float, y : float, facing : Direction) : 
+        self.x = x
+        self.y = y 
+        self.facing = facing
+        self.middle = (x + OBSTACLE_WIDTH/2, y + OBSTACLE_WIDTH/2) #obstacle center point
+
+
+
+    def to_pos(self) -> Position :
+        x = self.x
+        y = self.y
+        theta = None 
+
+        centering_pad = (ROBOT_WIDTH - OBSTACLE_WIDTH)/ 2
+
+        if self.facing == Direction.NORTH :
+            y += ROBOT_MIN_CAMERA_DIST + OBSTACLE_WIDTH + ROBOT_HEIGHT
+            x += centering_pad + OBSTACLE_WIDTH
+            theta = -pi/2
+
+        elif self.facing == Direction.SOUTH :
+            y -= ROBOT_MIN_CAMERA_DIST + ROBOT_HEIGHT
+            x -= centering_pad
+            theta = pi/2
+
+        elif self.facing == Direction.EAST :
+            x += ROBOT_MIN_CAMERA_DIST + OBSTACLE_WIDTH + ROBOT_HEIGHT
+            y -= centering_pad
+            theta = pi
+
+        elif self.facing == Direction.WEST :
+            x -= ROBOT_MIN_CAMERA_DIST + ROBOT_HEIGHT
+            y += centering_pad + OBSTACLE_WIDTH
+            theta = 0
+
+        return Position(x, y, theta)
+
+    # viewing poses from best to worst, to_pos first. each is scored by how far it strays from to_pos :
+    # extra distance, sideways shift and the angle between the camera axis and the image centre,
+    # each relative to its limit
+    def view_poses(self) -> List[Position] :
+        nominal = self.to_pos()
+        fx, fy = cos(nominal.theta), sin(nominal.theta)
+        rx, ry = fy, -fx # robot right, the body spans ROBOT_WIDTH along it
+        # camera at the front centre, the image centre straight ahead of it
+        cx = nominal.x + ROBOT_HEIGHT * fx + ROBOT_WIDTH / 2 * rx
+        cy = nominal.y + ROBOT_HEIGHT * fy + ROBOT_WIDTH / 2 * ry
+        mx, my = self.middle
+
+        scored = []
+        for i in range(VIEW_STEPS + 1) :
+            extra = VIEW_EXTRA * i / VIEW_STEPS
+            for lat, limit in ((0, 1), (-VIEW_LEFT, VIEW_LEFT), (VIEW_RIGHT, VIEW_RIGHT)) :
+                x = cx - extra * fx + lat * rx
+                y = cy - extra * fy + lat * ry
+                yaws = [0]
+                if lat :
+                    # turn the camera back towards the image : the sign of f x (middle - camera)
+                    yaws.append(VIEW_YAW if fx * (my - y) - fy * (mx - x) > 0 else -VIEW_YAW)
+                for yaw in yaws :
+                    off = (atan2(my - y, mx - x) - nominal.theta - yaw + pi) % (2 * pi) - pi
+                    score = extra / VIEW_EXTRA + abs(lat) / limit + abs(off) / VIEW_YAW
+                    scored.append((score, _camera_pose(x, y, nominal.theta + yaw)))
+        scored.sort(key=lambda e : e[0])
+        return [pos for _, pos in scored]
+
+
+# robot pose (rear-left corner) whose camera sits at (x, y) facing theta
+def _camera_pose(x : float, y : float, theta : float) -> Position :
+    fx, fy = cos(theta), sin(theta)
+    rx, ry = fy, -fx
+    return Position(x - ROBOT_HEIGHT * fx - ROBOT_WIDTH / 2 * rx,
+                    y - ROBOT_HEIGHT * fy - ROBOT_WIDTH / 2 * ry, theta)
@@ -1,229 +1,1037 @@
-from typing import List, Optional
-from Commons.Types import Position
-from Grid.Map import Map
-from Commons.Enums import Movement
-from math import pi
-from Commons.Utils import calc_vector, euclidean
-import numpy as np
-import heapq
-import logging
-from Robot_Movements.Movements import (
-    forward,
-    backward,
-    forward_left,
-    forward_right,
-    backward_left,
-    backward_right
-)
-from Commons.Constants import (
-    DIST_BL, 
-    DIST_BR, 
-    DIST_BW, 
-    DIST_FL, 
-    DIST_FR, 
-    DIST_FW,
-    PENALTY_STOP,
-    MAX_THETA_ERR,
-    MAX_X_ERR,
-    MAX_Y_ERR,
-    WPS_FL,
-    WPS_FR, 
-    WPS_BL, 
-    WPS_BR,
-)
-
-logger = logging.getLogger('ASTAR')
-
-class Node :
-        __slots__ = ("pos", "c_pos", "g", "h", "v", "s", "d", "parent")
-
-        # pos : discrete position
-        # c_pos :continous position
-        # g : path cost from start to a node
-        # h : heuristic cost from node to goal
-        # f : g+h
-        # v : previous motions direction (-1 : backwards, 1 : forwards)
-        # s : previous steering direction (-1 : left, 0 : straight, 1 : right)
-        # d :distance traveled in last step
-        # parent : pointer to the previous node
-
-        def __init__(self,
-                    pos :"Position", c_pos : "Position", g : float,
-                    h : float, parent : Optional["Node"], v : int = 1,
-                    s : int = 0, d : float = 0.0):
-                        self.pos = pos
-                        self.c_pos = c_pos
-                        self.g = g
-                        self.h = h
-                        self.v = v
-                        self.s = s
-                        self.d = d
-                        self.parent = parent
-        @property
-        def f(self) -> float :
-                return self.g + self.h
-        
-        def cloneNode(self) -> "Node" : # returns a copy of the node
-                return Node(self.pos, self.c_pos, self.g, self.h, self.parent, self.v, self.s, self.d)
-        
-        def isEqual(self,node : "Node") -> bool :
-                return (self.pos.x, self.pos.y, self.pos.theta) == (node.pos.x, node.pos.y, node.pos.theta)
-        
-        def lessThan(self,node : "Node") -> bool :
-                return (self.f, self.h, self.pos.x, self.pos.y, self.pos.theta) < \
-               (node.f, node.h, node.pos.x, node.pos.y, node.pos.theta)
-        
-        def hashNode(self) -> int : # hashes node
-                return hash((self.pos.x, self.pos.y, self.pos.theta))
-        
-        def toString(self) -> str :
-                return (f"Node(x:{self.c_pos.x:6.2f}, y:{self.c_pos.y:6.2f}, θ:{self.c_pos.theta:6.2f}, "
-                f"g:{self.g:6.2f}, h:{self.h:6.2f}, f:{self.f:6.2f}), v:{self.v}, s:{self.s}")
-                
-
-
-class Astar :
-        def __init__(self, mp : "Map") :
-                self.moves = (
-                        (-1,  0, DIST_BW,    Movement.BWD,       backward),
-                        (-1, -1, DIST_BL[2], Movement.BWD_LEFT,  backward_left),
-                        (-1,  1, DIST_BR[2], Movement.BWD_RIGHT, backward_right),
-                        ( 1,  0, DIST_FW,    Movement.FWD,       forward),
-                        ( 1, -1, DIST_FL[2], Movement.FWD_LEFT,  forward_left),
-                        ( 1,  1, DIST_FR[2], Movement.FWD_RIGHT, forward_right),)
-                self.map = mp
-                self.end = None
-                self.x_bounds = None
-                self.y_bounds = None
-
-        # Check if the position is within the goal bounds andif the heading difference is within the error theta
-        def goal(self, pos : "Position") -> bool :
-                return self.x_bounds[0] <= pos.x <= self.x_bounds[1] and \
-                       self.y_bounds[0] <= pos.y <= self.y_bounds[1] and \
-                       abs(self.end.theta - pos.theta) % (2 * pi) <= MAX_THETA_ERR
-        
-        def has_collision(self, start : Position, movement : Movement) -> bool :
-                mp = self.map
-                obs = mp.priority_obs(start, movement)
-
-                if movement == Movement.FWD_LEFT:
-                        wps = WPS_FL
-                elif movement == Movement.BWD_LEFT:
-                        wps = WPS_BL
-                elif movement == Movement.FWD_RIGHT:
-                        wps = WPS_FR
-                elif movement == Movement.BWD_RIGHT:
-                        wps = WPS_BR
-                else :
-                        v = calc_vector(start.theta, DIST_FW)
-                        if movement == Movement.BWD :
-                                v *= -1
-                        new = start.cloneNode()
-                        new.add(v)
-                        return mp.is_valid(new,obs)
-                
-                start_vector = np.array([start.x, start.y])
-                forward_vector = calc_vector(start.theta, 1)
-                # backward is negative
-
-                left_vector = calc_vector(start.theta - pi/2, 1)
-                # right is negative
-
-                # returns true if there is a collision and false otherwise
-                for lx, ly, dth in wps :
-                        pos = Position(*(start_vector + lx * left_vector + ly * forward_vector), (start.theta + dth) % (2*pi))
-                        if not mp.is_valid(pos, obs):
-                                return True
-                return False
-
-
-        
-        def expand(self, node : "Node") :
-                current_pos = node.c_pos
-
-                for v, s, d, mv, f in self.moves :
-                        next_pos_continous = f(current_pos)
-                        next_pos_snap = next_pos_continous.snap() #snap continous into discrete
-                        next_tuple = next_pos_snap.to_tuple() # hashable
-                        
-                        # checking successor if its expanded or will collide
-                        if next_tuple in self.closed or self.has_collision(current_pos,mv,self.map) :
-                                continue
-                        # penalty for changing motion
-                        penalty = PENALTY_STOP if (v != node.v or s != node.s) else 0
-
-                        # update path cost
-                        g =  node.g + penalty + d
-                        h = euclidean(next_pos_continous, self.end)
-
-                        # building sucessor node
-                        next_node = Node(next_pos_snap, next_pos_continous, g, h, node, v, s, d)
-
-                        # self.open : priority queue of nodes ordered by cost (f)
-                        # look up the smallest f we've seen for this cell, if there is a better f, then update disctionary index self.open_h
-                        best = self.open_h.get(next_tuple)
-                        if best is None or next_node.f < best :
-                                self.open_h[next_tuple] = next_node.f
-                                heapq.heappush(self.open, next_node)
-
-
-        def set_bounds(self):
-                vv = calc_vector(self.end.theta, 1)
-                vh = calc_vector(self.end.theta - pi/2, 1)
-
-                end = np.array([self.end.x, self.end.y])
-                _TR = end + vh * MAX_X_ERR[1] + vv * MAX_Y_ERR[0]
-                _BL = end - vh * MAX_X_ERR[0] - vv * MAX_Y_ERR[1]
-
-                self.x_bounds = sorted([_TR[0], _BL[0]])
-                self.y_bounds = sorted([_TR[1], _BL[1]])
-
-
-        def search(
-                self,
-                start: "Position",
-                end: "Position",
-                ) -> List["Node"]:
-
-                logger.info(f'Start search from {start} to {end}')
-                end_node = Node(end, end, 0, 0)
-                self.end = end
-                self.open = [Node(start.snap(), start,0, 0)]
-                self.open_h = {} # index dictionary to remember best f per discrete cell
-                self.closed = [] # list of cells already expanded
-                self.set_bounds()
-
-                while self.open:
-                        node = heapq.heappop(self.open) # pop node with lowest f
-                        tup = node.pos.to_tuple()
-                        logger.debug(f'{node} {node.parent}')
-
-                        if self.goal(node.c_pos):
-                                logger.info(f'Found goal {end_node}')
-                                return self._reconstruct(node)
-
-                        self.closed.append(tup) # move to closed
-                        self.expand(node) 
-
-                        for o in self.open[:5]:
-                                logger.debug(f'{o.c_pos}, {o}')
-
-                logger.info(f'Unable to reach {end} from {start}')
-                return []
-
-
-        def reconstruct(  # constructing path from start to goal in result
-                self,
-                last: "Node"
-                ) -> List["Node"]:
-                result = []
-
-                while last:
-                        result.append(last)
-                        last = last.parent
-
-                return result[::-1]
-
-
-        
-        
+from typing import Callable, List, Optional, Union
+from Commons.Types import Position
+from Grid.Map import Map, NX, NY
+from Commons.Enums import Movement
+from math import ceil, pi, cos, sin, hypot
+from Commons.Utils import calc_vector, euclidean
+import numpy as np
+import heapq
+import logging
+import time
+from array import array
+from contextlib import nullcontext
+from Robot_Movements.Primitives import N_HEADINGS, heading_index, heading_of, primitive_table, profile_key
+from Path_Algo.Cache import LegCache
+from Path_Algo.Stats import SearchStats, timed
+from Path_Algo.Heuristic import heuristic_field
+from Path_Algo.Dubins import goal_shots
+from Robot_Movements.Movements import (
+    forward,
+    backward,
+    forward_left,
+    forward_right,
+    backward_left,
+    backward_right
+)
+from Commons.Constants import (
+    DIST_BL, 
+    DIST_BR, 
+    DIST_BW, 
+    DIST_FL, 
+    DIST_FR, 
+    DIST_FW,
+    PENALTY_STOP,
+    MAX_THETA_ERR,
+    MAX_X_ERR,
+    MAX_Y_ERR,
+    SNAP_COORD,
+    WPS_FL,
+    WPS_FR, 
+    WPS_BL, 
+    WPS_BR,
+)
+
+logger = logging.getLogger('ASTAR')
+
+# collision checks an Astar remembers before it starts over, a long lived one (server, pool worker) would
+# otherwise keep every pose it ever checked. one search checks up to ~6 moves per expansion
+COLLISION_MEMO = 1 << 17
+
+class Node :
+        __slots__ = ("pos", "c_pos", "g", "h", "v", "s", "d", "parent", "seq")
+
+        # pos : discrete position
+        # c_pos :continous position
+        # g : path cost from start to a node
+        # h : heuristic cost from node to goal
+        # f : g+h
+        # v : previous motions direction (-1 : backwards, 1 : forwards)
+        # s : previous steering direction (-1 : left, 0 : straight, 1 : right)
+        # d :distance traveled in last step
+        # parent : pointer to the previous node
+
+        def __init__(self,
+                    pos :"Position", c_pos : "Position", g : float,
+                    h : float, parent : Optional["Node"], v : int = 1,
+                    s : int = 0, d : float = 0.0):
+                        self.pos = pos
+                        self.c_pos = c_pos
+                        self.g = g
+                        self.h = h
+                        self.v = v
+                        self.s = s
+                        self.d = d
+                        self.parent = parent
+                        self.seq = -1 # queueing order in lazy mode, -1 for the start node and the open set kept over a re-key
+        @property
+        def f(self) -> float :
+                return self.g + self.h
+        
+        def cloneNode(self) -> "Node" : # returns a copy of the node
+                return Node(self.pos, self.c_pos, self.g, self.h, self.parent, self.v, self.s, self.d)
+        
+        def isEqual(self,node : "Node") -> bool :
+                return (self.pos.x, self.pos.y, self.pos.theta) == (node.pos.x, node.pos.y, node.pos.theta)
+        
+        def lessThan(self,node : "Node") -> bool :
+                return (self.f, self.h, self.pos.x, self.pos.y, self.pos.theta) < \
+               (node.f, node.h, node.pos.x, node.pos.y, node.pos.theta)
+
+        __lt__ = lessThan # heapq ordering
+        
+        def hashNode(self) -> int : # hashes node
+                return hash((self.pos.x, self.pos.y, self.pos.theta))
+        
+        def toString(self) -> str :
+                return (f"Node(x:{self.c_pos.x:6.2f}, y:{self.c_pos.y:6.2f}, θ:{self.c_pos.theta:6.2f}, "
+                f"g:{self.g:6.2f}, h:{self.h:6.2f}, f:{self.f:6.2f}), v:{self.v}, s:{self.s}")
+                
+
+
+# compact path form for caches and inter-process transfer : one row per node
+# (continuous x, y, theta, g, h, v, s, d), parents are implied by the row order
+def pack_path(path : List["Node"]) -> np.ndarray :
+        return np.array([(n.c_pos.x, n.c_pos.y, n.c_pos.theta, n.g, n.h, n.v, n.s, n.d) for n in path], dtype=np.float64)
+
+
+def unpack_path(packed : Optional[np.ndarray]) -> List["Node"] :
+        if packed is None :
+                return []
+        result = []
+        parent = None
+        for x, y, theta, g, h, v, s, d in packed.tolist() :
+                c_pos = Position(x, y, theta)
+                parent = Node(c_pos.snap(), c_pos, g, h, parent, int(v), int(s), d)
+                result.append(parent)
+        return result
+
+
+# waypoint sets as (n, 3) arrays for the batched swept-path check
+_WPS_ARRAYS = {
+        Movement.FWD_LEFT: np.array(WPS_FL),
+        Movement.FWD_RIGHT: np.array(WPS_FR),
+        Movement.BWD_LEFT: np.array(WPS_BL),
+        Movement.BWD_RIGHT: np.array(WPS_BR),
+}
+
+
+class Astar :
+        # no Dubins / Reeds-Shepp curve length among them : the curves end on the exact goal pose, not anywhere
+        # in its bounds, and overestimate lattice legs (290 against 269 measured)
+        HEURISTICS = ("euclidean", "field")
+
+        def __init__(self, mp : "Map", batch : bool = True, cache : Optional[LegCache] = None,
+                     heuristic : str = "euclidean", analytic : int = 0, lazy : bool = False) :
+                self.moves = (
+                        (-1,  0, DIST_BW,    Movement.BWD,       backward),
+                        (-1, -1, DIST_BL[2], Movement.BWD_LEFT,  backward_left),
+                        (-1,  1, DIST_BR[2], Movement.BWD_RIGHT, backward_right),
+                        ( 1,  0, DIST_FW,    Movement.FWD,       forward),
+                        ( 1, -1, DIST_FL[2], Movement.FWD_LEFT,  forward_left),
+                        ( 1,  1, DIST_FR[2], Movement.FWD_RIGHT, forward_right),)
+                self.move_of = {(v, s): (d, mv, f) for v, s, d, mv, f in self.moves}
+                self.by_move = {mv: (v, s, d, f) for v, s, d, mv, f in self.moves}
+                self.table = primitive_table() # successor offsets per snapped heading
+                self.map = mp
+                self.batch = batch # vectorised swept-path check for turns
+                self.cache = cache # leg results shared across searches / runs
+                self.end = None
+                # try a goal shot every analytic expansions, 0 disables. the first shot that is free ends the search,
+                # so the legs are not optimal (60-80 % dearer on the bench legs) : never cached, no anytime bound
+                self.analytic = analytic
+                self.lazy = lazy # check a move for collisions when its node is popped instead of when it is pushed
+                self.collisions = {} # (pose, movement) -> has_collision, for self.collisions_version of the map
+                self.collisions_version = mp.version
+                self.weight = 1.0 # heuristic inflation, > 1 for weighted A*
+                self.deadline = None # time.time() after which the running search gives up
+                self.timed_out = False
+                self.bound = 1.0 # suboptimality bound of the last returned path
+                self.stats = SearchStats() # counters of the last search, see Path_Algo.Stats
+                self.timing = False # time collision checks and the heuristic per phase, adds overhead
+                self.wrap = None # context manager factory run around every search, e.g. Stats.profiled
+                self.trace = None # called with (x, y, theta, g, h) for every expanded node, e.g. Stats.trace_to
+                self.h_mode = heuristic # default heuristic, see HEURISTICS
+                self.h_active = heuristic # heuristic of the running search
+                self.targets = [] # goals the heuristic points at
+                self.h_funcs = [] # one heuristic per target
+                self.x_bounds = None
+                self.y_bounds = None
+
+        # nodes expanded by the last search
+        @property
+        def expanded(self) -> int :
+                return self.stats.expanded
+
+        # fresh stats for a search starting now, the phase timers wrap the instance's methods while timing is on
+        def new_stats(self) -> SearchStats :
+                self.stats = SearchStats()
+                if self.timing and "has_collision" not in self.__dict__ :
+                        self.has_collision = timed(self, self.has_collision, "collision")
+                        self.heuristic = timed(self, self.heuristic, "heuristic")
+                elif not self.timing :
+                        self.__dict__.pop("has_collision", None)
+                        self.__dict__.pop("heuristic", None)
+                return self.stats
+
+        # run a public search under the wrap hook, with fresh stats and its total time
+        def instrumented(self, fn : Callable, *args) :
+                self.new_stats()
+                with self.wrap() if self.wrap is not None else nullcontext() :
+                        st = time.perf_counter()
+                        try :
+                                return fn(*args)
+                        finally :
+                                self.stats.times["total"] = time.perf_counter() - st
+
+        # has_collision, computed once per (pose, movement) while the map stays the same and the memo is not full
+        def collides(self, pos : "Position", movement : Movement) -> bool :
+                if self.collisions_version != self.map.version or len(self.collisions) >= COLLISION_MEMO :
+                        self.collisions = {}
+                        self.collisions_version = self.map.version
+                key = (round(pos.x, 6), round(pos.y, 6), round(pos.theta, 6), movement)
+                hit = self.collisions.get(key)
+                if hit is None :
+                        hit = self.collisions[key] = self.has_collision(pos, movement)
+                return hit
+
+        # lazy mode : whether the move into a popped node collides, the start node never does
+        def edge_collides(self, node : "Node") -> bool :
+                return node.parent is not None and self.collides(node.parent.c_pos, self.move_of[(node.v, node.s)][1])
+
+        # lazy mode : whether a popped node is dropped, so that the nodes expanded are the ones eager checking
+        # expands. it would not have queued the node if it collides, or if a free node for the same state queued
+        # before it was no costlier. that node may still be queued when f ties (h differs in the last bits), so
+        # every node queued for the state is looked at, not only the ones popped. closed states are expanded again
+        # like eager mode does : the state leaves out the last motion, which the stop penalty depends on
+        def lazy_skip(self, tup : tuple, node : "Node") -> bool :
+                if self.edge_collides(node) :
+                        return True
+                f, seq = node.f, node.seq
+                return any(o.seq < seq and o.f <= f and not self.edge_collides(o) for o in self.by_state.get(tup, ()))
+
+        # Check if the position is within the goal bounds andif the heading difference is within the error theta
+        def goal(self, pos : "Position") -> bool :
+                return self.in_goal(pos, self.end, self.x_bounds, self.y_bounds)
+
+        @staticmethod
+        def in_goal(pos : "Position", end : "Position", x_bounds : list, y_bounds : list) -> bool :
+                return x_bounds[0] <= pos.x <= x_bounds[1] and \
+                       y_bounds[0] <= pos.y <= y_bounds[1] and \
+                       abs(end.theta - pos.theta) % (2 * pi) <= MAX_THETA_ERR
+
+        # estimated cost to the nearest goal still being searched for
+        def heuristic(self, pos : "Position") -> float :
+                if len(self.h_funcs) == 1 :
+                        return self.h_funcs[0](pos)
+                return min(h(pos) for h in self.h_funcs)
+
+        # goals are positions or groups (lists) of positions, a group is reached with any of its members
+        def set_targets(self, goals : List[Union["Position", List["Position"]]]) :
+                self.targets = goals
+                self.h_funcs = [self.group_heuristic(end) if isinstance(end, list) else self.target_heuristic(end)
+                                for end in goals]
+
+        # euclidean : distance to the circle around the group's members, one evaluation per group
+        # other heuristics : the smallest over the members
+        def group_heuristic(self, group : List["Position"]) -> Callable[["Position"], float] :
+                if len(group) == 1 :
+                        return self.target_heuristic(group[0])
+                if self.h_active == "euclidean" :
+                        cx = sum(end.x for end in group) / len(group)
+                        cy = sum(end.y for end in group) / len(group)
+                        radius = max(hypot(end.x - cx, end.y - cy) for end in group)
+                        return lambda pos : max(0.0, hypot(pos.x - cx, pos.y - cy) - radius)
+                funcs = [self.target_heuristic(end) for end in group]
+                return lambda pos : min(h(pos) for h in funcs)
+
+        def target_heuristic(self, end : "Position") -> Callable[["Position"], float] :
+                if self.h_active == "euclidean" :
+                        return lambda pos : euclidean(pos, end)
+                if self.h_active == "field" : # obstacle-aware, cached per goal and layout
+                        # in the goal bounds a search stops where it is, at the distance left to the goal pose the
+                        # leg cost counts
+                        bounds = self.bounds(end)
+                        field = heuristic_field(self.map, end, bounds)
+                        return lambda pos : euclidean(pos, end) if self.in_goal(pos, end, *bounds) else field(pos)
+                raise ValueError(f'Unknown heuristic {self.h_active}, expected one of {self.HEURISTICS}')
+        
+        def has_collision(self, start : Position, movement : Movement) -> bool :
+                self.stats.collision_checks += 1
+                mp = self.map
+                obs = mp.priority_obs(start, movement)
+
+                if movement == Movement.FWD_LEFT:
+                        wps = WPS_FL
+                elif movement == Movement.BWD_LEFT:
+                        wps = WPS_BL
+                elif movement == Movement.FWD_RIGHT:
+                        wps = WPS_FR
+                elif movement == Movement.BWD_RIGHT:
+                        wps = WPS_BR
+                else :
+                        v = calc_vector(start.theta, DIST_FW)
+                        if movement == Movement.BWD :
+                                v *= -1
+                        new = start.getPosition()
+                        new.add_to_pos(v)
+                        return not mp.is_valid(new,obs)
+
+                if self.batch :
+                        return self.has_collision_batch(start, movement, obs)
+                
+                start_vector = np.array([start.x, start.y])
+                forward_vector = calc_vector(start.theta, 1)
+                # backward is negative
+
+                left_vector = calc_vector(start.theta - pi/2, 1)
+                # right is negative
+
+                # returns true if there is a collision and false otherwise
+                for lx, ly, dth in wps :
+                        pos = Position(*(start_vector + lx * left_vector + ly * forward_vector), (start.theta + dth) % (2*pi))
+                        if not mp.is_valid(pos, obs):
+                                return True
+                return False
+
+        # same result as the loop above, with every waypoint transformed and tested in one go
+        def has_collision_batch(self, start : Position, movement : Movement, obs : list) -> bool :
+                wps = _WPS_ARRAYS[movement]
+                fx, fy = cos(start.theta), sin(start.theta) # forward vector
+                lx, ly = cos(start.theta - pi/2), sin(start.theta - pi/2) # left vector (right is negative)
+
+                xs = start.x + wps[:, 0] * lx + wps[:, 1] * fx
+                ys = start.y + wps[:, 0] * ly + wps[:, 1] * fy
+                thetas = (start.theta + wps[:, 2]) % (2*pi)
+                return not self.map.is_valid_batch(xs, ys, thetas, obs)
+
+        
+        def expand(self, node : "Node") :
+                current_pos = node.c_pos
+                idx = heading_index(current_pos.theta)
+
+                # off-lattice heading (unsnapped start) : fall back to the movement functions
+                if idx is None :
+                        for v, s, d, mv, f in self.moves :
+                                self.push(node, f(current_pos), mv, v, s, d)
+                        return
+
+                # lattice heading : successors are table lookups, no trig
+                x, y = current_pos.x, current_pos.y
+                for p in self.table[idx] :
+                        nx = x + p.dx
+                        ny = y + p.dy
+                        ntheta = heading_of((idx + p.dth) % N_HEADINGS)
+                        next_tuple = (int(round(nx / SNAP_COORD) * SNAP_COORD), int(round(ny / SNAP_COORD) * SNAP_COORD), ntheta)
+                        if next_tuple in self.closed :
+                                continue
+                        self.push(node, Position(nx, ny, ntheta), p.move, p.v, p.s, p.cost, next_tuple)
+
+
+        def push(self, node : "Node", next_pos_continous : "Position", mv : Movement,
+                 v : int, s : int, d : float, next_tuple : Optional[tuple] = None) :
+                self.stats.generated += 1
+                if next_tuple is None :
+                        next_pos_snap = next_pos_continous.snap() #snap continous into discrete
+                        next_tuple = next_pos_snap.getPositionTuple() # hashable
+                else :
+                        next_pos_snap = Position(*next_tuple)
+
+                # checking successor if its expanded or will collide, lazy mode leaves the collision check to the pop
+                if next_tuple in self.closed or (not self.lazy and self.collides(node.c_pos, mv)) :
+                        return
+                # penalty for changing motion
+                penalty = PENALTY_STOP if (v != node.v or s != node.s) else 0
+
+                # update path cost
+                g =  node.g + penalty + d
+                h = self.weight * self.heuristic(next_pos_continous)
+
+                # building sucessor node
+                next_node = Node(next_pos_snap, next_pos_continous, g, h, node, v, s, d)
+                if self.lazy :
+                        self.queued += 1
+                        next_node.seq = self.queued
+                        self.by_state.setdefault(next_tuple, []).append(next_node)
+
+                # self.open : priority queue of nodes ordered by cost (f)
+                # look up the smallest f we've seen for this cell, if there is a better f, then update disctionary index self.open_h
+                # lazy mode queues every unchecked successor : the best one may turn out to collide when popped
+                best = self.open_h.get(next_tuple)
+                if best is None or next_node.f < best :
+                        if best is not None :
+                                self.stats.reopened += 1
+                        self.open_h[next_tuple] = next_node.f
+                        heapq.heappush(self.open, next_node)
+                elif self.lazy :
+                        heapq.heappush(self.open, next_node)
+
+
+        def set_bounds(self):
+                self.x_bounds, self.y_bounds = self.bounds(self.end)
+
+        @staticmethod
+        def bounds(end : "Position") -> tuple :
+                vv = calc_vector(end.theta, 1)
+                vh = calc_vector(end.theta - pi/2, 1)
+
+                end = np.array([end.x, end.y])
+                _TR = end + vh * MAX_X_ERR[1] + vv * MAX_Y_ERR[0]
+                _BL = end - vh * MAX_X_ERR[0] - vv * MAX_Y_ERR[1]
+
+                return sorted([_TR[0], _BL[0]]), sorted([_TR[1], _BL[1]])
+
+
+        def search(
+                self,
+                start: "Position",
+                end: "Position",
+                heuristic: Optional[str] = None,
+                deadline: Optional[float] = None,
+                bidirectional: bool = False,
+                ) -> List["Node"]:
+
+                self.h_active = heuristic or self.h_mode
+                return self.instrumented(self._search_cached, start, end, bidirectional, deadline)
+
+        def _search_cached(self, start : "Position", end : "Position", bidirectional : bool, deadline : Optional[float]) -> List["Node"] :
+                if deadline is not None :
+                        # anytime mode : best path found before the deadline, bound in self.bound
+                        path = []
+                        for path, _ in self.search_anytime(start, end, deadline) :
+                                pass
+                        return path
+
+                self.bound = 1.0
+                core = self._search_bidirectional if bidirectional else self._search
+                if self.cache is None :
+                        return core(start, end)
+
+                key = self.cache_key(start, end, bidirectional)
+                hit = self.cache.get(key, start)
+                if hit is not None :
+                        logger.info(f'Cached leg from {start} to {end}')
+                        return unpack_path(hit[1])
+
+                path = core(start, end)
+                if self.exact(bidirectional) :
+                        self.cache.put(key, path[-1].f if path else None, pack_path(path) if path else None)
+                return path
+
+        # restarting weighted A* (ARA*-style) : a quick inflated search first, then better paths with
+        # decreasing inflation while time remains. yields (path, suboptimality bound), the caller may stop
+        # at any point. a search cut by the deadline yields nothing, self.timed_out tells it from an unreachable end.
+        # self.stats sums up every pass
+        def search_anytime(
+                self,
+                start: "Position",
+                end: "Position",
+                deadline: Optional[float] = None,
+                weights: tuple = (3.0, 2.0, 1.5, 1.25, 1.0),
+                ):
+
+                if self.cache is not None :
+                        hit = self.cache.get(self.cache_key(start, end), start)
+                        if hit is not None : # only optimal legs are cached
+                                self.bound = 1.0
+                                if hit[1] is not None :
+                                        yield unpack_path(hit[1]), 1.0
+                                return
+
+                best = []
+                self.bound = float('inf')
+                self.timed_out = False
+                self.new_stats()
+                try :
+                        for w in weights :
+                                if deadline is not None and time.time() >= deadline :
+                                        self.timed_out = True
+                                        return
+                                self.weight, self.deadline = w, deadline
+                                self.timed_out = False
+                                path = self._search(start, end)
+                                if self.timed_out :
+                                        return
+                                if not path : # unreachable at any inflation
+                                        return
+                                path[-1].h /= w
+                                if not best or path[-1].g < best[-1].g :
+                                        best = path
+                                # every finished search tightens the bound, even without a cheaper path. a goal shot
+                                # may have ended it, then there is none
+                                self.bound = w if not self.analytic else float('inf')
+                                logger.info(f'Anytime path {best[-1].g:.2f} within {self.bound} of optimal')
+                                yield best, self.bound
+                                if self.cache is not None and self.exact() :
+                                        self.cache.put(self.cache_key(start, end), path[-1].f, pack_path(path))
+                finally :
+                        self.weight, self.deadline = 1.0, None
+
+        # True once the running search is past its deadline
+        def expired(self, expanded : int) -> bool :
+                if self.deadline is not None and expanded % 64 == 0 and time.time() >= self.deadline :
+                        self.timed_out = True
+                        logger.info('Search deadline reached')
+                        return True
+                return False
+
+        # the search mode is part of the key, a leg is only reused by a search run the same way
+        def cache_key(self, start : "Position", end : "Position", bidirectional : bool = False) -> tuple :
+                mode = (self.h_active, bidirectional, self.lazy, self.analytic)
+                return LegCache.key(start, end, self.map.layout_hash(), profile_key(), mode)
+
+        # whether the last search was optimal : full weight, finished in time, no goal shot and a search that
+        # settles the goal region exactly. only those paths go in the cache
+        def exact(self, bidirectional : bool = False) -> bool :
+                return self.weight == 1.0 and not self.timed_out and not bidirectional and not self.analytic
+
+        def _search(
+                self,
+                start: "Position",
+                end: "Position",
+                ) -> List["Node"]:
+
+                logger.info(f'Start search from {start} to {end}')
+                end_node = Node(end, end, 0, 0, None)
+                self.end = end
+                self.set_targets([end])
+                self.open = [Node(start.snap(), start, 0, 0, None)]
+                self.open_h = {} # index dictionary to remember best f per discrete cell
+                self.closed = set() # cells already expanded
+                self.by_state = {} # lazy mode : nodes queued per cell, see lazy_skip
+                self.queued = 0
+                self.set_bounds()
+                stats = self.stats
+
+                while self.open:
+                        stats.max_open = max(stats.max_open, len(self.open))
+                        node = heapq.heappop(self.open) # pop node with lowest f
+                        tup = node.pos.getPositionTuple()
+                        logger.debug(f'{node} {node.parent}')
+                        if self.lazy and self.lazy_skip(tup, node) :
+                                continue
+
+                        if self.goal(node.c_pos):
+                                logger.info(f'Found goal {end_node}')
+                                return self.reconstruct(node)
+
+                        # analytic expansion : finish early if a collision free goal shot exists
+                        stats.expanded += 1
+                        if self.trace is not None :
+                                self.trace(node.c_pos.x, node.c_pos.y, node.c_pos.theta, node.g, node.h)
+                        if self.expired(stats.expanded) :
+                                return []
+                        if self.analytic and stats.expanded % self.analytic == 0 :
+                                shot = self.goal_shot(node)
+                                if shot :
+                                        logger.info(f'Goal shot to {end_node}')
+                                        return shot
+
+                        self.closed.add(tup) # move to closed
+                        self.expand(node) 
+
+                        for o in self.open[:5]:
+                                logger.debug(f'{o.c_pos}, {o}')
+
+                logger.info(f'Unable to reach {end} from {start}')
+                return []
+
+
+        # bidirectional search on the lattice : a forward search from start and a backward one over the exact inverse
+        # of every primitive (the predecessor whose primitive lands on the state), meeting on a shared snapped state.
+        # the backward search grows from every lattice state in the goal bounds at once, each starting at its distance
+        # to end, so it covers the paths the forward search could end on. both reopen a state whenever its cost drops
+        # and the search stops once no unexplored path can beat the best join : an open set is empty, or the best join
+        # is no worse than the least g open forwards plus the least g open backwards. unlike an f-based stop this
+        # holds whatever the heuristic, so the result is as cheap as the forward search's on the same lattice.
+        # the joined moves are driven again from start, so the result is always a legal movement sequence ending in
+        # the goal bounds. falls back to _search for off-lattice headings or a join that fails
+        def _search_bidirectional(
+                self,
+                start: "Position",
+                end: "Position",
+                ) -> List["Node"]:
+
+                ts = heading_index(start.theta)
+                if ts is None or heading_index(end.theta) is None :
+                        return self._search(start, end)
+
+                logger.info(f'Start bidirectional search from {start} to {end}')
+                self.end = end
+                self.set_targets([end])
+                self.set_bounds()
+                table, w = self.table, self.weight
+                dths = [p.dth for p in table[0]]
+                state = lambda x, y, ti : (int(round(x / SNAP_COORD)), int(round(y / SNAP_COORD)), ti)
+
+                # state -> [g, x, y, heading index, parent state, primitive index, v, s]
+                # forward (v, s) : last move into the state, backward (v, s) : first move out of it, None in the goal bounds
+                s0 = state(start.x, start.y, ts)
+                fwd = {s0: [0.0, start.x, start.y, ts, None, None, 1, 0]}
+                bwd = {}
+                # open sets by f, and by g for the stop test. entries are (key, g, state), stale once g is not the state's
+                open_f, open_b = [(w * euclidean(start, end), 0.0, s0)], []
+                low_f, low_b = [(0.0, 0.0, s0)], []
+                for ti in range(N_HEADINGS) :
+                        for xi in range(int(ceil(self.x_bounds[0] / SNAP_COORD)), int(self.x_bounds[1] // SNAP_COORD) + 1) :
+                                for yi in range(int(ceil(self.y_bounds[0] / SNAP_COORD)), int(self.y_bounds[1] // SNAP_COORD) + 1) :
+                                        x, y = xi * SNAP_COORD, yi * SNAP_COORD
+                                        if 0 <= xi < NX and 0 <= yi < NY and self.goal(Position(x, y, heading_of(ti))) :
+                                                g = euclidean(Position(x, y, 0), end)
+                                                bwd[(xi, yi, ti)] = [g, x, y, ti, None, None, None, None]
+                                                open_b.append((g + w * euclidean(Position(x, y, 0), start), g, (xi, yi, ti)))
+                                                low_b.append((g, g, (xi, yi, ti)))
+                heapq.heapify(open_b)
+                heapq.heapify(low_b)
+                closed_f, closed_b = set(), set()
+                best, meet = float('inf'), None # cheapest joined cost, (state, join backward chain)
+                stats = self.stats
+
+                # least g still open in a direction, inf once it is exhausted
+                def least(low, seen, closed) :
+                        while low and (low[0][2] in closed or low[0][1] != seen[low[0][2]][0]) :
+                                heapq.heappop(low)
+                        return low[0][0] if low else float('inf')
+
+                while True :
+                        gf, gb = least(low_f, fwd, closed_f), least(low_b, bwd, closed_b)
+                        # an exhausted direction has joined with every path it could, no other path beats best any more
+                        if gf == float('inf') or gb == float('inf') or best <= gf + gb :
+                                break
+                        # grow the smaller frontier
+                        forward = len(open_f) <= len(open_b)
+                        heap, low, seen, closed, other = (open_f, low_f, fwd, closed_f, bwd) if forward else (open_b, low_b, bwd, closed_b, fwd)
+                        stats.max_open = max(stats.max_open, len(open_f) + len(open_b))
+                        f, g, s = heapq.heappop(heap)
+                        if s in closed or g != seen[s][0] :
+                                continue
+                        closed.add(s)
+                        stats.expanded += 1
+                        if self.expired(stats.expanded) :
+                                return []
+
+                        _, x, y, ti, _, _, v0, st0 = seen[s]
+                        if self.trace is not None :
+                                self.trace(x, y, heading_of(ti), g, f - g)
+                        for k, dth in enumerate(dths) :
+                                if forward :
+                                        p = table[ti][k]
+                                        ox, oy, ot = x, y, ti # pose the primitive starts from
+                                        nx, ny, nt = x + p.dx, y + p.dy, (ti + dth) % N_HEADINGS
+                                else :
+                                        nt = (ti - dth) % N_HEADINGS
+                                        p = table[nt][k]
+                                        nx, ny = x - p.dx, y - p.dy
+                                        ox, oy, ot = nx, ny, nt
+                                ns = state(nx, ny, nt)
+                                if not (0 <= ns[0] < NX and 0 <= ns[1] < NY) :
+                                        continue
+                                stats.generated += 1
+                                g2 = g + p.cost + (PENALTY_STOP if v0 is not None and (p.v, p.s) != (v0, st0) else 0)
+                                old = seen.get(ns)
+                                if old is not None and g2 >= old[0] :
+                                        continue
+                                if self.has_collision(Position(ox, oy, heading_of(ot)), p.move) :
+                                        continue
+                                if old is not None :
+                                        stats.reopened += 1
+                                        closed.discard(ns)
+                                seen[ns] = [g2, nx, ny, nt, s, k, p.v, p.s]
+                                h = euclidean(Position(nx, ny, 0), end if forward else start)
+                                heapq.heappush(heap, (g2 + w * h, g2, ns))
+                                heapq.heappush(low, (g2, g2, ns))
+
+                                # meeting : forward (v, s) into the state against backward (v, s) out of it. a goal state
+                                # joins through the check below, on the pose the forward search actually reached
+                                if ns in other :
+                                        f_, b_ = (seen[ns], other[ns]) if forward else (other[ns], seen[ns])
+                                        if b_[4] is not None :
+                                                cost = f_[0] + b_[0] + (PENALTY_STOP if (f_[6], f_[7]) != (b_[6], b_[7]) else 0)
+                                                if cost < best :
+                                                        best, meet = cost, (ns, True)
+                                # a forward state landing inside the goal bounds, at the cost the path reports
+                                if forward :
+                                        pos = Position(nx, ny, heading_of(nt))
+                                        cost = g2 + euclidean(pos, end)
+                                        if cost < best and self.goal(pos) :
+                                                best, meet = cost, (ns, False)
+
+                if meet is None :
+                        logger.info(f'Unable to reach {end} from {start}')
+                        return []
+
+                moves = []
+                s = meet[0]
+                while fwd[s][4] is not None :
+                        moves.append(table[0][fwd[s][5]].move)
+                        s = fwd[s][4]
+                moves.reverse()
+                s = meet[0]
+                while meet[1] and bwd[s][4] is not None :
+                        moves.append(table[0][bwd[s][5]].move)
+                        s = bwd[s][4]
+
+                last = self.drive(Node(start.snap(), start, 0, 0, None), moves)
+                if last is None or not self.goal(last.c_pos) :
+                        logger.info('Bidirectional join left the goal bounds, searching forward only')
+                        return self._search(start, end)
+                logger.info(f'Met after {stats.expanded} expansions, cost {last.f:.2f}')
+                return self.reconstruct(last)
+
+        # one-to-many search : a single expansion from start that runs until every goal
+        # (each with its own set_bounds region) is settled or the open set is exhausted
+        # returns one path per goal, [] for the unreachable ones
+        def search_many(
+                self,
+                start: "Position",
+                goals: List[Union["Position", List["Position"]]],
+                heuristic: Optional[str] = None,
+                ) -> List[List["Node"]]:
+
+                self.h_active = heuristic or self.h_mode
+                return self.instrumented(self._search_many_cached, start, goals)
+
+        # path to whichever of the goals is cheapest to reach, [] if none is : the search stops there,
+        # the others are never flooded for. goals_index tells which one the path ends at
+        def search_any(
+                self,
+                start: "Position",
+                goals: List["Position"],
+                heuristic: Optional[str] = None,
+                ) -> List["Node"]:
+
+                return self.search_many(start, [list(goals)], heuristic)[0]
+
+        # index of the first goal whose bounds hold pos, None if there is none
+        @classmethod
+        def goals_index(cls, pos : "Position", goals : List["Position"]) -> Optional[int] :
+                for i, end in enumerate(goals) :
+                        if cls.in_goal(pos, end, *cls.bounds(end)) :
+                                return i
+                return None
+
+        # goals without the ones lying in the bounds of an earlier goal, a search would stop at that one anyway
+        @classmethod
+        def distinct_goals(cls, goals : List["Position"]) -> List["Position"] :
+                kept = []
+                for end in goals :
+                        if cls.goals_index(end, kept) is None :
+                                kept.append(end)
+                return kept
+
+        def _search_many_cached(self, start : "Position", goals : List[Union["Position", List["Position"]]]) -> List[List["Node"]] :
+                results = [[] for _ in goals]
+                todo = list(range(len(goals)))
+                if self.cache is not None :
+                        keys = [self.cache_key(start, end) for end in goals]
+                        hits = {k : self.cache.get(keys[k], start) for k in todo}
+                        for k, hit in hits.items() :
+                                if hit is not None :
+                                        results[k] = unpack_path(hit[1])
+                        todo = [k for k in todo if hits[k] is None]
+
+                if todo :
+                        found = self._search_many(start, [goals[k] for k in todo])
+                        for k, path in zip(todo, found) :
+                                results[k] = path
+                                if self.cache is not None and self.exact() :
+                                        self.cache.put(keys[k], path[-1].f if path else None, pack_path(path) if path else None)
+                return results
+
+        def _search_many(
+                self,
+                start: "Position",
+                goals: List[Union["Position", List["Position"]]],
+                ) -> List[List["Node"]]:
+
+                logger.info(f'Start search from {start} to {len(goals)} goals')
+                # members of every goal with their bounds, best first within a group
+                members = [end if isinstance(end, list) else [end] for end in goals]
+                bounds = [[self.bounds(end) for end in group] for group in members]
+                remaining = list(range(len(goals)))
+                results = [[] for _ in goals]
+                self.end = members[0][0]
+                self.set_targets(list(goals))
+                self.open = [Node(start.snap(), start, 0, 0, None)]
+                self.open_h = {}
+                self.closed = set()
+                self.by_state = {}
+                self.queued = 0
+                self.timed_out = False
+                stats = self.stats
+
+                while self.open and remaining:
+                        stats.max_open = max(stats.max_open, len(self.open))
+                        node = heapq.heappop(self.open)
+                        tup = node.pos.getPositionTuple()
+                        if self.lazy and self.lazy_skip(tup, node) :
+                                continue
+                        stats.expanded += 1
+                        if self.trace is not None :
+                                self.trace(node.c_pos.x, node.c_pos.y, node.c_pos.theta, node.g, node.h)
+                        if self.expired(stats.expanded) :
+                                break
+
+                        reached = []
+                        for k in remaining :
+                                for end, b in zip(members[k], bounds[k]) :
+                                        if self.in_goal(node.c_pos, end, *b) :
+                                                reached.append((k, end))
+                                                break
+                        if reached :
+                                for k, end in reached :
+                                        # cost reported the same way as a point-to-point search
+                                        last = node.cloneNode()
+                                        last.h = euclidean(node.c_pos, end)
+                                        results[k] = self.reconstruct(last)
+                                        remaining.remove(k)
+                                        logger.info(f'Found goal {k} ({last.f:.2f})')
+                                if not remaining :
+                                        break
+
+                                # the heuristic only grows as goals settle : re-key the open set. lazy mode first drops
+                                # the nodes eager checking would not have queued. the rest are its open set, expanded
+                                # whatever their new f (seq -1), and the only earlier nodes later ones are held against
+                                self.set_targets([goals[k] for k in remaining])
+                                if self.lazy :
+                                        self.open = [o for o in self.open if not self.lazy_skip(o.pos.getPositionTuple(), o)]
+                                        self.by_state = {}
+                                        for o in self.open :
+                                                o.seq = -1
+                                self.open_h = {}
+                                for o in self.open :
+                                        o.h = self.weight * self.heuristic(o.c_pos)
+                                        t = o.pos.getPositionTuple()
+                                        if t not in self.open_h or o.f < self.open_h[t] :
+                                                self.open_h[t] = o.f
+                                        if self.lazy :
+                                                self.by_state.setdefault(t, []).append(o)
+                                heapq.heapify(self.open)
+
+                        self.closed.add(tup)
+                        self.expand(node)
+
+                for k in remaining :
+                        logger.info(f'Unable to reach {members[k][0]} from {start}')
+                return results
+
+
+        def reconstruct(  # constructing path from start to goal in result
+                self,
+                last: "Node"
+                ) -> List["Node"]:
+                result = []
+
+                while last:
+                        result.append(last)
+                        last = last.parent
+
+                return result[::-1]
+
+        # drive a sequence of movements from node, None if one of them collides
+        def drive(self, node : "Node", moves : List[Movement]) -> Optional["Node"] :
+                for mv in moves :
+                        v, s, d, f = self.by_move[mv]
+                        if self.has_collision(node.c_pos, mv) :
+                                return None
+                        c_pos = f(node.c_pos)
+                        penalty = PENALTY_STOP if (v != node.v or s != node.s) else 0
+                        node = Node(c_pos.snap(), c_pos, node.g + penalty + d, euclidean(c_pos, self.end), node, v, s, d)
+                return node
+
+        # cheapest straight / straight-turn-straight shot from node into the goal bounds, [] if none
+        def goal_shot(self, node : "Node") -> List["Node"] :
+                best = None
+                for moves in goal_shots(node.c_pos, self.end) :
+                        last = self.drive(node, moves)
+                        if last is not None and self.goal(last.c_pos) and (best is None or last.g < best.g) :
+                                best = last
+                return self.reconstruct(best) if best else []
+
+        # re-simulate the moves of a known leg from another start pose
+        # returns [] if the replayed leg collides or no longer ends inside the goal bounds
+        def replay(
+                self,
+                start: "Position",
+                end: "Position",
+                path: List["Node"]
+                ) -> List["Node"]:
+                self.end = end
+                self.set_bounds()
+                last = self.drive(Node(start.snap(), start, 0, 0, None), [self.move_of[(n.v, n.s)][1] for n in path[1:]])
+                return self.reconstruct(last) if last is not None and self.goal(last.c_pos) else []
+
+
+
+# index of a queued entry that never orders before another one : entries equal in (f, h, state) stay as
+# unordered as the object core's Nodes are, so the heap pops them in the same order
+class _Entry(int) :
+        __slots__ = ()
+
+        def __lt__(self, other) -> bool :
+                return False
+
+
+# search core on packed integer states : state = (x index * NY + y index) * N_HEADINGS + heading index
+# the closed set and best f per state are flat preallocated arrays, and every queued entry is a record in
+# flat arrays instead of a Node : the same entries the object core queues, popped in the same order
+# (f, h, then state, which orders like the snapped x, y, theta), so both return the same paths.
+# Nodes are only built for the returned path
+class CompactAstar(Astar) :
+
+        N_STATES = NX * NY * N_HEADINGS
+        records = None # entry arrays of the running search, see _search
+
+        def state(self, x : float, y : float, ti : int) -> int :
+                return (int(round(x / SNAP_COORD)) * NY + int(round(y / SNAP_COORD))) * N_HEADINGS + ti
+
+        def _search(
+                self,
+                start: "Position",
+                end: "Position",
+                ) -> List["Node"]:
+
+                t0 = heading_index(start.theta)
+                if t0 is None : # off-lattice heading : the object core handles it
+                        return super()._search(start, end)
+
+                logger.info(f'Start compact search from {start} to {end}')
+                self.end = end
+                self.set_targets([end])
+                self.set_bounds()
+                x_lo, x_hi = self.x_bounds
+                y_lo, y_hi = self.y_bounds
+                euclid = self.h_active == "euclidean"
+                ex, ey = end.x, end.y
+
+                n = self.N_STATES
+                s0 = self.state(start.x, start.y, t0)
+                if not 0 <= s0 < n :
+                        logger.info(f'Start {start} is off the map')
+                        return []
+                closed = bytearray(n)
+                best_f = array('d', [float('nan')]) * n # nan : never queued, every f is queued then (even inf)
+
+                # one record per queued entry, as the object core has one Node per push : state, parent entry,
+                # continuous pose, g, h, last motion, step length and primitive index (for lazy checks)
+                rec = self.records = {
+                        "state": array('i', [s0]), "parent": array('i', [-1]),
+                        "x": array('d', [start.x]), "y": array('d', [start.y]), "theta": array('d', [start.theta]),
+                        "g": array('d', [0.0]), "h": array('d', [0.0]),
+                        "v": array('b', [1]), "s": array('b', [0]), "d": array('d', [0.0]), "k": array('b', [-1]),
+                }
+                e_state, e_parent, e_x, e_y, e_theta = rec["state"], rec["parent"], rec["x"], rec["y"], rec["theta"]
+                e_g, e_h, e_v, e_s, e_d, e_k = rec["g"], rec["h"], rec["v"], rec["s"], rec["d"], rec["k"]
+
+                open_heap = [(0.0, 0.0, s0, _Entry(0))]
+                stats = self.stats
+                w = self.weight
+                table = self.table
+                lazy = self.lazy
+                queued = {} # lazy mode : entries queued per state, see lazy_skip
+
+                # lazy mode : whether the move into entry i collides, the start entry never does
+                def entry_collides(i : int) -> bool :
+                        p = e_parent[i]
+                        return p >= 0 and self.collides(Position(e_x[p], e_y[p], e_theta[p]), table[e_state[p] % N_HEADINGS][e_k[i]].move)
+
+                while open_heap :
+                        stats.max_open = max(stats.max_open, len(open_heap))
+                        f, h, s, e = heapq.heappop(open_heap)
+                        # like the object core, a closed state is expanded again when a costlier entry for it comes up :
+                        # the state leaves out the last motion, which the stop penalty depends on. lazy mode drops the
+                        # entries eager checking would not have queued (lazy_skip), entry indices are the queueing order
+                        if lazy :
+                                if s < 0 or entry_collides(e) :
+                                        continue
+                                if any(i < e and e_g[i] + e_h[i] <= f and not entry_collides(i) for i in queued.get(s, ())) :
+                                        continue
+
+                        ti = s % N_HEADINGS
+                        x, y, theta = e_x[e], e_y[e], e_theta[e]
+                        if x_lo <= x <= x_hi and y_lo <= y <= y_hi and abs(end.theta - theta) % (2 * pi) <= MAX_THETA_ERR :
+                                logger.info(f'Found goal {end}')
+                                return self.compact_path(e)
+
+                        stats.expanded += 1
+                        if self.trace is not None :
+                                self.trace(x, y, theta, e_g[e], h)
+                        if self.expired(stats.expanded) :
+                                return []
+                        if self.analytic and stats.expanded % self.analytic == 0 :
+                                shot = self.goal_shot(self.compact_path(e)[-1])
+                                if shot :
+                                        logger.info(f'Goal shot to {end}')
+                                        return shot
+
+                        closed[s] = 1
+                        pos = Position(x, y, theta)
+                        g0, v0, st0 = e_g[e], e_v[e], e_s[e]
+                        for k, p in enumerate(table[ti]) :
+                                nx = x + p.dx
+                                ny = y + p.dy
+                                xi = int(round(nx / SNAP_COORD))
+                                yi = int(round(ny / SNAP_COORD))
+                                nt = (ti + p.dth) % N_HEADINGS
+                                # off the map : never free, but the object core queues such a move in lazy mode and
+                                # drops it when popped, so it is queued here as well (state -1) to keep the heaps alike
+                                ns = (xi * NY + yi) * N_HEADINGS + nt if 0 <= xi < NX and 0 <= yi < NY else -1
+                                if ns >= 0 and closed[ns] :
+                                        continue
+                                stats.generated += 1
+                                if not lazy and (ns < 0 or self.collides(pos, p.move)) :
+                                        continue
+
+                                # summed in the object core's order, so equal f ties break the same way
+                                g = g0 + (PENALTY_STOP if (p.v != v0 or p.s != st0) else 0) + p.cost
+                                ntheta = heading_of(nt)
+                                nh = w * (((nx - ex)**2 + (ny - ey)**2)**.5 if euclid else self.heuristic(Position(nx, ny, ntheta)))
+                                nf = g + nh
+                                if ns >= 0 and not nf >= best_f[ns] :
+                                        if best_f[ns] == best_f[ns] :
+                                                stats.reopened += 1
+                                        best_f[ns] = nf
+                                elif not lazy : # lazy mode queues every unchecked successor
+                                        continue
+                                e_state.append(ns)
+                                e_parent.append(e)
+                                e_x.append(nx)
+                                e_y.append(ny)
+                                e_theta.append(ntheta)
+                                e_g.append(g)
+                                e_h.append(nh)
+                                e_v.append(p.v)
+                                e_s.append(p.s)
+                                e_d.append(p.cost)
+                                e_k.append(k)
+                                heapq.heappush(open_heap, (nf, nh, ns, _Entry(len(e_state) - 1)))
+                                if lazy and ns >= 0 :
+                                        queued.setdefault(ns, []).append(len(e_state) - 1)
+
+                logger.info(f'Unable to reach {end} from {start}')
+                return []
+
+        # Node list for the entry chain ending at e
+        def compact_path(self, e : int) -> List["Node"] :
+                rec = self.records
+                chain = []
+                while e != -1 :
+                        chain.append(e)
+                        e = rec["parent"][e]
+
+                result = []
+                node = None
+                for e in reversed(chain) :
+                        c_pos = Position(rec["x"][e], rec["y"][e], rec["theta"][e])
+                        node = Node(c_pos.snap(), c_pos, rec["g"][e], rec["h"][e], node, rec["v"][e], rec["s"][e], rec["d"][e])
+                        result.append(node)
+                return result
@@ -0,0 +1,286 @@
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import time
+from typing import Iterator, List, Optional, Set
+
+from Commons.Enums import Direction
+from Commons.Types import Position
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Cache import LegCache
+from Path_Algo.Hamiltonian import ExhaustiveSearch, TourSearch, nearest_legs, nearest_order
+from Robot_Movements.Commands import compile_path, encode
+
+logger = logging.getLogger('BATCH')
+
+PLANNERS = ("exhaustive", "tour", "knn")
+
+# input : layouts as JSON lines {"id": "run-17", "start": [x, y, theta], "obstacles": [[x, y, "NORTH"], ...]},
+#         a JSON list of them, or a Bench result file (its "scenarios"). a layout without id is named by its index
+#
+# output : one JSON line per layout, appended as soon as it is planned
+#   {"id", "order": [node indices, 0 is the start], "cost": sum of the leg costs the order was chosen on
+#    (path[-1].f of each leg, as in the edge matrix), "unreachable": legs not planned,
+#    "timed_out": legs the budget left within "bound" of optimal instead of optimal,
+#    "commands": ["FW010,FR090,...", ...] per leg, "ms", "expanded"}  or  {"id", "error": message}
+#   timed_out, bound and expanded are None for the knn planner
+#   a layout already in the output is skipped, so an interrupted run resumes where it stopped. the layouts are
+#   planned side by side, records come out in the order they finish
+
+
+class Layout :
+    # one recorded arena : obstacles as (x, y, facing) and the robot start
+
+    def __init__(self, record : dict, index : int) :
+        self.id = str(record.get("id", index))
+        self.start = Position(*map(float, record["start"]))
+        self.layout = [(float(x), float(y), _facing(f)) for x, y, f in record.get("obstacles", [])]
+
+    # a fresh map per layout, planners never share obstacle objects
+    def map(self) -> Map :
+        return Map([Obstacle(x, y, facing) for x, y, facing in self.layout])
+
+
+def _facing(f) -> Direction :
+    return Direction[f] if isinstance(f, str) else Direction(int(f))
+
+
+def read_layouts(path : str) -> List[Layout] :
+    with open(path) as f :
+        text = f.read()
+    try :
+        data = json.loads(text)
+    except ValueError :
+        data = None # JSON lines
+    if isinstance(data, dict) and "scenarios" in data :
+        records = data["scenarios"]
+    elif isinstance(data, list) :
+        records = data
+    else :
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    layouts = [Layout(record, i) for i, record in enumerate(records)]
+    if len({layout.id for layout in layouts}) != len(layouts) :
+        raise ValueError(f'Layout ids in {path} are not unique, a resumed run could not tell them apart')
+    return layouts
+
+
+# ids already written to out. a line cut short by an interruption is dropped from the file
+def finished(out : str) -> Set[str] :
+    done = set()
+    if not os.path.exists(out) :
+        return done
+    keep = 0
+    with open(out, 'rb') as f :
+        for line in f :
+            try :
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError) :
+                break
+            keep += len(line)
+            if not line.endswith(b'\n') :
+                break
+    if keep < os.path.getsize(out) :
+        logger.warning(f'Dropping an incomplete record at the end of {out}')
+        with open(out, 'r+b') as f :
+            f.truncate(keep)
+    if keep and done :
+        with open(out, 'rb') as f :
+            f.seek(keep - 1)
+            if f.read(1) != b'\n' :
+                with open(out, 'ab') as g :
+                    g.write(b'\n')
+    return done
+
+
+# one layout planned in this process, its searches too
+def plan_layout(layout : Layout, planner : str = "exhaustive", cache : Optional[LegCache] = None,
+                lazy : bool = False, budget : Optional[float] = None) -> dict :
+    st = time.perf_counter()
+    mp = layout.map()
+    expanded = timed_out = bound = None
+    if planner == "knn" :
+        order = nearest_order(mp, layout.start)
+        legs = list(nearest_legs(mp, layout.start, order, cache))
+    else :
+        cls = TourSearch if planner == "tour" else ExhaustiveSearch
+        search = cls(mp, layout.start, n=0, cache=cache, lazy=lazy)
+        deadline = time.time() + budget if budget is not None else None
+        order, legs = search.search(deadline=deadline)
+        expanded = search.stats.expanded
+        route = set(zip(order, order[1:]))
+        timed_out = sum(tuple(edge) in route for edge in search.timed_out)
+        bound = search.bound
+    planned = [leg for leg in legs if leg]
+    return {
+        "id": layout.id,
+        "order": order,
+        "cost": sum(leg[-1].f for leg in planned),
+        "unreachable": len(mp.obstacles) - len(planned),
+        "timed_out": timed_out,
+        "bound": bound,
+        "commands": [encode(compile_path(leg)) for leg in legs],
+        "ms": round((time.perf_counter() - st) * 1000, 1),
+        "expanded": expanded,
+    }
+
+
+class LayoutProcess(mp.Process) :
+    # plans whole layouts from todo and puts (layout id, record, legs it added to its cache) in done.
+    # the cache starts as a copy of the batch's, legs come back so the batch cache can keep them
+
+    def __init__(self, todo : mp.Queue, done : mp.Queue, i : int, planner : str, lazy : bool,
+                 budget : Optional[float], entries : list) :
+        super().__init__()
+        self.todo = todo
+        self.done = done
+        self.i = i
+        self.planner = planner
+        self.lazy = lazy
+        self.budget = budget
+        self.entries = entries
+
+    def run(self) :
+        signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl-C is the parent's, it shuts the workers down
+        cache = LegCache()
+        for key, value in self.entries :
+            cache.put(key, *value)
+        known = set(cache.entries)
+        while 1 :
+            layout = self.todo.get()
+            if layout is None :
+                break
+            try :
+                record = plan_layout(layout, self.planner, cache, self.lazy, self.budget)
+            except Exception as e :
+                logger.exception(f'Planning {layout.id} failed')
+                record = {"id": layout.id, "error": str(e)}
+            added = [(key, value) for key, value in cache.entries.items() if key not in known]
+            known.update(key for key, _ in added)
+            self.done.put((layout.id, record, added))
+
+
+# plans many layouts with one set of worker processes and one leg cache : the workers are started once and each
+# plans whole layouts in turn, so a batch keeps every core busy whatever the size of a layout. a layout's own
+# searches run one after the other in its worker
+class BatchPlanner :
+
+    def __init__(self, planner : str = "exhaustive", workers : Optional[int] = None, cache : Optional[LegCache] = None,
+                 lazy : bool = False, budget : Optional[float] = None) :
+        if planner not in PLANNERS :
+            raise ValueError(f'Unknown planner {planner}, expected one of {PLANNERS}')
+        self.planner = planner
+        self.cache = LegCache() if cache is None else cache
+        self.lazy = lazy
+        self.budget = budget # seconds per layout, weighted A* with a deadline when set
+        self.todo = mp.Queue()
+        self.done = mp.Queue()
+        with self.cache.lock :
+            entries = list(self.cache.entries.items())
+        self.workers = [LayoutProcess(self.todo, self.done, i, planner, lazy, budget, entries)
+                        for i in range(workers or os.cpu_count())]
+        for p in self.workers :
+            p.daemon = True
+            p.start()
+
+    # one layout in this process, with the batch cache
+    def plan(self, layout : Layout) -> dict :
+        return plan_layout(layout, self.planner, self.cache, self.lazy, self.budget)
+
+    # plan every layout not in out yet, appending one line per layout. returns the number planned
+    # at most one layout per worker is queued, so an interrupted run only waits for the ones being planned
+    def run(self, layouts : List[Layout], out : str) -> int :
+        done = finished(out)
+        todo = [layout for layout in layouts if layout.id not in done]
+        logger.info(f'{len(layouts) - len(todo)} layouts already in {out}, {len(todo)} to plan')
+        queued = iter(todo)
+        for _ in range(min(len(todo), len(self.workers))) :
+            self.todo.put(next(queued))
+        with open(out, 'a') as f :
+            for i in range(len(todo)) :
+                layout_id, record, added = self._result()
+                for key, value in added :
+                    self.cache.put(key, *value)
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+                f.flush()
+                logger.info(f'{i + 1}/{len(todo)} {layout_id} done')
+                layout = next(queued, None)
+                if layout is not None :
+                    self.todo.put(layout)
+        return len(todo)
+
+    # next finished layout, a worker that died takes the batch down instead of hanging it
+    def _result(self) -> tuple :
+        while 1 :
+            try :
+                return self.done.get(timeout=1)
+            except queue.Empty :
+                dead = [p.i for p in self.workers if not p.is_alive()]
+                if dead :
+                    raise RuntimeError(f'Batch workers {dead} died')
+
+    def close(self, timeout : float = 5) :
+        for _ in self.workers :
+            self.todo.put(None)
+        for p in self.workers :
+            p.join(timeout)
+            if p.is_alive() :
+                logger.warning(f'Terminating batch worker {p.i}')
+                p.terminate()
+        self.workers = []
+
+    def __enter__(self) -> "BatchPlanner" :
+        return self
+
+    def __exit__(self, *exc) :
+        self.close()
+
+
+def iter_results(out : str) -> Iterator[dict] :
+    with open(out) as f :
+        for line in f :
+            if line.strip() :
+                yield json.loads(line)
+
+
+def main(argv : List[str] = None) -> int :
+    parser = argparse.ArgumentParser(description='Plan a file of recorded layouts with one shared worker pool')
+    parser.add_argument('layouts', help='layouts as JSON lines, a JSON list or a Bench result file')
+    parser.add_argument('--out', default='batch_output.jsonl', help='results as JSON lines, resumed if it exists')
+    parser.add_argument('--planner', choices=PLANNERS, default="exhaustive")
+    parser.add_argument('--workers', type=int, default=None, help='planner pool size, every core by default')
+    parser.add_argument('--cache', default=None, help='leg cache file, loaded now and saved on exit')
+    parser.add_argument('--budget', type=float, default=None, help='seconds per layout (weighted A* with a deadline)')
+    parser.add_argument('--lazy', action='store_true', help='lazy collision checking in the A* searches')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    layouts = read_layouts(args.layouts)
+    cache = LegCache(path=args.cache)
+    st = time.time()
+    planned = 0
+    try :
+        with BatchPlanner(args.planner, args.workers, cache, args.lazy, args.budget) as batch :
+            planned = batch.run(layouts, args.out)
+    except KeyboardInterrupt :
+        print('Interrupted, run again with the same --out to resume')
+        return 130
+    finally :
+        cache.save()
+
+    results = list(iter_results(args.out))
+    failed = sum("error" in r for r in results)
+    unreachable = sum(r.get("unreachable") or 0 for r in results)
+    timed_out = sum(r.get("timed_out") or 0 for r in results)
+    print(f'{planned} layouts planned in {time.time() - st:.1f} s, {len(results)}/{len(layouts)} in {args.out}'
+          f' ({failed} failed, {unreachable} unreachable legs, {timed_out} legs cut short by the budget)')
+    return 0
+
+
+if __name__ == '__main__' :
+    sys.exit(main())
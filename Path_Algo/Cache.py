@@ -0,0 +1,103 @@
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from math import pi
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from Commons.Types import Position
+
+logger = logging.getLogger('LEG CACHE')
+
+
+def _pose(pos : Position) -> tuple :
+    return (round(pos.x, 6), round(pos.y, 6), round(pos.theta % (2*pi), 6))
+
+
+# whether a packed path (see Astar.pack_path) begins at pos, an unreachable leg has no path to check
+def _starts_at(packed : Optional[np.ndarray], pos : Position) -> bool :
+    if packed is None :
+        return True
+    x, y, theta = packed[0, :3]
+    dth = (theta - pos.theta + pi) % (2*pi) - pi
+    return abs(x - pos.x) < 1e-6 and abs(y - pos.y) < 1e-6 and abs(dth) < 1e-6
+
+
+class LegCache :
+    # LRU cache of A* leg results, keyed on content :
+    # (start pose, goal pose, obstacle layout hash, calibration profile key, search mode)
+    # values are (cost, packed path) with packed path None when the goal is unreachable.
+    # only optimal legs belong here (see Astar.exact), a hit stands in for a fresh search
+
+    def __init__(self, capacity : int = 4096, path : Optional[str] = None) :
+        self.capacity = capacity
+        self.path = path # optional on-disk file, loaded now and written by save()
+        self.entries = OrderedDict()
+        self.lock = threading.Lock() # concurrent planning runs share one cache from their own threads
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path) :
+            self.load()
+
+    # end may be a group of goal poses (see Astar.search_many), keyed on all of them in order.
+    # the start is kept exact, not snapped : a cached path begins at the pose it was searched from
+    # mode : how the leg was searched, e.g. (heuristic, bidirectional, lazy, analytic)
+    @staticmethod
+    def key(start : Position, end : Union[Position, List[Position]], layout : str, profile : str, mode : tuple = ()) -> tuple :
+        if isinstance(end, list) :
+            goal = tuple(_pose(e) for e in end)
+        else :
+            goal = _pose(end)
+        return (_pose(start), goal, layout, profile, mode)
+
+    # start : the pose the caller searches from, an entry whose path begins elsewhere is dropped as a miss
+    def get(self, key : tuple, start : Optional[Position] = None) -> Optional[Tuple[float, Optional[np.ndarray]]] :
+        with self.lock :
+            value = self.entries.get(key)
+            if value is not None and start is not None and not _starts_at(value[1], start) :
+                logger.warning(f'Dropping a cached leg that does not start at {start.getPositionString()}')
+                del self.entries[key]
+                value = None
+            if value is None :
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key : tuple, cost : float, packed : Optional[np.ndarray]) :
+        with self.lock :
+            self.entries[key] = (cost, packed)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity :
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int :
+        return len(self.entries)
+
+    def __contains__(self, key : tuple) -> bool :
+        return key in self.entries
+
+    def load(self) :
+        try :
+            with open(self.path, 'rb') as f :
+                entries = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e :
+            logger.warning(f'Ignoring unreadable cache {self.path}: {e}')
+            return
+        for key, value in entries :
+            self.put(key, *value)
+        logger.info(f'Loaded {len(self.entries)} legs from {self.path}')
+
+    def save(self) :
+        if not self.path :
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'wb') as f :
+            with self.lock :
+                entries = list(self.entries.items())
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path) # never leave a half written cache behind
@@ -1 +1,38 @@
-
+from math import cos, sin, pi
+from typing import List
+
+from Commons.Constants import DIST_FW, MAX_THETA_ERR, SNAP_THETA
+from Commons.Enums import Movement
+from Commons.Types import Position
+from Robot_Movements.Primitives import heading_index, primitive_table
+
+
+# ANALYTIC GOAL SHOTS
+# the robot can only drive its calibrated primitives, so a goal shot is the lattice analogue of a
+# Dubins word : a straight run (S) or straight run, one quarter turn, straight run (SCS)
+# returns candidate movement sequences from start that end on top of end, best effort within a step.
+# a shot is no shortest path : the search that takes one stops there, see Astar.analytic
+
+def goal_shots(start: Position, end: Position) -> List[List[Movement]]:
+    idx = heading_index(start.theta)
+    if idx is None:
+        return []
+    dx, dy = end.x - start.x, end.y - start.y
+    ux, uy = cos(start.theta), sin(start.theta)
+    shots = []
+
+    def run(length: float) -> List[Movement]:
+        return [Movement.FWD if length > 0 else Movement.BWD] * int(round(abs(length) / DIST_FW))
+
+    dtheta = (end.theta - start.theta + pi) % (2*pi) - pi
+    if abs(dtheta) <= MAX_THETA_ERR:
+        shots.append(run(dx*ux + dy*uy))
+
+    for p in primitive_table()[idx]:
+        if p.dth == 0 or abs((dtheta - p.dth * SNAP_THETA / 180 * pi + pi) % (2*pi) - pi) > MAX_THETA_ERR:
+            continue
+        vx, vy = cos(start.theta + p.dth * SNAP_THETA / 180 * pi), sin(start.theta + p.dth * SNAP_THETA / 180 * pi)
+        rx, ry = dx - p.dx, dy - p.dy
+        # the two straight runs are along perpendicular headings, so they separate by projection
+        shots.append(run(rx*ux + ry*uy) + [p.move] + run(rx*vx + ry*vy))
+    return shots
@@ -1,185 +1,629 @@
-import heapq
-import logging
-import multiprocessing as mp #run independent work processes in prarallel
-import time
-import queue
-from typing import List
-from Path_Algo import Astar
-
-from Commons.Utils import euclidean
-from Commons.Types import Position
-
-logger = logging.getLogger('HAMILTONIAN PATH')
-
-def k_nearest_neighour(mp : "Map", source : "Position" ) : 
-    aStar = Astar(mp)
-    path = [source] + [obstacle.to_pos() for obstacle in mp.obstacles]
-
-    for i in range(1,len(path)) :
-        nearest_dist = float('inf')
-        nearest_dist_index = -1
-
-        for j in range(i, len(path)) :
-            dist = euclidean(path[i-1], path[j]) # distance from last fixed point to candidate j
-            if dist < nearest_dist :
-                nearest_dist = dist
-                nearest_dist_index = j
-
-        # swap the nearest neighbor with the current position
-        if nearest_dist_index != -1:
-            path[i], path[nearest_dist_index] = path[nearest_dist_index], path[i]
-
-    result = []
-    previous = source
-    for i in range(1,len(path)) :
-        result.append(Astar.search(previous,path[i]))
-        previous = result[-1][-1].c_pos
-    return result # shortest path using greedy search 
-
-# Generate all permutations of [0, 1, ..., n-1]
-def permutate(n: int, start_from_zero: bool) -> List[List[int]]:
-    if n ==0 :
-        return [[]] if not start_from_zero else []
-    
-    result = List[List[int]] = []
-    used = [False] * n
-    curr: List[int] = []
-
-    def helper():
-        if len(curr) == n:
-            result.append(curr)
-            return
-        for i in range(n):
-            if not used[i] :
-                used[i] = True
-                curr.append(i)
-                helper()
-                curr.pop()
-                used[i] = False
-
-    helper([])
-
-    if start_from_zero:
-        result = [p for p in result if p[0] == 0]
-    return result
-
-
-class SearchProcess(mp.Process):
-    def __init__(
-        self,
-        pos: List["Position"],
-        astar: Astar,
-        todo: mp.Queue,
-        done: mp.Queue,
-        i:int
-    ):
-        super().__init__()
-        self.astar = astar
-        self.pos = pos
-        self.todo = todo
-        self.done = done
-        self.i = i
-        logger.info(f'Spawning P{i}')
-
-
-    # search for the shortest path between two points
-    def search(
-        self,
-        start: int,
-        end: int
-    ) -> float:
-        logger.info(f'P{self.i} start search {start, end}')
-        path = self.astar.search(self.pos[start], self.pos[end])
-        return path[-1].f if path else 99999
-        
-    # run the process to get tasks from the todo queue and put results in the done queue
-    def run(self):
-        while 1:
-            try:
-                st, end = self.todo.get()
-                self.done.put((st, end, self.search(st, end)))
-            except:
-                logger.info(f'P{self.i} finished')
-                return
-
-
-class ExhaustiveSearch:
-
-    def __init__(
-        self,
-        map: "Map", 
-        src: "Position",
-        n: int = 8
-    ):
-        self.astar = Astar(map)
-        self.src = src
-        self.pos = [src] + [o.to_pos() for o in map.obstacles]
-        self.n = n
-
-    # obtains cost of pair of nodes from todo
-    def search(self, top_n: int = 3):
-        st = time.time()
-        n = len(self.pos)
-        m = int(n*n - n)
-        perms = permutate(n, True)
-        edges = [[0 for _ in range(n)] for _ in range(n)]
-        todo = mp.Queue()
-        done = mp.Queue()
-
-        for r in range(n):
-            for c in range(n):
-                if r != c:
-                    todo.put((r, c)) 
-
-        for i in range(self.n):
-            p = SearchProcess(self.pos, self.astar, todo, done, i)
-            p.daemon = True
-            p.start()
-
-        while m:
-            r, c, f = done.get()
-            edges[r][c] = f
-            logger.info(f'{r} -> {c} ({f})')
-            m -= 1
-        logger.info(f'Adj list completed in {time.time()-st} s')
-
-        # get shortest path (lowest cost)
-        h = []
-        for i, perm in enumerate(perms):
-            cost = sum([edges[perm[i]][perm[i+1]] for i in range(n-1)])
-            heapq.heappush(h, (cost, perm)) # cheapest permutation godes first
-
-        loc_mn_path = []
-        loc_mn_f = float('inf')
-        min_perm = []
-        for _ in range(min(top_n, len(h))):
-
-            path = []
-            prev = self.pos[0]
-            cost, perm = heapq.heappop(h)
-            f = 0
-            logger.info(f'Calculating path for {perm}')
-
-            for i in range(1, n):
-                segment = self.astar.search(prev, self.pos[perm[i]])
-
-                if segment:
-                    path.append(segment)
-                    prev = segment[-1].c_pos
-                    f += segment[-1].f
-                else:
-                    f += 99999
-
-                if f > loc_mn_f:
-                    break
-
-            if f < loc_mn_f:
-                loc_mn_f = f
-                loc_mn_path = path
-                min_perm = perm
-            if f < 99999:
-                return perm, path
-        
-        return min_perm, loc_mn_path
-
-
+import heapq
+import logging
+import multiprocessing as mp #run independent work processes in prarallel
+import threading
+import time
+import queue
+import signal
+from multiprocessing import shared_memory
+from typing import Iterator, List, Tuple
+import numpy as np
+from Path_Algo.Astar import Astar, pack_path, unpack_path
+from Path_Algo.Cache import LegCache
+from Path_Algo.Stats import SearchStats
+from Path_Algo.Streaming import RouteStream
+from Path_Algo.Tour import assignment_bound, optimise
+
+from Commons.Utils import euclidean
+from Commons.Enums import Direction
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+
+logger = logging.getLogger('HAMILTONIAN PATH')
+
+# candidate viewing poses searched per obstacle, see view_poses
+VIEWS = 4
+
+# weights a deadline-bound edge matrix is refined through once it is complete, see ExhaustiveSearch.refine
+WEIGHTS = (1.5, 1.25, 1.0)
+
+
+# valid viewing poses of an obstacle, best first, without the ones a search would never stop at
+# (they lie in the goal bounds of a better one). to_pos alone when none is valid
+def view_poses(mp : "Map", obstacle : "Obstacle", limit : int = VIEWS) -> List["Position"] :
+    return Astar.distinct_goals(mp.view_poses(obstacle))[:limit] or [obstacle.to_pos()]
+
+
+# visit order of the nearest-neighbour tour, greedy on the straight-line distance between
+# the nominal viewing poses : node indices as in ExhaustiveSearch, 0 is the source
+def nearest_order(mp : "Map", source : "Position") -> List[int] :
+    path = [source] + [obstacle.to_pos() for obstacle in mp.obstacles]
+    order = list(range(len(path)))
+
+    for i in range(1,len(path)) :
+        nearest_dist = float('inf')
+        nearest_dist_index = -1
+
+        for j in range(i, len(path)) :
+            dist = euclidean(path[i-1], path[j]) # distance from last fixed point to candidate j
+            if dist < nearest_dist :
+                nearest_dist = dist
+                nearest_dist_index = j
+
+        # swap the nearest neighbor with the current position
+        if nearest_dist_index != -1:
+            path[i], path[nearest_dist_index] = path[nearest_dist_index], path[i]
+            order[i], order[nearest_dist_index] = order[nearest_dist_index], order[i]
+    return order
+
+
+# legs along order, each planned from where the previous one ended, [] for an unreachable one
+def nearest_legs(mp : "Map", source : "Position", order : List[int], cache : LegCache = None) -> Iterator[List["Node"]] :
+    aStar = Astar(mp, cache=cache)
+    previous = source
+    for i in order[1:] :
+        path = aStar.search_any(previous, view_poses(mp, mp.obstacles[i - 1]))
+        if path:
+            previous = path[-1].c_pos
+        yield path
+
+
+def k_nearest_neighour(mp : "Map", source : "Position", cache : LegCache = None) : 
+    return list(nearest_legs(mp, source, nearest_order(mp, source), cache)) # shortest path using greedy search 
+
+
+# k_nearest_neighour as a RouteStream : the order right away, the legs while they are planned
+def stream_nearest_neighbour(mp : "Map", source : "Position", cache : LegCache = None) -> RouteStream :
+    def plan() :
+        order = nearest_order(mp, source)
+        yield order
+        yield from nearest_legs(mp, source, order, cache)
+    return RouteStream(plan())
+
+# Generate all permutations of [0, 1, ..., n-1]
+def permutate(n: int, start_from_zero: bool) -> List[List[int]]:
+    if n ==0 :
+        return [[]] if not start_from_zero else []
+    
+    result: List[List[int]] = []
+    used = [False] * n
+    curr: List[int] = []
+
+    def helper():
+        if len(curr) == n:
+            result.append(curr[:])
+            return
+        for i in range(n):
+            if not used[i] :
+                used[i] = True
+                curr.append(i)
+                helper()
+                curr.pop()
+                used[i] = False
+
+    helper()
+
+    if start_from_zero:
+        result = [p for p in result if p[0] == 0]
+    return result
+
+
+# Held-Karp over the edge matrix : the top_k cheapest paths from node 0 visiting every node once
+# dp[mask][j] keeps the top_k partial paths over the nodes in mask (node 0 excluded) ending at j,
+# each entry being (cost, previous node, rank of the entry it extends)
+def held_karp(edges: List[List[float]], top_k: int = 1) -> List[Tuple[float, List[int]]]:
+    n = len(edges)
+    if n == 0:
+        return []
+    if n == 1:
+        return [(0, [0])]
+
+    m = n - 1  # node i is bit i-1
+    full = (1 << m) - 1
+    dp = [[None] * n for _ in range(full + 1)]
+    for j in range(1, n):
+        dp[1 << (j-1)][j] = [(edges[0][j], 0, 0)]
+
+    for mask in range(1, full + 1):
+        row = dp[mask]
+        for j in range(1, n):
+            entries = row[j]
+            if not entries:
+                continue
+            # every extension into this state came from a smaller mask, so it is complete now
+            if len(entries) > top_k:
+                entries = heapq.nsmallest(top_k, entries)
+            else:
+                entries.sort()
+            row[j] = entries
+            if mask == full:
+                continue
+
+            for k in range(1, n):
+                bit = 1 << (k-1)
+                if mask & bit:
+                    continue
+                nxt = dp[mask | bit]
+                if nxt[k] is None:
+                    nxt[k] = []
+                w = edges[j][k]
+                nxt[k].extend((cost + w, j, rank) for rank, (cost, _, _) in enumerate(entries))
+
+    final = [(dp[full][j][rank][0], j, rank) for j in range(1, n) if dp[full][j]
+             for rank in range(len(dp[full][j]))]
+    result = []
+    for cost, j, rank in heapq.nsmallest(top_k, final):
+        perm = []
+        mask = full
+        while j:
+            perm.append(j)
+            _, prev, prev_rank = dp[mask][j][rank]
+            mask ^= 1 << (j-1)
+            j, rank = prev, prev_rank
+        result.append((cost, [0] + perm[::-1]))
+    return result
+
+
+# shared layout block : [version, obstacle count, x0, y0, facing0, x1, y1, facing1, ...]
+MAX_OBSTACLES = 64
+_LAYOUT_SIZE = 2 + 3 * MAX_OBSTACLES
+
+
+def read_layout(layout: np.ndarray) -> "Map":
+    count = int(layout[1])
+    return Map([Obstacle(float(x), float(y), Direction(int(facing)))
+                for x, y, facing in layout[2:2 + 3*count].reshape(count, 3)])
+
+
+# one row of the edge matrix with astar, see SearchProcess.search
+def search_row(astar: Astar, pos: List["Position"], views: List[List["Position"]], start: int,
+               ends: List[int]) -> List[Tuple[int, float, "np.ndarray"]]:
+    goals = [views[e] for e in ends] if views else [pos[e] for e in ends]
+    astar.timed_out = False
+    paths = astar.search_many(pos[start], goals)
+    missed = None if astar.timed_out else 99999
+    return [(e, path[-1].f, pack_path(path)) if path else (e, missed, None)
+            for e, path in zip(ends, paths)]
+
+
+class SearchProcess(mp.Process):
+    def __init__(
+        self,
+        shm_name: str,
+        todo: mp.Queue,
+        done: mp.Queue,
+        i:int,
+        lazy: bool = False
+    ):
+        super().__init__()
+        self.shm_name = shm_name
+        self.todo = todo
+        self.done = done
+        self.i = i
+        self.lazy = lazy # lazy collision checking in the local Astar
+        self.version = -1 # layout version the local Astar was built for
+        self.astar = None
+        self.pos = []
+        self.views = None # candidate goals per end, pos is the only goal otherwise
+        logger.info(f'Spawning P{i}')
+
+
+    # search from one start to every end in a single one-to-many expansion, an end with candidate
+    # views is settled by whichever of them comes first
+    # returns (end, cost, packed path) per end, packed path None if unreachable and cost None too
+    # if the deadline came first, so the legs never have to be searched again
+    def search(
+        self,
+        start: int,
+        ends: List[int]
+    ) -> List[Tuple[int, float, "np.ndarray"]]:
+        logger.info(f'P{self.i} start search {start} -> {ends}')
+        return search_row(self.astar, self.pos, self.views, start, ends)
+        
+    # run the process to get batches from the todo queue and put results in the done queue
+    # a None batch is the shutdown sentinel
+    def run(self):
+        signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl-C is the parent's, it shuts the pool down
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        layout = np.ndarray((_LAYOUT_SIZE,), dtype=np.float64, buffer=shm.buf)
+        cache = LegCache() # legs this worker has already searched
+        try:
+            while 1:
+                job = self.todo.get()
+                if job is None:
+                    break
+                version, self.pos, self.views, rows, weight, deadline = job
+
+                # the layout moved on since this batch was queued
+                if version != int(layout[0]):
+                    self.done.put((version, [], None))
+                    continue
+                if version != self.version:
+                    self.astar = Astar(read_layout(layout), cache=cache, lazy=self.lazy)
+                    self.version = version
+                self.astar.weight, self.astar.deadline = weight, deadline
+
+                results = []
+                stats = SearchStats.empty()
+                for st, ends in rows:
+                    results.extend((st, *result) for result in self.search(st, ends))
+                    stats.merge(self.astar.stats)
+                self.done.put((version, results, stats))
+        finally:
+            del layout
+            shm.close()
+            logger.info(f'P{self.i} finished')
+
+
+class PlanningCancelled(Exception):
+    pass
+
+
+# long-lived workers : started once, new layouts are published through shared memory
+# and jobs are sent in batches of rows (one start, many ends), so a replan only pays for the searches
+class PlannerPool:
+
+    def __init__(self, n: int = 8, batch: int = 1, lazy: bool = False):
+        self.n = n
+        self.batch = batch
+        self.lazy = lazy
+        self.shm = shared_memory.SharedMemory(create=True, size=_LAYOUT_SIZE * 8)
+        self.layout = np.ndarray((_LAYOUT_SIZE,), dtype=np.float64, buffer=self.shm.buf)
+        self.layout[:] = 0
+        self.layout_hash = None
+        self.stats = SearchStats.empty() # searches of the last run, summed over the workers
+        self.cancelled = threading.Event() # set by cancel, cleared by handing the pool to the next run (hand_out)
+        self.todo = mp.Queue()
+        self.done = mp.Queue()
+        self.workers = [SearchProcess(self.shm.name, self.todo, self.done, i, lazy) for i in range(n)]
+        for p in self.workers:
+            p.daemon = True
+            p.start()
+
+    @property
+    def version(self) -> int:
+        return int(self.layout[0])
+
+    # publish the map's obstacles to the workers, only call between searches
+    def set_map(self, map: "Map"):
+        if map.layout_hash() == self.layout_hash:
+            return
+        if len(map.obstacles) > MAX_OBSTACLES:
+            raise ValueError(f'At most {MAX_OBSTACLES} obstacles can be shared, got {len(map.obstacles)}')
+        for i, o in enumerate(map.obstacles):
+            self.layout[2 + 3*i: 5 + 3*i] = (o.x, o.y, o.facing.value)
+        self.layout[1] = len(map.obstacles)
+        self.layout[0] += 1
+        self.layout_hash = map.layout_hash()
+
+    # run the (start, end) index pairs over pos, yields (start, end, cost, packed path)
+    # pairs sharing a start are searched together by one worker, self.stats sums up their searches
+    # weight > 1 runs weighted A*, ends a search had not settled at deadline (time.time()) come back with cost None
+    # views : candidate goals per index (see view_poses), searched instead of pos for the ends
+    def run(self, pos: List["Position"], pairs: List[Tuple[int, int]], weight: float = 1.0, deadline: float = None,
+            views: List[List["Position"]] = None):
+        rows = {}
+        for st, end in pairs:
+            rows.setdefault(st, []).append(end)
+        rows = list(rows.items())
+
+        version = self.version
+        self.stats = SearchStats.empty()
+        pending = 0
+        for i in range(0, len(rows), self.batch):
+            self.todo.put((version, pos, views, rows[i:i + self.batch], weight, deadline))
+            pending += 1
+
+        while pending:
+            if self.cancelled.is_set():
+                # a new version makes the workers skip the jobs still queued, late results are dropped as stale
+                self.layout[0] += 1
+                raise PlanningCancelled(f'Run cancelled with {pending} batches pending')
+            try:
+                v, results, stats = self.done.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if v != version:
+                continue # left over from an abandoned run
+            pending -= 1
+            self.stats.merge(stats)
+            yield from results
+
+    # stop the run in progress from another thread : it raises PlanningCancelled without waiting for
+    # the batches still queued, the searches already running finish in the background. the cancel holds
+    # for every later run until the pool is handed out again, so it is not lost between the runs of a search
+    def cancel(self):
+        self.cancelled.set()
+
+    # the pool now belongs to a new caller, a cancel of the previous one no longer applies
+    def hand_out(self):
+        self.cancelled.clear()
+
+    def close(self, timeout: float = 5):
+        for _ in self.workers:
+            self.todo.put(None)
+        for p in self.workers:
+            p.join(timeout)
+            if p.is_alive():
+                logger.warning(f'Terminating P{p.i}')
+                p.terminate()
+        self.workers = []
+        del self.layout
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "PlannerPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExhaustiveSearch:
+
+    def __init__(
+        self,
+        map: "Map", 
+        src: "Position",
+        n: int = 8,
+        cache: LegCache = None,
+        pool: PlannerPool = None,
+        lazy: bool = False
+    ):
+        self.map = map
+        # same mode as the pool's searches, so the legs they cache are found again here
+        self.astar = Astar(map, cache=cache, lazy=pool.lazy if pool is not None else lazy)
+        # shared worker pool, a temporary one of n workers is started per search otherwise.
+        # n = 0 searches in this process, for callers that already are a worker
+        self.pool = pool
+        self.src = src
+        self.views = [[src]] + [view_poses(map, o) for o in map.obstacles] # candidate goals per node
+        self.pos = [v[0] for v in self.views] # legs start from the best view of the previous node
+        self.n = n
+        self.bound = 1.0 # suboptimality bound of the last tour
+        self.weight = 1.0 # weight the last edge matrix was completed at, legs re-planned out of time fall back to it
+        self.timed_out = [] # (start, end) edges the deadline left above weight 1, within self.bound of optimal only
+        self.stats = SearchStats.empty() # every search of the last call : pool workers and local re-plans
+
+    # obtains cost of pair of nodes from todo
+    # with a deadline the edge matrix is completed by weighted A* and refined while time remains (edges within
+    # self.bound of optimal, so is the tour) and legs that need re-planning get an anytime search sharing the time left
+    def search(self, top_n: int = 3, deadline: float = None, weight: float = 2.0):
+        edges, legs = self.edge_matrix(deadline, weight)
+        return self.tour(edges, legs, top_n, deadline)
+
+    # the search as a RouteStream : the cheapest order once the edge matrix is filled, then its legs while
+    # they are planned. the robot is already driving, so an unreachable leg comes back [] instead of
+    # falling back to the next best order as search does
+    def stream(self, deadline: float = None, weight: float = 2.0) -> RouteStream:
+        return RouteStream(self.plan(deadline, weight))
+
+    def plan(self, deadline: float = None, weight: float = 2.0) -> Iterator:
+        edges, legs = self.edge_matrix(deadline, weight)
+        _, perm = self.orders(edges, 1, deadline)[0]
+        yield perm
+        prev = self.pos[0]
+        for i in range(1, len(perm)):
+            segment = self.leg(prev, perm[i-1], perm[i], legs, deadline)
+            if segment:
+                prev = segment[-1].c_pos
+            yield segment
+
+    # edge costs and packed legs between every pair of nodes
+    # with a deadline every edge is first searched at weight, past the deadline if it has to, so the matrix
+    # never misses a reachable leg. the time left goes to refine
+    def edge_matrix(self, deadline: float = None, weight: float = 2.0):
+        if deadline is None:
+            weight = 1.0
+        st = time.time()
+        self.stats = SearchStats.empty()
+        n = len(self.pos)
+        edges = [[0 for _ in range(n)] for _ in range(n)]
+        legs = [[None for _ in range(n)] for _ in range(n)] # packed leg paths
+        pairs = self.from_cache(edges, legs, [(r, c) for r in range(n) for c in range(n) if r != c])
+        self.fill(edges, legs, pairs, weight)
+        self.weight = self.bound = weight
+        self.refine(edges, legs, pairs, deadline)
+        logger.info(f'Adj list completed in {time.time()-st} s, within {self.bound} of optimal')
+        return edges, legs
+
+    # search the reachable edges of pairs again through the WEIGHTS below self.bound until the deadline, an edge
+    # only takes a cheaper leg. self.bound drops to the weight of every pass that settles all of them, the edges
+    # a pass leaves unsettled at the deadline go in self.timed_out
+    def refine(self, edges, legs, pairs: List[Tuple[int, int]], deadline: float = None):
+        todo = [(r, c) for r, c in pairs if legs[r][c] is not None]
+        if not todo: # cached legs are optimal, unreachable ones are at any weight
+            self.bound = 1.0
+        cut = todo
+        for w in WEIGHTS:
+            if self.bound <= 1.0 or time.time() >= deadline:
+                break
+            if w >= self.bound:
+                continue
+            cut = self.fill(edges, legs, todo, w, deadline)
+            if cut:
+                logger.info(f'Deadline reached refining to {w}, {len(cut)}/{len(todo)} edges left at {self.bound}')
+                break
+            self.bound = w
+        self.timed_out = cut if self.bound > 1.0 else []
+
+    # fill the edge matrix from the leg cache, returns the pairs that still need a search
+    def from_cache(self, edges, legs, pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        cache = self.astar.cache
+        if cache is None:
+            return pairs
+        todo = []
+        for r, c in pairs:
+            hit = cache.get(self.astar.cache_key(self.pos[r], self.views[c]), self.pos[r])
+            if hit is not None:
+                edges[r][c] = hit[0] if hit[0] is not None else 99999
+                legs[r][c] = hit[1]
+            else:
+                todo.append((r, c))
+        return todo
+
+    # search the (start, end) index pairs on the pool and store them in the edge matrix, an edge already
+    # searched only takes a cheaper leg. returns the pairs the deadline cut, their edges are left as they were
+    def fill(self, edges, legs, pairs: List[Tuple[int, int]], weight: float = 1.0, deadline: float = None) -> List[Tuple[int, int]]:
+        if not pairs:
+            return []
+        cut = []
+        pool = self.pool or (PlannerPool(self.n, lazy=self.astar.lazy) if self.n else None)
+        try:
+            if pool is not None:
+                pool.set_map(self.map)
+                results = pool.run(self.pos, pairs, weight, deadline, self.views)
+            else:
+                results = self.run_here(pairs, weight, deadline)
+            for r, c, f, packed in results:
+                if f is None:
+                    cut.append((r, c))
+                elif legs[r][c] is None or f <= edges[r][c]:
+                    self.edge_done(edges, legs, r, c, f, packed, exact=weight == 1.0)
+            if pool is not None:
+                self.stats.merge(pool.stats)
+        finally:
+            if pool is not None and pool is not self.pool:
+                pool.close()
+        return cut
+
+    # PlannerPool.run without the pool : the rows are searched one after the other by self.astar
+    def run_here(self, pairs: List[Tuple[int, int]], weight: float = 1.0, deadline: float = None):
+        rows = {}
+        for st, end in pairs:
+            rows.setdefault(st, []).append(end)
+        self.astar.weight, self.astar.deadline = weight, deadline
+        try:
+            for st, ends in rows.items():
+                results = search_row(self.astar, self.pos, self.views, st, ends)
+                self.stats.merge(self.astar.stats)
+                yield from ((st, *result) for result in results)
+        finally:
+            self.astar.weight, self.astar.deadline = 1.0, None
+
+    # candidate visit orders over the edge matrix as (cost, perm), cheapest first
+    def orders(self, edges, top_n: int = 3, deadline: float = None) -> List[Tuple[float, List[int]]]:
+        return held_karp(edges, top_n)
+
+    # get shortest path (lowest cost) over a complete edge matrix, cheapest order first
+    def tour(self, edges, legs, top_n: int = 3, deadline: float = None):
+        n = len(self.pos)
+        h = self.orders(edges, top_n, deadline)
+
+        loc_mn_path = []
+        loc_mn_f = float('inf')
+        min_perm = []
+        for cost, perm in h:
+
+            path = []
+            prev = self.pos[0]
+            f = 0
+            logger.info(f'Calculating path for {perm}')
+
+            for i in range(1, n):
+                segment = self.leg(prev, perm[i-1], perm[i], legs, deadline)
+
+                if segment:
+                    path.append(segment)
+                    prev = segment[-1].c_pos
+                    f += segment[-1].f
+                else:
+                    f += 99999
+
+                if f > loc_mn_f:
+                    break
+
+            if f < loc_mn_f:
+                loc_mn_f = f
+                loc_mn_path = path
+                min_perm = perm
+            if f < 99999:
+                return perm, path
+        
+        return min_perm, loc_mn_path
+
+    def edge_done(self, edges, legs, r: int, c: int, f: float, packed: "np.ndarray", exact: bool = True):
+        edges[r][c] = f
+        legs[r][c] = packed
+        if self.astar.cache is not None and exact:
+            self.astar.cache.put(self.astar.cache_key(self.pos[r], self.views[c]), f if packed is not None else None, packed)
+        logger.info(f'{r} -> {c} ({f})')
+
+    # path from prev to obstacle c, reusing the leg computed from pos[r] when possible
+    def leg(self, prev: "Position", r: int, c: int, legs: List[List["np.ndarray"]], deadline: float = None) -> List["Node"]:
+        packed = legs[r][c]
+        views = self.views[c]
+        if packed is not None:
+            path = unpack_path(packed)
+            if prev is self.pos[r]:
+                return path
+            # the previous leg ended in the bounds of pos[r], off the exact pose : replay the same moves from
+            # where it ended, into the view the leg was planned to. it ended at another view of r when that one
+            # was cheaper to reach : the leg was priced from pos[r], its moves mean nothing from there
+            if Astar.goals_index(prev, self.views[r]) == 0:
+                i = Astar.goals_index(path[-1].c_pos, views)
+                segment = self.astar.replay(prev, views[i or 0], path)
+                if segment:
+                    return segment
+        logger.info(f'Re-planning {r} -> {c} from {prev.getPositionString()}')
+        # anytime search (deadline) only runs point-to-point, to the best view
+        bound = 1.0
+        if deadline is not None:
+            path = self.astar.search(prev, self.pos[c], deadline=deadline)
+            bound = self.astar.bound
+            if not path and self.astar.timed_out:
+                # out of time but the leg is still needed : finish it at the weight of the edge matrix
+                self.stats.merge(self.astar.stats)
+                self.astar.weight = self.weight
+                try:
+                    path = self.astar.search_any(prev, views)
+                finally:
+                    self.astar.weight = 1.0
+                bound = self.weight
+        else:
+            path = self.astar.search_any(prev, views)
+        self.stats.merge(self.astar.stats)
+        if path and bound > 1.0:
+            self.bound = max(self.bound, bound)
+            if (r, c) not in self.timed_out:
+                self.timed_out.append((r, c))
+        return path
+
+
+# ExhaustiveSearch for courses held_karp cannot order in time (2^n states) : up to exact nodes it is
+# still held_karp, beyond that insertion + 2-opt / Or-opt within budget seconds (or the deadline).
+# the order is no longer optimal, lower_bound is what the optimal order cannot beat and gap how far
+# the tour may be from it
+class TourSearch(ExhaustiveSearch):
+
+    def __init__(self, *args, budget: float = 1.0, exact: int = 12, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+        self.exact = exact
+        self.tour_cost = None # cost of the order over the edge matrix
+        self.lower_bound = None # on the optimal order, in true (unweighted) leg costs
+
+    def orders(self, edges, top_n: int = 3, deadline: float = None) -> List[Tuple[float, List[int]]]:
+        st = time.time()
+        if len(edges) <= self.exact:
+            h = held_karp(edges, top_n)
+            self.tour_cost = h[0][0] if h else 0.0
+            self.lower_bound = self.tour_cost / self.bound
+            return h
+        stop = st + self.budget
+        if deadline is not None:
+            stop = min(stop, deadline)
+        self.tour_cost, perm = optimise(edges, stop)
+        # edges within bound of the true costs : the bound on the edge matrix scales down with them
+        self.lower_bound = assignment_bound(edges) / self.bound
+        logger.info(f'Tour {self.tour_cost:.2f}, lower bound {self.lower_bound:.2f} in {time.time()-st:.3f} s')
+        return [(self.tour_cost, perm)]
+
+    # relative distance of the last tour from the optimal one, at most
+    @property
+    def gap(self) -> float:
+        if self.tour_cost is None:
+            return None
+        if self.lower_bound <= 0:
+            return 0.0 if self.tour_cost <= 0 else float('inf')
+        return self.tour_cost / self.lower_bound - 1
@@ -0,0 +1,129 @@
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from math import atan2, cos, hypot, sin
+from typing import Tuple
+
+import numpy as np
+
+from Commons.Constants import MAX_THETA_ERR, ROBOT_HEIGHT, ROBOT_WIDTH, SNAP_COORD
+from Commons.Types import Position
+from Grid.Map import Map, NX, NY
+from Robot_Movements.Primitives import N_HEADINGS, heading_of, primitive_table
+
+logger = logging.getLogger('HEURISTIC')
+
+# grid steps to the 16 neighbours up to a knight's move away : a grid path is at most 1/cos of half
+# the widest angle between two step directions longer than the straight line it follows
+_GRID_SCALE = cos(atan2(1, 2) / 2)
+_STEPS = [(dx, dy, SNAP_COORD * hypot(dx, dy))
+          for dx in range(-2, 3) for dy in range(-2, 3) if max(abs(dx), abs(dy)) == 1 or abs(dx * dy) == 2]
+# a pose is looked up at its nearest cell and the goal region is seeded by whole cells
+_SLACK = SNAP_COORD * 2**.5
+# the field is over the middle of the robot, half its length ahead of the pose (rear-left corner) and half
+# its width to the right : unlike the corner it keeps clear of walls and obstacles at every heading
+_MID = (ROBOT_HEIGHT / 2, ROBOT_WIDTH / 2)
+# a move takes the middle at most this much further than it costs (1.18 on FL / BL turns, 1 straight)
+_STRETCH = 1.2
+# the heading tolerance of the goal swings the middle about the pose by up to this much
+_SWING = 2 * hypot(*_MID) * sin(MAX_THETA_ERR / 2)
+# a move takes the pose itself at most this much further than it costs (1.21 on the wide turns)
+_POSE_STRETCH = max(hypot(p.dx, p.dy) / p.cost for row in primitive_table() for p in row)
+
+_FIELDS = OrderedDict() # (goal, layout hash) -> HeuristicField
+_MAX_FIELDS = 256
+_FIELDS_LOCK = threading.Lock() # the server's planning runs look fields up from their own threads
+
+
+class HeuristicField :
+    # obstacle-aware distance to the goal region : reverse Dijkstra over the cells the middle of the robot
+    # can be in, from every cell the goal bounds put it in, scaled down so it never overestimates the path cost
+
+    def __init__(self, mp : Map, end : Position, bounds : Tuple[list, list]) :
+        self.end = end
+        self.bounds = bounds
+        (x0, x1), (y0, y1) = bounds
+        mx, my = _mid_offset(end.theta)
+        bounds = ([x0 + mx - _SWING, x1 + mx + _SWING], [y0 + my - _SWING, y1 + my + _SWING])
+        self.dist = self._dijkstra(self._free_cells(mp), bounds).tolist()
+
+    # optimistic free space : a cell is free if the middle of the robot is in it or a neighbour
+    # for some free pose, at any heading
+    @staticmethod
+    def _free_cells(mp : Map) -> np.ndarray :
+        free = np.zeros((NX, NY), dtype=bool)
+        for ti in range(N_HEADINGS) :
+            layer = mp.free_layer(ti)
+            mx, my = _mid_offset(heading_of(ti))
+            dx, dy = int(round(mx / SNAP_COORD)), int(round(my / SNAP_COORD))
+            free[max(dx, 0):NX + min(dx, 0), max(dy, 0):NY + min(dy, 0)] |= \
+                layer[max(-dx, 0):NX - max(dx, 0), max(-dy, 0):NY - max(dy, 0)]
+        grown = free.copy()
+        grown[1:, :] |= free[:-1, :]
+        grown[:-1, :] |= free[1:, :]
+        grown[:, 1:] |= free[:, :-1]
+        grown[:, :-1] |= free[:, 1:]
+        return grown
+
+    @staticmethod
+    def _dijkstra(free : np.ndarray, bounds : Tuple[list, list]) -> np.ndarray :
+        (x0, x1), (y0, y1) = bounds
+        dist = np.full((NX, NY), np.inf)
+        heap = []
+        half = SNAP_COORD / 2
+        for xi in range(max(0, int((x0 - half) // SNAP_COORD)), min(NX, int((x1 + half) // SNAP_COORD) + 1)) :
+            for yi in range(max(0, int((y0 - half) // SNAP_COORD)), min(NY, int((y1 + half) // SNAP_COORD) + 1)) :
+                # cell square touches the goal bounds
+                x, y = xi * SNAP_COORD, yi * SNAP_COORD
+                if x + half >= x0 and x - half <= x1 and y + half >= y0 and y - half <= y1 :
+                    dist[xi, yi] = 0
+                    heap.append((0, xi, yi))
+        heapq.heapify(heap)
+
+        while heap :
+            d, xi, yi = heapq.heappop(heap)
+            if d > dist[xi, yi] :
+                continue
+            for dx, dy, w in _STEPS :
+                nx, ny = xi + dx, yi + dy
+                if 0 <= nx < NX and 0 <= ny < NY and free[nx, ny] and d + w < dist[nx, ny] :
+                    dist[nx, ny] = d + w
+                    heapq.heappush(heap, (d + w, nx, ny))
+        return dist
+
+    def __call__(self, pos : Position) -> float :
+        mx, my = _mid_offset(pos.theta)
+        xi = min(max(int(round((pos.x + mx) / SNAP_COORD)), 0), NX - 1)
+        yi = min(max(int(round((pos.y + my) / SNAP_COORD)), 0), NY - 1)
+        # in the open the straight line from the pose to the goal bounds is the better bound. not the euclidean
+        # distance : that is measured to the exact goal pose, and a path can end anywhere in the bounds for less
+        (x0, x1), (y0, y1) = self.bounds
+        line = hypot(max(x0 - pos.x, 0, pos.x - x1), max(y0 - pos.y, 0, pos.y - y1)) / _POSE_STRETCH
+        return max((self.dist[xi][yi] * _GRID_SCALE - _SLACK) / _STRETCH, line)
+
+
+# middle of the robot relative to a pose at heading theta
+def _mid_offset(theta : float) -> Tuple[float, float] :
+    a, b = _MID
+    return a * cos(theta) + b * sin(theta), a * sin(theta) - b * cos(theta)
+
+
+# field for a goal on the map's current layout, built once and cached per (goal, layout)
+def heuristic_field(mp : Map, end : Position, bounds : Tuple[list, list]) -> HeuristicField :
+    key = (round(end.x, 6), round(end.y, 6), round(end.theta, 6), mp.layout_hash())
+    with _FIELDS_LOCK :
+        field = _FIELDS.get(key)
+        if field is not None :
+            _FIELDS.move_to_end(key)
+            return field
+    # built outside the lock, so a field does not hold up the others. two threads may build the same one,
+    # the first stored is kept
+    logger.debug(f'Building heuristic field for {end.getPositionString()}')
+    built = HeuristicField(mp, end, bounds)
+    with _FIELDS_LOCK :
+        field = _FIELDS.setdefault(key, built)
+        _FIELDS.move_to_end(key)
+        while len(_FIELDS) > _MAX_FIELDS :
+            _FIELDS.popitem(last=False)
+    return field
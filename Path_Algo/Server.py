@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from Commons.Enums import Direction
+from Commons.Types import Position
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Cache import LegCache
+from Path_Algo.Hamiltonian import ExhaustiveSearch, PlannerPool, PlanningCancelled, stream_nearest_neighbour
+from Path_Algo.Streaming import RouteStream
+from Robot_Movements.Commands import compile_path, encode
+from Robot_Movements.Primitives import primitive_table
+
+logger = logging.getLogger('PLANNING SERVER')
+
+SOCKET = '/tmp/sc2079_planner.sock'
+PLANNERS = ("exhaustive", "knn")
+
+# protocol : one JSON object per line in both directions
+#
+# request : {"id": "r1", "session": "robot", "planner": "exhaustive" | "knn",
+#            "start": [x, y, theta], "obstacles": [[x, y, "NORTH"], ...]}
+#           a newer request of the same session cancels the older ones still pending or running
+# cancel  : {"id": "r2", "cancel": "r1"}
+#
+# replies, in order, each with the request id :
+#   {"id", "order": [node indices, 0 is the start], "ms"}
+#   {"id", "leg": i, "cost", "path": [[x, y, theta], ...], "commands": "FW010,FR090,..."} per leg
+#   {"id", "done": true, "ms", "stats"} or {"id", "cancelled": true} or {"id", "error": message}
+#
+# the planning runs of a batch go on concurrently. exhaustive runs take turns on the worker pool until their
+# order is out (the edge matrix is the part that needs it), knn runs never wait for it
+
+
+class Request :
+    # one client request, requests with the same key share a single planning run
+
+    def __init__(self, message : dict, writer : asyncio.StreamWriter) :
+        self.id = message["id"]
+        self.session = message.get("session")
+        self.planner = message.get("planner", "exhaustive")
+        if self.planner not in PLANNERS :
+            raise ValueError(f'Unknown planner {self.planner}, expected one of {PLANNERS}')
+        self.start = Position(*map(float, message["start"]))
+        self.layout = tuple((float(x), float(y), _facing(f)) for x, y, f in message.get("obstacles", []))
+        self.writer = writer
+        self.received = time.perf_counter()
+        self.cancelled = False
+
+    @property
+    def key(self) -> tuple :
+        return (self.planner, self.start.getPositionTuple(), self.layout)
+
+    def map(self) -> Map :
+        return Map([Obstacle(x, y, facing) for x, y, facing in self.layout])
+
+    @property
+    def ms(self) -> float :
+        return (time.perf_counter() - self.received) * 1000
+
+    async def send(self, reply : dict) :
+        if self.writer.is_closing() :
+            return
+        self.writer.write((json.dumps({"id": self.id, **reply}) + '\n').encode())
+        await self.writer.drain()
+
+
+def _facing(f) -> Direction :
+    return Direction[f] if isinstance(f, str) else Direction(int(f))
+
+
+def _leg_reply(i : int, path : list) -> dict :
+    if not path :
+        return {"leg": i, "cost": None, "path": [], "commands": ""}
+    return {
+        "leg": i,
+        "cost": path[-1].g,
+        "path": [list(node.c_pos.getPositionTuple()) for node in path],
+        "commands": encode(compile_path(path)),
+    }
+
+
+class Run :
+    # one planning run streamed to every request of the group
+
+    def __init__(self, requests : List[Request]) :
+        self.requests = requests
+        self.stream : Optional[RouteStream] = None
+        self.search : Optional[ExhaustiveSearch] = None # set when the run uses the pool
+
+    @property
+    def cancelled(self) -> bool :
+        return all(r.cancelled for r in self.requests)
+
+
+# resident planner : the worker pool, primitive table, heuristic fields and leg cache stay warm between
+# requests. requests arriving within window of each other are planned as one batch, duplicates once
+class PlanningServer :
+
+    def __init__(self, workers : int = 8, window : float = 0.005, cache : Optional[LegCache] = None, lazy : bool = True) :
+        self.window = window
+        self.cache = LegCache() if cache is None else cache
+        self.pool = PlannerPool(workers, lazy=lazy)
+        self.pending : List[Request] = []
+        self.wakeup = asyncio.Event()
+        self.latest : Dict[str, Request] = {} # newest request per session
+        self.runs : List[Run] = [] # planning runs in progress, or waiting for the pool
+        self.pooled : Optional[Run] = None # run filling its edge matrix on the pool
+        self.pool_turn = asyncio.Lock()
+        self.tasks = set() # planning run tasks, kept until they finish
+        primitive_table() # built once per process
+
+    # accept a request : older ones of the same session are stale now
+    def submit(self, request : Request) :
+        if request.session is not None :
+            stale = self.latest.get(request.session)
+            if stale is not None :
+                self.cancel(stale)
+            self.latest[request.session] = request
+        self.pending.append(request)
+        self.wakeup.set()
+
+    def cancel(self, request : Request) :
+        if request.cancelled :
+            return
+        request.cancelled = True
+        logger.info(f'Cancelled {request.id}')
+        # a run nobody waits for any more : the pool drops its queued searches, legs stop after the one in progress
+        for run in self.runs :
+            if request in run.requests and run.cancelled and run.stream is not None :
+                run.stream.close()
+                if self.pooled is run :
+                    self.pool.cancel()
+
+    def find(self, request_id) -> Optional[Request] :
+        for r in self.pending + [r for run in self.runs for r in run.requests] :
+            if r.id == request_id :
+                return r
+        return None
+
+    async def planner(self) :
+        while True :
+            await self.wakeup.wait()
+            await asyncio.sleep(self.window) # let concurrent requests join the batch
+            self.wakeup.clear()
+            batch, self.pending = self.pending, []
+            groups = {}
+            for r in batch :
+                if r.cancelled :
+                    await r.send({"cancelled": True})
+                else :
+                    groups.setdefault(r.key, []).append(r)
+            logger.info(f'Batch of {len(batch)} requests, {len(groups)} planning runs')
+            for requests in groups.values() :
+                task = asyncio.create_task(self.run(requests))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    async def run(self, requests : List[Request]) :
+        live = [r for r in requests if not r.cancelled]
+        for r in requests :
+            if r.cancelled :
+                await r.send({"cancelled": True})
+        if not live :
+            return
+        first = live[0]
+        run = Run(live)
+        self.runs.append(run)
+
+        try :
+            if first.planner == "knn" :
+                run.stream = stream_nearest_neighbour(first.map(), first.start, self.cache)
+                order = await run.stream.wait_order()
+            else :
+                order = await self.pooled_order(run, first)
+            for r in live :
+                if not r.cancelled :
+                    await r.send({"order": order, "ms": r.ms})
+            i = 0
+            async for path in run.stream :
+                i += 1
+                for r in live :
+                    if not r.cancelled :
+                        await r.send(_leg_reply(i, path))
+            stats = run.search.stats.to_dict() if run.search is not None else None
+            for r in live :
+                await r.send({"cancelled": True} if r.cancelled else {"done": True, "ms": r.ms, "stats": stats})
+        except PlanningCancelled :
+            for r in live :
+                await r.send({"cancelled": True})
+        except Exception as e :
+            logger.exception('Planning failed')
+            for r in live :
+                await r.send({"error": str(e)})
+        finally :
+            if run.stream is not None :
+                run.stream.close()
+            self.runs.remove(run)
+            for r in live :
+                if self.latest.get(r.session) is r :
+                    del self.latest[r.session]
+
+    # exhaustive runs fill their edge matrix one at a time on the pool, the legs that follow are planned
+    # in their own thread while the next run has its turn
+    async def pooled_order(self, run : Run, first : Request) -> List[int] :
+        async with self.pool_turn :
+            if run.cancelled :
+                raise PlanningCancelled('Cancelled while waiting for the pool')
+            self.pool.hand_out()
+            self.pooled = run
+            try :
+                run.search = ExhaustiveSearch(first.map(), first.start, cache=self.cache, pool=self.pool)
+                run.stream = run.search.stream()
+                return await run.stream.wait_order()
+            finally :
+                self.pooled = None
+
+    async def handle(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) :
+        try :
+            while line := await reader.readline() :
+                message = None
+                try :
+                    message = json.loads(line)
+                    if "cancel" in message :
+                        target = self.find(message["cancel"])
+                        if target is not None :
+                            self.cancel(target)
+                        continue
+                    self.submit(Request(message, writer))
+                except (ValueError, KeyError, TypeError) as e :
+                    reply = {"id": message.get("id") if isinstance(message, dict) else None, "error": str(e)}
+                    writer.write((json.dumps(reply) + '\n').encode())
+                    await writer.drain()
+        except ConnectionError :
+            pass
+        finally :
+            writer.close()
+
+    async def serve(self, path : str = SOCKET, port : Optional[int] = None) :
+        if port is not None :
+            server = await asyncio.start_server(self.handle, '127.0.0.1', port)
+        else :
+            if os.path.exists(path) :
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.handle, path)
+        logger.info(f'Serving on {port if port is not None else path}')
+        planner = asyncio.create_task(self.planner())
+        try :
+            async with server :
+                await server.serve_forever()
+        finally :
+            planner.cancel()
+            for task in list(self.tasks) :
+                task.cancel()
+
+    def close(self) :
+        self.pool.close()
+
+
+# client side : send one request and yield the replies until it is done, cancelled or failed
+async def request(message : dict, path : str = SOCKET, port : Optional[int] = None) :
+    if port is not None :
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    else :
+        reader, writer = await asyncio.open_unix_connection(path)
+    try :
+        writer.write((json.dumps(message) + '\n').encode())
+        await writer.drain()
+        while line := await reader.readline() :
+            reply = json.loads(line)
+            yield reply
+            if reply.keys() & {"done", "cancelled", "error"} :
+                return
+    finally :
+        writer.close()
+
+
+def main(argv : List[str] = None) -> int :
+    parser = argparse.ArgumentParser(description='Resident path planning server on a local socket')
+    parser.add_argument('--socket', default=SOCKET, help='unix socket path')
+    parser.add_argument('--port', type=int, default=None, help='listen on 127.0.0.1:port instead of the socket')
+    parser.add_argument('--workers', type=int, default=8, help='planner pool size')
+    parser.add_argument('--window', type=float, default=0.005, help='seconds to gather concurrent requests')
+    parser.add_argument('--cache', default=None, help='leg cache file, loaded now and saved on exit')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    async def run() :
+        server = PlanningServer(args.workers, args.window, LegCache(path=args.cache))
+        try :
+            await server.serve(args.socket, args.port)
+        finally :
+            server.close()
+            server.cache.save()
+
+    try :
+        asyncio.run(run())
+    except KeyboardInterrupt :
+        pass
+    return 0
+
+
+if __name__ == '__main__' :
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, TextIO
+
+
+class SearchStats :
+    # counters of one search, or of many once merged
+    # expanded : nodes popped and expanded
+    # generated : successors produced by the expansions
+    # collision_checks : calls to Astar.has_collision
+    # reopened : states whose best f improved after they were first queued
+    # max_open : largest open set seen
+    # times : seconds per phase, collision and heuristic only when Astar.timing is on, total always
+    COUNTERS = ("expanded", "generated", "collision_checks", "reopened")
+    PHASES = ("collision", "heuristic", "total")
+
+    def __init__(self) :
+        self.searches = 1
+        self.expanded = 0
+        self.generated = 0
+        self.collision_checks = 0
+        self.reopened = 0
+        self.max_open = 0
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+
+    # time not spent in collision checks or the heuristic : heap operations and bookkeeping
+    @property
+    def other(self) -> float :
+        return max(0.0, self.times["total"] - self.times["collision"] - self.times["heuristic"])
+
+    def merge(self, other : "SearchStats") -> "SearchStats" :
+        self.searches += other.searches
+        for name in self.COUNTERS :
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.max_open = max(self.max_open, other.max_open)
+        for phase in self.PHASES :
+            self.times[phase] += other.times[phase]
+        return self
+
+    @classmethod
+    def empty(cls) -> "SearchStats" :
+        stats = cls()
+        stats.searches = 0
+        return stats
+
+    def to_dict(self) -> dict :
+        d = {name: getattr(self, name) for name in ("searches",) + self.COUNTERS + ("max_open",)}
+        d.update({f'{phase}_s': t for phase, t in self.times.items()})
+        d["other_s"] = self.other
+        return d
+
+    def __repr__(self) -> str :
+        return ' '.join(f'{k}={v:.4f}' if isinstance(v, float) else f'{k}={v}' for k, v in self.to_dict().items())
+
+
+# wrap a bound method so its run time is added to owner.stats.times[phase]
+def timed(owner, fn : Callable, phase : str) -> Callable :
+    def wrapper(*args) :
+        st = time.perf_counter()
+        try :
+            return fn(*args)
+        finally :
+            owner.stats.times[phase] += time.perf_counter() - st
+    return wrapper
+
+
+# hooks, set as Astar.wrap (around every search) and Astar.trace (called per expansion)
+
+# profile the wrapped search, the stats are dumped to path or printed
+@contextmanager
+def profiled(path : Optional[str] = None, sort : str = "cumulative", limit : int = 30) :
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try :
+        yield profiler
+    finally :
+        profiler.disable()
+        if path :
+            profiler.dump_stats(path)
+        else :
+            pstats.Stats(profiler).sort_stats(sort).print_stats(limit)
+
+
+# expansion trace as CSV lines : x, y, theta, g, h
+def trace_to(f : TextIO) -> Callable[[float, float, float, float, float], None] :
+    f.write('x,y,theta,g,h\n')
+    def trace(x, y, theta, g, h) :
+        f.write(f'{x:.3f},{y:.3f},{theta:.5f},{g:.3f},{h:.3f}\n')
+    return trace
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import queue
+import threading
+from typing import Iterator, List
+
+logger = logging.getLogger('STREAMING')
+
+_DONE = object() # end of the legs
+
+
+class RouteStream :
+    # a route handed over piece by piece : the visit order as soon as it is chosen, then every leg as soon as
+    # it is planned. planning runs in a background thread, so driving leg i overlaps with planning leg i+1
+    #
+    # producer : generator yielding the order (node indices, 0 is the start) once, then one path per leg,
+    #            [] for a leg that could not be planned
+    #
+    #   route = planner.stream()
+    #   send(route.order)
+    #   for path in route :          # or : async for path in route
+    #       drive(path)
+
+    def __init__(self, producer : Iterator) :
+        self.legs = queue.Queue() # (path or _DONE, exception)
+        self._order = None
+        self._error = None
+        self._order_ready = threading.Event()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(producer,), daemon=True)
+        self.thread.start()
+
+    def _run(self, producer : Iterator) :
+        try :
+            self._order = next(producer, [])
+            self._order_ready.set()
+            for path in producer :
+                self.legs.put((path, None))
+                if self._stop.is_set() :
+                    logger.info('Route stream closed, planning stopped')
+                    break
+        except BaseException as e :
+            self._error = e
+            self.legs.put((None, e))
+        finally :
+            self._order_ready.set()
+            self.legs.put((_DONE, None))
+            producer.close()
+
+    # visit order, waits until it is chosen
+    @property
+    def order(self) -> List[int] :
+        self._order_ready.wait()
+        if self._order is None and self._error is not None :
+            raise self._error
+        return self._order
+
+    async def wait_order(self) -> List[int] :
+        await asyncio.to_thread(self._order_ready.wait)
+        return self.order
+
+    # next leg, waits until it is planned. _DONE after the last one
+    def _take(self) :
+        path, error = self.legs.get()
+        if error is not None :
+            raise error
+        if path is _DONE :
+            self.legs.put((_DONE, None)) # every later read ends too
+        return path
+
+    def __iter__(self) :
+        while True :
+            path = self._take()
+            if path is _DONE :
+                return
+            yield path
+
+    async def __aiter__(self) :
+        while True :
+            path = await asyncio.to_thread(self._take)
+            if path is _DONE :
+                return
+            yield path
+
+    # stop planning after the leg in progress, the legs already planned can still be read
+    def close(self) :
+        self._stop.set()
+
+    @property
+    def done(self) -> bool :
+        return not self.thread.is_alive()
+
+    def __enter__(self) -> "RouteStream" :
+        return self
+
+    def __exit__(self, *exc) :
+        self.close()
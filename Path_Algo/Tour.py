@@ -0,0 +1,201 @@
+import logging
+import random
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger('TOUR')
+
+# tour heuristics over an edge matrix, for courses too large for held_karp. a tour is an open path
+# from node 0 visiting every node once, edges[r][c] need not equal edges[c][r]
+
+INF = float('inf')
+
+
+def path_cost(edges : List[List[float]], perm : List[int]) -> float :
+    return sum(edges[perm[i]][perm[i+1]] for i in range(len(perm) - 1))
+
+
+# nearest insertion : the node closest to the partial path (either direction) goes in next,
+# at the position where it adds the least cost
+def insertion(edges : List[List[float]]) -> List[int] :
+    n = len(edges)
+    perm = [0]
+    todo = set(range(1, n))
+    # cheapest edge between each outside node and the partial path
+    near = {k: min(edges[0][k], edges[k][0]) for k in todo}
+    while todo :
+        k = min(todo, key=lambda j : (near[j], j))
+        todo.remove(k)
+        best, at = INF, len(perm)
+        for i in range(len(perm)) :
+            a = perm[i]
+            if i + 1 < len(perm) :
+                b = perm[i+1]
+                delta = edges[a][k] + edges[k][b] - edges[a][b]
+            else :
+                delta = edges[a][k]
+            if delta < best :
+                best, at = delta, i + 1
+        perm.insert(at, k)
+        for j in todo :
+            near[j] = min(near[j], edges[k][j], edges[j][k])
+    return perm
+
+
+# 2-opt : reverse perm[i..j]. with asymmetric edges the reversed inside is priced from prefix sums
+# of the path walked forwards and backwards, so every candidate is O(1). first improvement
+def two_opt(edges : List[List[float]], perm : List[int], deadline : Optional[float] = None) -> bool :
+    n = len(perm)
+    improved = False
+    again = True
+    while again :
+        again = False
+        fwd = [0.0] * n # fwd[k] : cost of perm[0..k] walked forwards
+        bwd = [0.0] * n # bwd[k] : same edges walked backwards
+        for k in range(1, n) :
+            fwd[k] = fwd[k-1] + edges[perm[k-1]][perm[k]]
+            bwd[k] = bwd[k-1] + edges[perm[k]][perm[k-1]]
+        for i in range(1, n - 1) :
+            if deadline is not None and time.time() >= deadline :
+                return improved
+            a, pi = perm[i-1], perm[i]
+            for j in range(i + 1, n) :
+                pj = perm[j]
+                old = edges[a][pi] + fwd[j] - fwd[i]
+                new = edges[a][pj] + bwd[j] - bwd[i]
+                if j + 1 < n :
+                    b = perm[j+1]
+                    old += edges[pj][b]
+                    new += edges[pi][b]
+                if new < old - 1e-9 :
+                    perm[i:j+1] = perm[i:j+1][::-1]
+                    improved = again = True
+                    break
+            if again :
+                break
+    return improved
+
+
+# Or-opt : move a segment of 1 to 3 nodes, in its own direction, to the best other place. first improvement
+def or_opt(edges : List[List[float]], perm : List[int], deadline : Optional[float] = None) -> bool :
+    n = len(perm)
+    improved = False
+    again = True
+    while again :
+        again = False
+        for size in (1, 2, 3) :
+            for i in range(1, n - size + 1) :
+                if deadline is not None and time.time() >= deadline :
+                    return improved
+                j = i + size - 1 # segment perm[i..j]
+                a, s, e = perm[i-1], perm[i], perm[j]
+                b = perm[j+1] if j + 1 < n else None
+                removed = edges[a][s] + (edges[e][b] - edges[a][b] if b is not None else 0)
+                rest = perm[:i] + perm[j+1:]
+                best, at = 1e-9, None
+                for k in range(len(rest)) :
+                    if k == i - 1 :
+                        continue # where it came from
+                    c = rest[k]
+                    d = rest[k+1] if k + 1 < len(rest) else None
+                    added = edges[c][s] + (edges[e][d] - edges[c][d] if d is not None else 0)
+                    if removed - added > best :
+                        best, at = removed - added, k
+                if at is not None :
+                    perm[:] = rest[:at+1] + perm[i:j+1] + rest[at+1:]
+                    improved = again = True
+                    break
+            if again :
+                break
+    return improved
+
+
+def local_search(edges : List[List[float]], perm : List[int], deadline : Optional[float] = None) :
+    while True :
+        changed = two_opt(edges, perm, deadline)
+        changed = or_opt(edges, perm, deadline) or changed
+        if not changed or (deadline is not None and time.time() >= deadline) :
+            return
+
+
+# double bridge : cut the path after node 0 into four parts and swap the middle two, a kick
+# local search cannot undo in one move
+def double_bridge(perm : List[int], rng : random.Random) -> List[int] :
+    n = len(perm)
+    if n < 5 :
+        return perm[:]
+    i, j, k = sorted(rng.sample(range(1, n), 3))
+    return perm[:i] + perm[j:k] + perm[i:j] + perm[k:]
+
+
+# insertion, then 2-opt / Or-opt to a local optimum, then kicked restarts from the best tour
+# until deadline (time.time()). without a deadline a single descent is run. returns (cost, perm)
+def optimise(edges : List[List[float]], deadline : Optional[float] = None, seed : int = 0) -> Tuple[float, List[int]] :
+    n = len(edges)
+    if n <= 2 :
+        perm = list(range(n))
+        return path_cost(edges, perm), perm
+    perm = insertion(edges)
+    logger.info(f'Insertion tour {path_cost(edges, perm):.2f}')
+    local_search(edges, perm, deadline)
+    best, best_cost = perm, path_cost(edges, perm)
+    logger.info(f'Local optimum {best_cost:.2f}')
+
+    rng = random.Random(seed)
+    kicks = 0
+    while deadline is not None and time.time() < deadline and n >= 5 :
+        perm = double_bridge(best, rng)
+        local_search(edges, perm, deadline)
+        cost = path_cost(edges, perm)
+        kicks += 1
+        if cost < best_cost - 1e-9 :
+            best, best_cost = perm, cost
+            logger.info(f'Kick {kicks} improved the tour to {best_cost:.2f}')
+    return best_cost, best
+
+
+# assignment lower bound : every node but 0 needs a predecessor and every node but the last a successor.
+# closing the path with free edges back into 0 makes it a cycle cover, so the cheapest assignment
+# (Hungarian method, O(n^3)) is at most the cost of any tour
+def assignment_bound(edges : List[List[float]]) -> float :
+    n = len(edges)
+    if n <= 1 :
+        return 0.0
+    # cost[i][j] : i followed by j, returning to 0 is free
+    cost = [[INF if i == j else (0.0 if j == 0 else edges[i][j]) for j in range(n)] for i in range(n)]
+
+    # potentials form, rows and columns 1-indexed with 0 as the virtual column
+    u = [0.0] * (n + 1)
+    v = [0.0] * (n + 1)
+    match = [0] * (n + 1) # match[column] = row
+    way = [0] * (n + 1)
+    for i in range(1, n + 1) :
+        match[0] = i
+        j0 = 0
+        minv = [INF] * (n + 1)
+        used = [False] * (n + 1)
+        while True :
+            used[j0] = True
+            i0, delta, j1 = match[j0], INF, 0
+            row = cost[i0 - 1]
+            for j in range(1, n + 1) :
+                if not used[j] :
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j] :
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta :
+                        delta, j1 = minv[j], j
+            for j in range(n + 1) :
+                if used[j] :
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else :
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0 :
+                break
+        while j0 :
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    return sum(cost[match[j] - 1][j - 1] for j in range(1, n + 1))
@@ -0,0 +1,113 @@
+from typing import List, Optional
+
+from Commons.Constants import DIST_BW, DIST_FW
+from Commons.Enums import Movement
+
+
+# (v, s) of a path node -> the movement that led to it, as in Astar.moves
+MOVE_OF = {
+    (-1,  0): Movement.BWD,
+    (-1, -1): Movement.BWD_LEFT,
+    (-1,  1): Movement.BWD_RIGHT,
+    ( 1,  0): Movement.FWD,
+    ( 1, -1): Movement.FWD_LEFT,
+    ( 1,  1): Movement.FWD_RIGHT,
+}
+
+# two letter opcode per movement
+OPCODE = {
+    Movement.FWD: "FW",
+    Movement.BWD: "BW",
+    Movement.FWD_LEFT: "FL",
+    Movement.FWD_RIGHT: "FR",
+    Movement.BWD_LEFT: "BL",
+    Movement.BWD_RIGHT: "BR",
+}
+MOVEMENT_OF = {op: mv for mv, op in OPCODE.items()}
+
+STEP = {Movement.FWD: DIST_FW, Movement.BWD: DIST_BW} # straight moves : distance per primitive
+TURN = 90 # turns : degrees per primitive
+ARG_DIGITS = 3 # fixed width argument, so a command is always 5 characters
+
+
+class Command :
+    __slots__ = ("move", "count")
+
+    # move : Movement repeated without stopping
+    # count : number of primitives merged into the command
+
+    def __init__(self, move : Movement, count : int = 1) :
+        self.move = move
+        self.count = count
+
+    # distance for straight moves, degrees for turns
+    @property
+    def arg(self) -> int :
+        if self.move in STEP :
+            return int(round(STEP[self.move] * self.count))
+        return TURN * self.count
+
+    def encode(self) -> str :
+        return f'{OPCODE[self.move]}{self.arg:0{ARG_DIGITS}d}'
+
+    def __eq__(self, other) -> bool :
+        return isinstance(other, Command) and self.move == other.move and self.count == other.count
+
+    def __repr__(self) -> str :
+        return self.encode()
+
+
+# largest number of primitives of a movement that still fits the argument width
+def max_count(move : Movement) -> int :
+    limit = 10 ** ARG_DIGITS - 1
+    return int(limit // STEP[move]) if move in STEP else limit // TURN
+
+
+# movements of a reconstructed path, the first node is the start pose
+def path_moves(path : list) -> List[Movement] :
+    return [MOVE_OF[(node.v, node.s)] for node in path[1:]]
+
+
+# merge runs of the same movement : straight runs become one distance, consecutive
+# same-direction turns fold into one larger turn. the robot only stops between commands
+def compile_moves(moves : List[Movement]) -> List[Command] :
+    commands = []
+    for mv in moves :
+        last = commands[-1] if commands else None
+        if last is not None and last.move == mv and last.count < max_count(mv) :
+            last.count += 1
+        else :
+            commands.append(Command(mv))
+    return commands
+
+
+def compile_path(path : list) -> List[Command] :
+    return compile_moves(path_moves(path))
+
+
+# primitive movements of a command stream, the inverse of compile_moves
+def expand(commands : List[Command]) -> List[Movement] :
+    return [c.move for c in commands for _ in range(c.count)]
+
+
+def encode(commands : List[Command], sep : str = ",") -> str :
+    return sep.join(c.encode() for c in commands)
+
+
+def decode(stream : str, sep : Optional[str] = ",") -> List[Command] :
+    width = 2 + ARG_DIGITS
+    tokens = stream.split(sep) if sep else [stream[i:i + width] for i in range(0, len(stream), width)]
+    commands = []
+    for token in tokens :
+        if not token :
+            continue
+        op, arg = token[:2], int(token[2:])
+        if op not in MOVEMENT_OF :
+            raise ValueError(f'Unknown command {token}')
+        mv = MOVEMENT_OF[op]
+        unit = STEP[mv] if mv in STEP else TURN
+        count = int(round(arg / unit))
+        if count < 1 or abs(count * unit - arg) > 1e-6 :
+            raise ValueError(f'{token} is not a whole number of {op} steps')
+        commands.append(Command(mv, count))
+    return commands
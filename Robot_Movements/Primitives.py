@@ -0,0 +1,118 @@
+import hashlib
+from functools import lru_cache
+from math import cos, sin, pi
+from typing import Optional, Tuple
+
+from Commons.Constants import (
+    DIST_BL,
+    DIST_BR,
+    DIST_BW,
+    DIST_FL,
+    DIST_FR,
+    DIST_FW,
+    SNAP_THETA,
+    WPS_FL,
+    WPS_FR,
+    WPS_BL,
+    WPS_BR,
+)
+from Commons.Enums import Movement
+
+
+N_HEADINGS = int(round(360 / SNAP_THETA))  # 24 snapped headings
+_HEADING_EPS = 1e-6
+
+
+# heading of lattice index i, computed the same way as Position.snap so the floats compare equal
+def heading_of(i: int) -> float:
+    return i * SNAP_THETA / 180 * pi
+
+
+# index of a heading that already lies on the lattice, None if it is off-lattice
+def heading_index(theta: float) -> Optional[int]:
+    steps = theta % (2*pi) / pi * 180 / SNAP_THETA
+    i = round(steps)
+    if abs(steps - i) > _HEADING_EPS:
+        return None
+    return i % N_HEADINGS
+
+
+class Primitive :
+    __slots__ = ("v", "s", "move", "dx", "dy", "dth", "cost")
+
+    # v : motion direction (-1 : backwards, 1 : forwards)
+    # s : steering direction (-1 : left, 0 : straight, 1 : right)
+    # move : Movement of the primitive
+    # dx, dy : world offset of the successor for one heading
+    # dth : heading change in lattice steps
+    # cost : arc length travelled
+
+    def __init__(self, v: int, s: int, move: Movement, dx: float, dy: float, dth: int, cost: float):
+        self.v = v
+        self.s = s
+        self.move = move
+        self.dx = dx
+        self.dy = dy
+        self.dth = dth
+        self.cost = cost
+
+
+# calibration profile : everything the primitive table and the swept collision checks depend on
+# the constants are read once per process : the profile, its key and its table are built on the first call
+@lru_cache(maxsize=1)
+def profile() -> tuple:
+    return (
+        SNAP_THETA,
+        DIST_FW, DIST_BW,
+        tuple(DIST_FL), tuple(DIST_FR), tuple(DIST_BL), tuple(DIST_BR),
+        tuple(WPS_FL), tuple(WPS_FR), tuple(WPS_BL), tuple(WPS_BR),
+    )
+
+
+def profile_key(prof: Optional[tuple] = None) -> str:
+    if prof is None:
+        return _profile_key()
+    return hashlib.sha1(repr(prof).encode()).hexdigest()[:16]
+
+
+# every LegCache key asks for it
+@lru_cache(maxsize=1)
+def _profile_key() -> str:
+    return profile_key(profile())
+
+
+# same order as Astar.moves
+# (v, s, movement, lateral offset, forward offset, heading change in radians, arc length)
+def _local_moves(prof: tuple) -> tuple:
+    _, dist_fw, dist_bw, dist_fl, dist_fr, dist_bl, dist_br = prof[:7]
+    return (
+        (-1,  0, Movement.BWD,       0,          -dist_bw,   0,     dist_bw),
+        (-1, -1, Movement.BWD_LEFT,  dist_bl[0], dist_bl[1], -pi/2, dist_bl[2]),
+        (-1,  1, Movement.BWD_RIGHT, dist_br[0], dist_br[1], pi/2,  dist_br[2]),
+        ( 1,  0, Movement.FWD,       0,          dist_fw,    0,     dist_fw),
+        ( 1, -1, Movement.FWD_LEFT,  dist_fl[0], dist_fl[1], pi/2,  dist_fl[2]),
+        ( 1,  1, Movement.FWD_RIGHT, dist_fr[0], dist_fr[1], -pi/2, dist_fr[2]),
+    )
+
+
+# table[heading index] -> the 6 primitives starting from that heading, built once per profile
+@lru_cache(maxsize=4)
+def build_table(prof: tuple) -> Tuple[Tuple[Primitive, ...], ...]:
+    snap_theta = prof[0]
+    table = []
+    for i in range(N_HEADINGS):
+        theta = heading_of(i)
+        row = []
+        for v, s, mv, lx, ly, dth, cost in _local_moves(prof):
+            # lateral offset is along theta - pi/2, as in Robot_Movements.Movements
+            dx = cos(theta - pi/2) * lx + cos(theta) * ly
+            dy = sin(theta - pi/2) * lx + sin(theta) * ly
+            row.append(Primitive(v, s, mv, dx, dy, int(round(dth / pi * 180 / snap_theta)), cost))
+        table.append(tuple(row))
+    return tuple(table)
+
+
+# without hashing the profile again to look the table up in build_table
+@lru_cache(maxsize=1)
+def primitive_table() -> Tuple[Tuple[Primitive, ...], ...]:
+    return build_table(profile())
@@ -0,0 +1 @@
+# the packages are imported from the repository root, as when running with PYTHONPATH=.
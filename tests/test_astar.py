@@ -0,0 +1,158 @@
+from math import pi
+
+import numpy as np
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Enums import Direction
+from Commons.Types import Position
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Astar import Astar, CompactAstar, pack_path, unpack_path
+from Path_Algo.Hamiltonian import view_poses
+
+START = Position(5, 5, pi/2)
+
+
+def _map(seed : int = 2, n : int = 4) -> Map :
+    return Map(generate(seed, n).obstacles())
+
+
+def test_pack_round_trip() :
+    path = Astar(_map()).search(START, Position(100, 150, 0))
+    assert path
+    packed = pack_path(path)
+    assert packed.shape == (len(path), 8)
+    back = unpack_path(packed)
+    assert [(n.c_pos.getPositionTuple(), n.g, n.h, n.v, n.s, n.d) for n in back] == \
+           [(n.c_pos.getPositionTuple(), n.g, n.h, n.v, n.s, n.d) for n in path]
+    assert back[0].parent is None
+    assert all(b.parent is a for a, b in zip(back, back[1:]))
+    assert np.array_equal(pack_path(back), packed)
+
+
+def test_unpack_unreachable() :
+    assert unpack_path(None) == []
+
+
+# one expansion to many goals costs each goal what its own search does
+def test_search_many_matches_single_searches() :
+    mp = _map(7, 4)
+    astar = Astar(mp)
+    goals = [view_poses(mp, o)[0] for o in mp.obstacles]
+    many = astar.search_many(START, goals)
+    for end, path in zip(goals, many) :
+        single = astar.search(START, end)
+        assert bool(path) == bool(single)
+        if path :
+            assert path[-1].g == pytest.approx(single[-1].g)
+            assert Astar.in_goal(path[-1].c_pos, end, *Astar.bounds(end))
+
+
+def test_search_many_group_is_the_cheapest_member() :
+    mp = _map(7, 4)
+    astar = Astar(mp)
+    views = view_poses(mp, mp.obstacles[0])
+    path, = astar.search_many(START, [views])
+    costs = [p[-1].g for p in (astar.search(START, v) for v in views) if p]
+    assert path[-1].g == pytest.approx(min(costs))
+    assert Astar.goals_index(path[-1].c_pos, views) is not None
+
+
+# the compact core pops the same entries in the same order : same paths, costs and expansions
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("heuristic", Astar.HEURISTICS)
+def test_compact_core_matches_object_core(lazy, heuristic) :
+    mp = _map(0, 6)
+    views = [view_poses(mp, o)[0] for o in mp.obstacles]
+    for start in (START, views[0]) :
+        for end in views[1:4] :
+            plain, compact = Astar(mp, heuristic=heuristic, lazy=lazy), CompactAstar(mp, heuristic=heuristic, lazy=lazy)
+            expected, path = plain.search(start, end), compact.search(start, end)
+            assert [(n.c_pos.getPositionTuple(), n.g, n.h, n.v, n.s, n.d) for n in path] == \
+                   [(n.c_pos.getPositionTuple(), n.g, n.h, n.v, n.s, n.d) for n in expected]
+            assert compact.expanded == plain.expanded
+
+
+# legs the bidirectional search used to stop early on, behind the forward search's cost
+@pytest.mark.parametrize("seed, r, c", [(3, 0, 1), (3, 3, 1), (5, 0, 1), (5, 0, 3)])
+def test_bidirectional_is_as_cheap_as_forward(seed, r, c) :
+    sc = generate(seed, 4)
+    mp = Map(sc.obstacles())
+    pos = [sc.start] + [view_poses(mp, o)[0] for o in mp.obstacles]
+    astar = Astar(mp)
+    forward = astar.search(pos[r], pos[c])
+    both = astar.search(pos[r], pos[c], bidirectional=True)
+    assert forward and both
+    assert astar.goal(both[-1].c_pos)
+    assert both[-1].f <= forward[-1].f + 1e-6
+
+
+# lazy collision checking expands the nodes eager checking does, it only checks them later : the same costs
+@pytest.mark.parametrize("seed", [0, 3, 5])
+def test_lazy_costs_match_eager(seed) :
+    mp = _map(seed, 5)
+    pos = [START] + [view_poses(mp, o)[0] for o in mp.obstacles]
+    eager, lazy = Astar(mp), Astar(mp, lazy=True)
+    for start in pos[:2] :
+        for end in pos[1:] :
+            if end is start :
+                continue
+            expected, path = eager.search(start, end), lazy.search(start, end)
+            assert lazy.expanded == eager.expanded
+            assert bool(path) == bool(expected)
+            if path :
+                assert path[-1].f == pytest.approx(expected[-1].f)
+                assert not any(eager.edge_collides(node) for node in path)
+        groups = [view_poses(mp, o) for o in mp.obstacles]
+        expected_paths, paths = eager.search_many(start, groups), lazy.search_many(start, groups)
+        assert lazy.expanded == eager.expanded
+        for expected, path in zip(expected_paths, paths) :
+            assert bool(path) == bool(expected)
+            if path :
+                assert path[-1].f == pytest.approx(expected[-1].f)
+
+
+# the collision memo starts over once full, searches come out the same
+def test_collision_memo_is_bounded(monkeypatch) :
+    mp = _map()
+    end = view_poses(mp, mp.obstacles[0])[0]
+    expected = Astar(mp).search(START, end)
+    monkeypatch.setattr("Path_Algo.Astar.COLLISION_MEMO", 500)
+    astar = Astar(mp)
+    for lazy in (False, True) :
+        astar.lazy = lazy
+        path = astar.search(START, end)
+        assert len(astar.collisions) <= 500
+        assert [n.c_pos.getPositionTuple() for n in path] == [n.c_pos.getPositionTuple() for n in expected]
+
+
+# a goal straight ahead is shot at the first expansion, one forward run into the goal bounds
+def test_goal_shot_drives_straight_into_the_goal() :
+    astar = Astar(Map([]), analytic=1)
+    path = astar.search(START, Position(5, 105, pi/2))
+    assert astar.expanded == 1
+    assert {(node.v, node.s) for node in path[1:]} == {(1, 0)}
+    assert astar.goal(path[-1].c_pos)
+
+
+# a blocked shot is not taken, the search goes on around the obstacle
+def test_goal_shot_through_an_obstacle_is_rejected() :
+    astar = Astar(Map([Obstacle(10, 60, Direction.SOUTH)]), analytic=1)
+    path = astar.search(START, Position(5, 105, pi/2))
+    assert path and astar.expanded > 1
+    assert not any(astar.edge_collides(node) for node in path)
+
+
+# goal shots end the search early : free legs into the goal, never cheaper than the optimum and without a bound
+def test_goal_shot_legs_are_free_but_not_optimal() :
+    mp = _map()
+    for o in mp.obstacles :
+        end = view_poses(mp, o)[0]
+        astar = Astar(mp, analytic=10)
+        path, fresh = astar.search(START, end), Astar(mp).search(START, end)
+        assert astar.goal(path[-1].c_pos)
+        assert not any(astar.edge_collides(node) for node in path)
+        assert path[-1].g >= fresh[-1].g - 1e-9
+    bounds = [bound for _, bound in astar.search_anytime(START, end)]
+    assert bounds and all(bound == float('inf') for bound in bounds)
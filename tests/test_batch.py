@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Path_Algo import Batch
+
+
+def _write_layouts(path, seeds, n : int = 2) :
+    records = []
+    for seed in seeds :
+        sc = generate(seed, n)
+        records.append({"id": f"run-{seed}", "start": list(sc.start.getPositionTuple()),
+                        "obstacles": [[x, y, facing.name] for x, y, facing in sc.layout]})
+    path.write_text(''.join(json.dumps(r) + '\n' for r in records))
+    return records
+
+
+def test_read_layouts_formats(tmp_path) :
+    lines = tmp_path / "layouts.jsonl"
+    records = _write_layouts(lines, [1, 2])
+    as_list = tmp_path / "layouts.json"
+    as_list.write_text(json.dumps([{k: v for k, v in r.items() if k != "id"} for r in records]))
+    bench = tmp_path / "bench.json"
+    bench.write_text(json.dumps({"scenarios": records}))
+
+    assert [layout.id for layout in Batch.read_layouts(str(lines))] == ["run-1", "run-2"]
+    assert [layout.id for layout in Batch.read_layouts(str(as_list))] == ["0", "1"]
+    assert [layout.layout for layout in Batch.read_layouts(str(bench))] == \
+           [layout.layout for layout in Batch.read_layouts(str(lines))]
+
+    lines.write_text(lines.read_text() + json.dumps(records[0]) + '\n')
+    with pytest.raises(ValueError, match="not unique") :
+        Batch.read_layouts(str(lines))
+
+
+def test_finished_drops_an_incomplete_record(tmp_path) :
+    out = tmp_path / "out.jsonl"
+    assert Batch.finished(str(out)) == set()
+    out.write_text('{"id": "a"}\n{"id": "b"}\n{"id": "c", "ord')
+    assert Batch.finished(str(out)) == {"a", "b"}
+    assert out.read_text() == '{"id": "a"}\n{"id": "b"}\n'
+
+
+def test_finished_ends_the_last_record(tmp_path) :
+    out = tmp_path / "out.jsonl"
+    out.write_text('{"id": "a"}\n{"id": "b"}')
+    assert Batch.finished(str(out)) == {"a", "b"}
+    assert out.read_text() == '{"id": "a"}\n{"id": "b"}\n'
+
+
+# an interrupted run picks up where it stopped, no layout is planned twice
+def test_run_resumes(tmp_path) :
+    layouts = tmp_path / "layouts.jsonl"
+    _write_layouts(layouts, [1, 2, 3])
+    out = tmp_path / "out.jsonl"
+    todo = Batch.read_layouts(str(layouts))
+    with Batch.BatchPlanner("knn") as batch :
+        assert batch.run(todo[:2], str(out)) == 2
+        text = out.read_text()
+        out.write_text(text[:len(text) - 10]) # cut short while writing the second record
+        assert batch.run(todo, str(out)) == 2
+        assert batch.run(todo, str(out)) == 0
+    results = list(Batch.iter_results(str(out)))
+    assert sorted(r["id"] for r in results) == ["run-1", "run-2", "run-3"]
+    for r in results :
+        assert r["unreachable"] == 0 and r["timed_out"] is None
+        assert len(r["commands"]) == 2 and all(r["commands"])
+
+
+# legs the budget left weighted are counted apart from the unreachable ones
+def test_budget_timeouts_are_not_unreachable(tmp_path) :
+    layouts = tmp_path / "layouts.jsonl"
+    _write_layouts(layouts, [3])
+    layout, = Batch.read_layouts(str(layouts))
+    with Batch.BatchPlanner("exhaustive", workers=2, budget=0.0) as batch :
+        rushed = batch.plan(layout)
+    with Batch.BatchPlanner("exhaustive", workers=2) as batch :
+        exact = batch.plan(layout)
+    assert rushed["unreachable"] == exact["unreachable"] == 0
+    assert rushed["timed_out"] == 2 and rushed["bound"] > 1.0
+    assert exact["timed_out"] == 0 and exact["bound"] == 1.0
+    assert exact["cost"] <= rushed["cost"] + 1e-6
+
+
+# the workers plan each layout as this process would, the legs they search end up in the batch cache
+@pytest.mark.parametrize("planner", ["exhaustive", "knn"])
+def test_workers_plan_like_this_process(tmp_path, planner) :
+    layouts = tmp_path / "layouts.jsonl"
+    _write_layouts(layouts, [0, 1, 2])
+    todo = Batch.read_layouts(str(layouts))
+    out = tmp_path / "out.jsonl"
+    with Batch.BatchPlanner(planner, workers=2) as batch :
+        assert batch.run(todo, str(out)) == 3
+        assert len(batch.cache) > 0
+    results = {r["id"]: r for r in Batch.iter_results(str(out))}
+    for layout in todo :
+        here = Batch.plan_layout(layout, planner)
+        there = results[layout.id]
+        assert there["order"] == here["order"] and there["commands"] == here["commands"]
+        assert there["cost"] == pytest.approx(here["cost"])
@@ -0,0 +1,95 @@
+from math import pi
+
+import numpy as np
+
+from Benchmarks.Scenarios import generate
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Astar import Astar, pack_path
+from Path_Algo.Cache import LegCache
+from Path_Algo.Hamiltonian import view_poses
+
+START = Position(5, 5, pi/2)
+END = Position(100, 150, 0)
+
+
+def _leg(cache : LegCache) -> Astar :
+    return Astar(Map(generate(2, 4).obstacles()), cache=cache)
+
+
+def test_lru_evicts_the_oldest() :
+    cache = LegCache(capacity=2)
+    for k in "abc" :
+        cache.put(k, 1.0, None)
+    assert "a" not in cache and len(cache) == 2
+    cache.get("b")
+    cache.put("d", 1.0, None)
+    assert "b" in cache and "c" not in cache
+
+
+def test_save_and_load(tmp_path) :
+    path = str(tmp_path / "legs.pkl")
+    cache = LegCache(path=path)
+    cache.put(("k",), 12.5, np.arange(8.0).reshape(1, 8))
+    cache.save()
+    loaded = LegCache(path=path)
+    cost, packed = loaded.get(("k",))
+    assert cost == 12.5 and np.array_equal(packed, np.arange(8.0).reshape(1, 8))
+
+
+def test_unreadable_file_is_ignored(tmp_path) :
+    path = tmp_path / "legs.pkl"
+    path.write_bytes(b"not a pickle")
+    assert len(LegCache(path=str(path))) == 0
+
+
+def test_key_holds_the_exact_start_and_the_mode() :
+    key = lambda start, mode=() : LegCache.key(start, END, "layout", "profile", mode)
+    assert key(START) != key(Position(6, 5, pi/2)) # the same snapped start
+    assert key(START) == key(Position(5, 5, pi/2 + 2*pi))
+    assert key(START, ("euclidean", False, False, 0)) != key(START, ("field", False, False, 0))
+
+
+def test_hit_from_another_start_is_dropped() :
+    cache = LegCache()
+    astar = _leg(None)
+    path = astar.search(START, END)
+    cache.put("k", path[-1].f, pack_path(path))
+    assert cache.get("k", Position(6, 5, pi/2)) is None
+    assert "k" not in cache
+
+
+def test_hit_matches_a_fresh_search() :
+    cache = LegCache()
+    astar = _leg(cache)
+    fresh = astar.search(START, END)
+    assert len(cache) == 1
+    hit = astar.search(START, END)
+    assert cache.hits == 1
+    assert [n.c_pos.getPositionTuple() for n in hit] == [n.c_pos.getPositionTuple() for n in fresh]
+    assert hit[-1].g == fresh[-1].g
+
+
+def test_only_exact_searches_are_cached() :
+    cache = LegCache()
+    astar = _leg(cache)
+    astar.search(START, END, bidirectional=True)
+    astar.weight = 2.0
+    astar.search_many(START, [END])
+    assert len(cache) == 0
+    astar.weight = 1.0
+    astar.search_many(START, [END])
+    assert len(cache) == 1
+
+
+# a goal shot ends the search early : its leg is never handed to a search that runs to the optimum
+def test_goal_shot_legs_are_not_cached() :
+    cache = LegCache()
+    mp = Map(generate(2, 4).obstacles())
+    end = view_poses(mp, mp.obstacles[3])[0]
+    shot = Astar(mp, analytic=10, cache=cache).search(START, end)
+    fresh = Astar(mp).search(START, end)
+    assert len(cache) == 0 and shot[-1].g > fresh[-1].g
+    astar = Astar(mp, cache=cache)
+    assert astar.search(START, end)[-1].g == fresh[-1].g
+    assert [(p[-1].g, bound) for p, bound in astar.search_anytime(START, end)] == [(fresh[-1].g, 1.0)]
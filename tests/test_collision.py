@@ -0,0 +1,53 @@
+import random
+
+from Benchmarks.Scenarios import generate
+from Commons.Constants import MAP_HEIGHT, MAP_WIDTH, SNAP_COORD
+from Commons.Enums import Direction, Movement
+from Commons.Types import Position
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Astar import Astar
+from Robot_Movements.Primitives import N_HEADINGS, heading_of
+
+
+def _poses(n : int, seed : int = 0) -> list :
+    rng = random.Random(seed)
+    return [Position(rng.randrange(0, int(MAP_WIDTH) + 1, SNAP_COORD), rng.randrange(0, int(MAP_HEIGHT) + 1, SNAP_COORD),
+                     heading_of(rng.randrange(N_HEADINGS))) for _ in range(n)]
+
+
+# the vectorised swept-path check agrees with the waypoint loop on every movement
+def test_batch_matches_scalar_collision() :
+    mp = Map(generate(1, 6).obstacles())
+    batch, scalar = Astar(mp, batch=True), Astar(mp, batch=False)
+    hits = 0
+    for pos in _poses(400) :
+        if not mp.is_valid(pos) :
+            continue
+        for mv in Movement :
+            expected = scalar.has_collision(pos, mv)
+            assert batch.has_collision(pos, mv) == expected, (pos.getPositionTuple(), mv)
+            hits += expected
+    assert hits # the layout is tight enough to exercise both answers
+
+
+def test_empty_map_collides_only_with_walls() :
+    astar = Astar(Map([]))
+    assert not astar.has_collision(Position(100, 100, heading_of(6)), Movement.FWD_RIGHT)
+    assert astar.has_collision(Position(0, 0, heading_of(18)), Movement.FWD)
+
+
+# the swept-box filter only drops obstacles the move cannot touch
+def test_priority_obs_keeps_every_obstacle_in_reach() :
+    mp = Map([Obstacle(x, y, Direction.NORTH) for x in range(20, 200, 40) for y in range(20, 200, 40)])
+    astar = Astar(mp)
+    dropped = 0
+    turns = (Movement.FWD_LEFT, Movement.FWD_RIGHT, Movement.BWD_LEFT, Movement.BWD_RIGHT) # the widest sweeps
+    for pos in _poses(300, 1) :
+        for mv in turns :
+            near = mp.priority_obs(pos, mv)
+            assert set(near) <= set(mp.obstacles)
+            dropped += len(mp.obstacles) - len(near)
+            assert astar.has_collision_batch(pos, mv, near) == astar.has_collision_batch(pos, mv, mp.obstacles), \
+                (pos.getPositionTuple(), mv)
+    assert dropped
@@ -0,0 +1,55 @@
+import random
+from math import pi
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Enums import Movement
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Astar import Astar, Node
+from Robot_Movements.Commands import Command, compile_moves, compile_path, decode, encode, expand, max_count, path_moves
+
+
+def test_runs_merge_and_changes_split() :
+    moves = [Movement.FWD] * 4 + [Movement.FWD_LEFT] * 2 + [Movement.BWD] + [Movement.FWD]
+    assert compile_moves(moves) == [Command(Movement.FWD, 4), Command(Movement.FWD_LEFT, 2),
+                                    Command(Movement.BWD, 1), Command(Movement.FWD, 1)]
+
+
+def test_long_runs_split_at_the_argument_width() :
+    n = max_count(Movement.FWD)
+    commands = compile_moves([Movement.FWD] * (n + 3))
+    assert [c.count for c in commands] == [n, 3]
+    assert all(len(c.encode()) == 5 for c in commands)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip(seed) :
+    rng = random.Random(seed)
+    moves = [rng.choice(list(Movement)) for _ in range(rng.randint(1, 60))]
+    commands = compile_moves(moves)
+    assert expand(commands) == moves
+    assert decode(encode(commands)) == commands
+    assert decode(encode(commands, sep=""), sep=None) == commands
+
+
+def test_compiled_path_replays_the_search() :
+    mp = Map(generate(3, 2).obstacles())
+    astar = Astar(mp)
+    start = Position(5, 5, pi/2)
+    path = astar.search(start, mp.obstacles[0].to_pos())
+    assert path
+    commands = compile_path(path)
+    assert len(commands) < len(path) - 1
+    assert expand(commands) == path_moves(path)
+    # driving the commands ends where the search did, at the same cost
+    last = astar.drive(Node(start.snap(), start, 0, 0, None), expand(commands))
+    assert last is not None and astar.goal(last.c_pos)
+    assert last.g == pytest.approx(path[-1].g)
+
+
+@pytest.mark.parametrize("token", ["XX010", "FW007", "FL045", "FW000"])
+def test_decode_rejects_bad_commands(token) :
+    with pytest.raises(ValueError) :
+        decode(token)
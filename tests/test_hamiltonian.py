@@ -0,0 +1,114 @@
+import itertools
+import random
+import time
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Astar import Astar
+from Path_Algo.Hamiltonian import ExhaustiveSearch, PlannerPool, held_karp, permutate
+
+
+def _edges(n : int, seed : int) -> list :
+    rng = random.Random(seed)
+    return [[0.0 if r == c else rng.uniform(1, 100) for c in range(n)] for r in range(n)]
+
+
+def _brute_force(edges : list) -> list :
+    n = len(edges)
+    return sorted((sum(edges[p[i]][p[i+1]] for i in range(n - 1)), p) for p in permutate(n, True))
+
+
+@pytest.mark.parametrize("n", range(1, 8))
+def test_held_karp_matches_brute_force(n) :
+    edges = _edges(n, n)
+    cost, perm = held_karp(edges)[0]
+    assert cost == pytest.approx(_brute_force(edges)[0][0])
+    assert perm[0] == 0 and sorted(perm) == list(range(n))
+    assert cost == pytest.approx(sum(edges[perm[i]][perm[i+1]] for i in range(n - 1)))
+
+
+@pytest.mark.parametrize("top_k", [1, 3, 10])
+def test_held_karp_top_k(top_k) :
+    edges = _edges(6, 11)
+    expected = _brute_force(edges)[:top_k]
+    result = held_karp(edges, top_k)
+    assert [c for c, _ in result] == pytest.approx([c for c, _ in expected])
+    assert len({tuple(p) for _, p in result}) == top_k
+
+
+def test_held_karp_asymmetric_edges() :
+    # the cheap direction only exists one way round
+    edges = [[0, 1, 50], [50, 0, 1], [1, 50, 0]]
+    assert held_karp(edges) == [(2, [0, 1, 2])]
+
+
+def test_permutate_from_zero() :
+    assert permutate(4, True) == [list(p) for p in itertools.permutations(range(4)) if p[0] == 0]
+    assert permutate(0, True) == [] and permutate(0, False) == [[]]
+
+
+def _exact_edges(search : ExhaustiveSearch) -> list :
+    astar = Astar(search.map)
+    n = len(search.pos)
+    paths = [[astar.search_any(search.pos[r], search.views[c]) if r != c else None for c in range(n)] for r in range(n)]
+    return [[path[-1].f if path else None for path in row] for row in paths]
+
+
+def test_deadline_matrix_misses_no_leg() :
+    sc = generate(3, 2)
+    with PlannerPool(2) as pool :
+        search = ExhaustiveSearch(Map(sc.obstacles()), sc.start, pool=pool)
+        exact = _exact_edges(search)
+        edges, legs = search.edge_matrix(deadline=time.time(), weight=2.0)
+        # no time to refine : every leg at weight 2, reported as such
+        assert search.bound == 2.0
+        pairs = [(r, c) for r in range(3) for c in range(3) if r != c]
+        assert sorted(search.timed_out) == pairs
+        for r, c in pairs :
+            assert legs[r][c] is not None
+            assert exact[r][c] <= edges[r][c] <= 2.0 * exact[r][c] + 1e-6
+
+        search = ExhaustiveSearch(Map(sc.obstacles()), sc.start, pool=pool)
+        order, route = search.search(deadline=time.time())
+        assert sorted(order) == [0, 1, 2] and len(route) == 2 and all(route)
+
+
+def test_deadline_matrix_refines_to_exact() :
+    sc = generate(3, 2)
+    with PlannerPool(2) as pool :
+        search = ExhaustiveSearch(Map(sc.obstacles()), sc.start, pool=pool)
+        edges, _ = search.edge_matrix(deadline=time.time() + 600, weight=2.0)
+    assert search.bound == 1.0 and search.timed_out == []
+    exact = _exact_edges(search)
+    for r in range(3) :
+        for c in range(3) :
+            if r != c :
+                assert edges[r][c] == pytest.approx(exact[r][c])
+
+
+
+def test_legs_from_another_view_are_planned_again(monkeypatch) :
+    sc = generate(0, 2)
+    with PlannerPool(2) as pool :
+        search = ExhaustiveSearch(Map(sc.obstacles()), sc.start, pool=pool)
+        _, legs = search.edge_matrix()
+    assert len(search.views[2]) > 1 and legs[2][1] is not None
+    replays = []
+    replay = search.astar.replay
+    monkeypatch.setattr(search.astar, "replay", lambda *args : replays.append(args) or replay(*args))
+
+    # in the bounds of the view the edge was priced from : the moves are replayed
+    base = search.views[2][0]
+    search.leg(Position(base.x, base.y, base.theta), 2, 1, legs)
+    assert len(replays) == 1
+
+    # at another view of the obstacle they mean nothing, the leg is searched from there
+    other = search.views[2][1]
+    assert Astar.goals_index(other, search.views[2]) == 1
+    segment = search.leg(other, 2, 1, legs)
+    assert len(replays) == 1
+    assert segment[0].c_pos.getPositionTuple() == other.getPositionTuple()
+    assert segment[-1].f == pytest.approx(Astar(search.map).search_any(other, search.views[1])[-1].f)
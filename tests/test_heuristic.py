@@ -0,0 +1,98 @@
+import threading
+from math import pi
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Enums import Direction
+from Commons.Types import Position
+from Commons.Utils import euclidean
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Astar import Astar
+from Path_Algo.Hamiltonian import view_poses
+from Path_Algo.Heuristic import HeuristicField, heuristic_field
+
+START = Position(5, 5, pi/2)
+
+
+# optimal path by uniform-cost search, the reference any admissible heuristic stays under. a leg costs
+# path[-1].f : what it took to reach the goal bounds plus how far from the goal pose it stopped
+def _uniform(mp : Map) -> Astar :
+    astar = Astar(mp)
+    astar.target_heuristic = lambda end : lambda pos : euclidean(pos, end) if astar.goal(pos) else 0
+    return astar
+
+
+def _optimal(mp : Map, start : Position, end : Position) -> list :
+    return _uniform(mp).search(start, end)
+
+
+def test_middle_of_the_robot_keeps_clear_of_the_walls() :
+    free = HeuristicField._free_cells(Map([]))
+    assert not free[0, 20] and not free[20, 0] and not free[40, 20]
+    assert free[20, 20]
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_field_never_overestimates(seed) :
+    mp = Map(generate(seed, 5).obstacles())
+    for o in mp.obstacles[:3] :
+        end = view_poses(mp, o)[0]
+        path = _optimal(mp, START, end)
+        if not path :
+            continue
+        field = heuristic_field(mp, end, Astar.bounds(end))
+        assert field(START) <= path[-1].f + 1e-6
+        for node in path :
+            assert field(node.c_pos) <= path[-1].f - node.g + 1e-6
+
+
+# a wall between start and goal : the field knows the way round it, a search without it floods the near side
+def test_field_expands_less_behind_a_wall() :
+    mp = Map([Obstacle(x, 70, Direction.SOUTH) for x in range(0, 140, 10)])
+    start, end = Position(10, 20, pi/2), Position(10, 120, pi)
+    field, uniform = Astar(mp, heuristic="field"), _uniform(mp)
+    path, expected = field.search(start, end), uniform.search(start, end)
+    assert path[-1].f == pytest.approx(expected[-1].f)
+    assert field.expanded < uniform.expanded / 2
+
+
+# every selectable heuristic stays under the optimal cost of benchmark legs, from the start and the views
+@pytest.mark.parametrize("heuristic", Astar.HEURISTICS)
+def test_heuristics_never_overestimate_a_leg(heuristic) :
+    mp = Map(generate(1, 5).obstacles())
+    views = [view_poses(mp, o)[0] for o in mp.obstacles]
+    astar = Astar(mp, heuristic=heuristic)
+    for start in [START] + views[:2] :
+        for end in views :
+            path = _optimal(mp, start, end)
+            if not path :
+                continue
+            astar.set_targets([end])
+            assert astar.heuristic(start) <= path[-1].f + 1e-6
+
+
+def test_curves_are_not_heuristics() :
+    with pytest.raises(ValueError) :
+        Astar(Map([]), heuristic="reeds_shepp").search(START, Position(100, 100, 0))
+
+
+# fields asked for from many threads at once : every thread gets the one field of its goal
+def test_fields_are_shared_between_threads() :
+    mp = Map(generate(1, 4).obstacles())
+    ends = [view_poses(mp, o)[0] for o in mp.obstacles]
+    got = [[] for _ in ends]
+    gate = threading.Barrier(6)
+
+    def look_up() :
+        gate.wait()
+        for i, end in enumerate(ends) :
+            got[i].append(heuristic_field(mp, end, Astar.bounds(end)))
+
+    threads = [threading.Thread(target=look_up) for _ in range(6)]
+    for t in threads :
+        t.start()
+    for t in threads :
+        t.join()
+    assert all(len(fields) == 6 and all(f is fields[0] for f in fields) for fields in got)
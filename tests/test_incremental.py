@@ -0,0 +1,58 @@
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Enums import Direction
+from Grid.Map import Map
+from Grid.Obstacles import Obstacle
+from Path_Algo.Hamiltonian import ExhaustiveSearch, PlannerPool
+from Path_Algo.Incremental import IncrementalPlanner
+
+
+@pytest.fixture(scope="module")
+def pool() :
+    with PlannerPool(2) as pool :
+        yield pool
+
+
+# the matrix a fresh planner searches on the same layout
+def _fresh(planner : IncrementalPlanner, pool : PlannerPool) -> list :
+    mp = Map([Obstacle(o.x, o.y, o.facing) for o in planner.map.obstacles])
+    edges, _ = ExhaustiveSearch(mp, planner.src, pool=pool).edge_matrix()
+    return edges
+
+
+def _assert_same(edges : list, fresh : list) :
+    assert len(edges) == len(fresh)
+    for row, expected in zip(edges, fresh) :
+        assert row == pytest.approx(expected)
+
+
+def test_repairs_match_a_fresh_matrix(pool) :
+    sc = generate(3, 2)
+    planner = IncrementalPlanner(Map(sc.obstacles()), sc.start, pool=pool)
+    planner.edge_matrix()
+    assert not planner.dirty
+
+    added = Obstacle(60, 120, Direction.NORTH)
+    planner.add_obstacle(added)
+    assert planner.dirty
+    edges, _ = planner.edge_matrix()
+    _assert_same(edges, _fresh(planner, pool))
+
+    # only the legs to and from the turned obstacle are searched again
+    planner.set_facing(added, Direction.EAST)
+    assert all(3 in pair for pair in planner.dirty)
+    edges, _ = planner.edge_matrix()
+    _assert_same(edges, _fresh(planner, pool))
+
+
+def test_removal_restores_the_original_matrix(pool) :
+    sc = generate(3, 2)
+    planner = IncrementalPlanner(Map(sc.obstacles()), sc.start, pool=pool)
+    before = [row[:] for row in planner.edge_matrix()[0]]
+    added = Obstacle(60, 120, Direction.NORTH)
+    planner.add_obstacle(added)
+    planner.edge_matrix()
+    planner.remove_obstacle(added)
+    edges, _ = planner.edge_matrix()
+    _assert_same(edges, before)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Constants import SNAP_COORD
+from Commons.Enums import Direction
+from Commons.Types import Position
+from Grid.Map import NX, NY, Map, _hits_obstacle, _in_bounds
+from Grid.Obstacles import Obstacle
+from Robot_Movements.Primitives import N_HEADINGS, heading_of
+
+
+def _layout() -> list :
+    return generate(3, 5).obstacles()
+
+
+# the grid answers like the geometric test of the continuous pose
+def test_grid_matches_geometry() :
+    obstacles = _layout()
+    mp = Map(obstacles)
+    for ti in range(N_HEADINGS) :
+        theta = heading_of(ti)
+        for xi in range(NX) :
+            for yi in range(NY) :
+                x, y = xi * SNAP_COORD, yi * SNAP_COORD
+                expected = _in_bounds(x, y, theta) and not any(_hits_obstacle(x, y, theta, *o.middle) for o in obstacles)
+                assert mp.is_free(xi, yi, ti) == expected, (x, y, theta)
+
+
+def test_off_lattice_poses_use_geometry() :
+    obstacles = _layout()
+    mp = Map(obstacles)
+    for x, y, theta in ((52.5, 71.3, 0.3), (101.1, 33.3, 2.0), (150.7, 150.2, 4.1)) :
+        expected = _in_bounds(x, y, theta) and not any(_hits_obstacle(x, y, theta, *o.middle) for o in obstacles)
+        assert mp.is_valid(Position(x, y, theta)) == expected
+
+
+# the layer of a heading answers like is_free, and cannot be written through
+def test_free_layer_is_a_read_only_view() :
+    mp = Map(_layout())
+    for ti in (0, 5, N_HEADINGS - 1) :
+        layer = mp.free_layer(ti)
+        assert layer.shape == (NX, NY)
+        assert all(bool(layer[xi, yi]) == mp.is_free(xi, yi, ti) for xi in range(0, NX, 7) for yi in range(0, NY, 7))
+        with pytest.raises(ValueError) :
+            layer[0, 0] = True
+
+
+# a clear lattice pose vouches for every pose within half a step of it, the geometry agrees everywhere
+def test_off_lattice_lookups_match_geometry() :
+    obstacles = _layout()
+    mp = Map(obstacles)
+    rng = np.random.default_rng(0)
+    hits = 0
+    for x, y, theta in zip(rng.uniform(-5, 205, 20000), rng.uniform(-5, 205, 20000), rng.uniform(0, 2*np.pi, 20000)) :
+        expected = _in_bounds(x, y, theta) and not any(_hits_obstacle(x, y, theta, *o.middle) for o in obstacles)
+        assert mp.is_valid(Position(x, y, theta)) == expected, (x, y, theta)
+        xi, yi = round(x / SNAP_COORD), round(y / SNAP_COORD)
+        ti = round(theta / (2*np.pi) * N_HEADINGS) % N_HEADINGS
+        hits += 0 <= xi < NX and 0 <= yi < NY and bool(mp._clear[ti, xi, yi])
+    assert hits > 20000 / 5
+
+
+def test_remove_obstacle_restores_grid() :
+    obstacles = _layout()
+    mp = Map(obstacles)
+    version = mp.version
+    extra = Obstacle(100, 100, Direction.NORTH)
+    mp.add_obstacle(extra)
+    assert mp.version > version
+    mp.remove_obstacle(extra)
+    fresh = Map(obstacles)
+    assert np.array_equal(mp._free, fresh._free)
+    assert np.array_equal(mp._clear, fresh._clear)
+    assert mp.layout_hash() == fresh.layout_hash()
+
+
+def test_layout_hash_ignores_order() :
+    obstacles = _layout()
+    assert Map(obstacles).layout_hash() == Map(obstacles[::-1]).layout_hash()
+    assert Map(obstacles).layout_hash() != Map(obstacles[1:]).layout_hash()
+
+
+def test_outside_the_grid_is_blocked() :
+    mp = Map([])
+    assert not mp.is_free(-1, 0, 0)
+    assert not mp.is_free(NX, 0, 0)
+    assert mp.is_valid(Position(50, 50, heading_of(6)))
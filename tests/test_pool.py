@@ -0,0 +1,71 @@
+from math import pi
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Astar import Astar, unpack_path
+from Path_Algo.Hamiltonian import PlannerPool, PlanningCancelled, view_poses
+
+
+@pytest.fixture(scope="module")
+def pool() :
+    with PlannerPool(2) as pool :
+        yield pool
+
+
+def _legs(mp : Map) -> tuple :
+    views = [[Position(5, 5, pi/2)]] + [view_poses(mp, o) for o in mp.obstacles]
+    return [v[0] for v in views], views
+
+
+def test_results_match_a_local_search(pool) :
+    mp = Map(generate(4, 3).obstacles())
+    pos, views = _legs(mp)
+    pool.set_map(mp)
+    pairs = [(0, 1), (0, 2), (1, 3), (2, 1)]
+    results = {(r, c): (f, packed) for r, c, f, packed in pool.run(pos, pairs, views=views)}
+    assert sorted(results) == sorted(pairs)
+    astar = Astar(mp)
+    for (r, c), (f, packed) in results.items() :
+        path = astar.search_any(pos[r], views[c])
+        assert (packed is None) == (not path)
+        if path :
+            assert f == pytest.approx(path[-1].f)
+            assert unpack_path(packed)[-1].g == pytest.approx(path[-1].g)
+    assert pool.stats.expanded > 0
+
+
+def test_set_map_versions_layouts(pool) :
+    first, second = Map(generate(5, 3).obstacles()), Map(generate(6, 3).obstacles())
+    pool.set_map(first)
+    version = pool.version
+    pool.set_map(first)
+    assert pool.version == version # same layout, nothing to publish
+    pool.set_map(second)
+    assert pool.version == version + 1
+    pos, views = _legs(second)
+    (_, _, f, packed), = pool.run(pos, [(0, 1)], views=views)
+    path = Astar(second).search_any(pos[0], views[1])
+    assert f == pytest.approx(path[-1].f if path else 99999)
+
+
+def test_close_stops_the_workers() :
+    pool = PlannerPool(2)
+    workers = list(pool.workers)
+    pool.close()
+    assert not any(p.is_alive() for p in workers)
+
+
+# a cancel made before the run is not lost, it stops every run until the pool is handed out again
+def test_cancel_holds_until_hand_out(pool) :
+    mp = Map(generate(4, 3).obstacles())
+    pos, views = _legs(mp)
+    pool.set_map(mp)
+    pool.cancel()
+    for _ in range(2) :
+        with pytest.raises(PlanningCancelled) :
+            next(pool.run(pos, [(0, 1)], views=views))
+    pool.hand_out()
+    assert [(r, c) for r, c, _, _ in pool.run(pos, [(0, 1)], views=views)] == [(0, 1)]
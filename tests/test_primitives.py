@@ -0,0 +1,53 @@
+from math import pi
+
+import pytest
+
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Astar import Astar, Node
+from Robot_Movements.Primitives import N_HEADINGS, build_table, heading_index, heading_of, primitive_table, profile, profile_key
+
+
+def _same_heading(a : float, b : float) -> bool :
+    return abs((a - b + pi) % (2*pi) - pi) < 1e-9
+
+
+@pytest.mark.parametrize("i", range(N_HEADINGS))
+def test_table_matches_movement_functions(i) :
+    astar = Astar(Map([]))
+    start = Position(100, 100, heading_of(i))
+    for p, (v, s, d, mv, f) in zip(primitive_table()[i], astar.moves) :
+        expected = f(start)
+        assert (p.v, p.s, p.move, p.cost) == (v, s, mv, d)
+        assert start.x + p.dx == pytest.approx(expected.x, abs=1e-9)
+        assert start.y + p.dy == pytest.approx(expected.y, abs=1e-9)
+        assert _same_heading(heading_of((i + p.dth) % N_HEADINGS), expected.theta)
+
+
+def test_heading_index_round_trip() :
+    for i in range(N_HEADINGS) :
+        assert heading_index(heading_of(i)) == i
+        assert heading_index(heading_of(i) + 2*pi) == i
+    assert heading_index(0.1) is None
+
+
+# a lattice pose expands through the table, with the same successors as the movement functions
+def test_expand_pushes_every_primitive() :
+    astar = Astar(Map([]))
+    astar.closed = set()
+    pushed = []
+    astar.push = lambda node, pos, mv, *rest : pushed.append((mv, pos))
+    start = Position(100, 100, heading_of(5))
+    astar.expand(Node(start, start, 0, 0, None))
+    assert [mv for mv, _ in pushed] == [mv for _, _, _, mv, _ in astar.moves]
+    for (mv, pos), (_, _, _, _, f) in zip(pushed, astar.moves) :
+        expected = f(start)
+        assert (pos.x, pos.y) == pytest.approx((expected.x, expected.y), abs=1e-9)
+        assert _same_heading(pos.theta, expected.theta)
+
+
+# the memoised key and table are the ones the profile gives
+def test_profile_key_and_table_are_memoised() :
+    assert profile_key() == profile_key(profile())
+    assert profile_key(profile()[:1]) != profile_key()
+    assert primitive_table() is primitive_table() is build_table(profile())
@@ -0,0 +1,25 @@
+from Benchmarks.Scenarios import START, _reachable, generate
+from Commons.Enums import Direction
+from Grid.Map import Map
+from Path_Algo.Astar import Astar
+from Path_Algo.Hamiltonian import view_poses
+
+
+def test_same_seed_same_layout() :
+    assert generate(3, 5).layout == generate(3, 5).layout
+    assert generate(3, 5).layout != generate(5, 5).layout
+
+
+def test_boxed_in_start_is_rejected() :
+    # the obstacle at (10, 50) sits right in front of the start, no move gets the robot out
+    layout = [(80, 50, Direction.SOUTH), (70, 140, Direction.NORTH), (190, 50, Direction.WEST),
+              (120, 110, Direction.NORTH), (10, 50, Direction.EAST)]
+    assert not _reachable(layout, START)
+
+
+def test_every_obstacle_is_reachable() :
+    for seed in (0, 1) :
+        sc = generate(seed, 5)
+        mp = sc.map()
+        paths = Astar(mp).search_many(sc.start, [view_poses(mp, o) for o in mp.obstacles])
+        assert all(paths)
@@ -0,0 +1,176 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Path_Algo.Server import PlanningServer, request
+from Robot_Movements.Commands import decode
+
+
+def _message(id : str, seed : int, n : int, planner : str = "knn", **extra) -> dict :
+    sc = generate(seed, n)
+    return {"id": id, "planner": planner, "start": list(sc.start.getPositionTuple()),
+            "obstacles": [[x, y, facing.name] for x, y, facing in sc.layout], **extra}
+
+
+@contextlib.asynccontextmanager
+async def _serving(path : str) :
+    server = PlanningServer(workers=2)
+    task = asyncio.create_task(server.serve(path))
+    try :
+        for _ in range(100) :
+            try :
+                _, writer = await asyncio.open_unix_connection(path)
+                writer.close()
+                break
+            except OSError :
+                await asyncio.sleep(0.05)
+        yield server
+    finally :
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError) :
+            await task
+        server.close()
+
+
+async def _replies(path : str, message : dict) -> list :
+    return [reply async for reply in request(message, path)]
+
+
+def _run(coroutine) :
+    return asyncio.run(asyncio.wait_for(coroutine, 300))
+
+
+def test_replies_stream_order_legs_then_done(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            return await _replies(path, _message("r1", 2, 3))
+
+    replies = _run(scenario())
+    assert all(r["id"] == "r1" for r in replies)
+    order, legs, done = replies[0], replies[1:-1], replies[-1]
+    assert order["order"][0] == 0 and sorted(order["order"]) == [0, 1, 2, 3]
+    assert [leg["leg"] for leg in legs] == [1, 2, 3]
+    for leg in legs :
+        assert leg["path"] and leg["cost"] > 0
+        assert decode(leg["commands"])
+    assert done["done"] is True and done["stats"] is None
+
+
+def test_exhaustive_reports_its_search_stats(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            return await _replies(path, _message("r1", 0, 2, "exhaustive"))
+
+    replies = _run(scenario())
+    assert len(replies) == 4
+    assert replies[-1]["done"] is True and replies[-1]["stats"]["expanded"] > 0
+
+
+def test_bad_requests_get_an_error(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            unknown = await _replies(path, _message("r1", 2, 3, "astar"))
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'not json\n')
+            await writer.drain()
+            garbled = json.loads(await reader.readline())
+            writer.close()
+            return unknown, garbled
+
+    unknown, garbled = _run(scenario())
+    assert unknown == [{"id": "r1", "error": unknown[0]["error"]}] and "astar" in unknown[0]["error"]
+    assert garbled["id"] is None and garbled["error"]
+
+
+# the same layout asked twice within the window is planned once for both
+def test_duplicates_share_one_run(tmp_path, monkeypatch) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) as server :
+            runs = []
+            run = server.run
+            monkeypatch.setattr(server, "run", lambda requests : runs.append(len(requests)) or run(requests))
+            a, b = await asyncio.gather(_replies(path, _message("a", 2, 3)), _replies(path, _message("b", 2, 3)))
+            return runs, a, b
+
+    runs, a, b = _run(scenario())
+    assert runs == [2]
+    assert [{k: v for k, v in r.items() if k not in ("id", "ms")} for r in a] == \
+           [{k: v for k, v in r.items() if k not in ("id", "ms")} for r in b]
+
+
+def test_newer_request_of_a_session_cancels_the_older(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            old = asyncio.create_task(_replies(path, _message("old", 0, 4, "exhaustive", session="robot")))
+            await asyncio.sleep(0.5)
+            new = await _replies(path, _message("new", 2, 3, session="robot"))
+            return await old, new
+
+    old, new = _run(scenario())
+    assert old[-1] == {"id": "old", "cancelled": True}
+    assert new[-1]["done"] is True
+
+
+def test_cancel_message(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            running = asyncio.create_task(_replies(path, _message("r1", 0, 4, "exhaustive")))
+            await asyncio.sleep(0.5)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write((json.dumps({"id": "r2", "cancel": "r1"}) + '\n').encode())
+            await writer.drain()
+            replies = await running
+            writer.close()
+            return replies
+
+    assert _run(scenario())[-1] == {"id": "r1", "cancelled": True}
+
+
+# runs of a batch go on together : a knn request is not held up behind an exhaustive one
+def test_knn_is_not_held_up_by_an_exhaustive_run(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            finished = []
+
+            async def client(message) :
+                replies = await _replies(path, message)
+                finished.append(message["id"])
+                return replies
+
+            slow, fast = await asyncio.gather(client(_message("slow", 0, 4, "exhaustive")), client(_message("fast", 2, 3)))
+            return finished, slow, fast
+
+    finished, slow, fast = _run(scenario())
+    assert finished == ["fast", "slow"]
+    assert slow[-1]["done"] is True and fast[-1]["done"] is True
+
+
+# exhaustive runs take turns on the pool, each gets its own order and legs
+def test_exhaustive_runs_share_the_pool(tmp_path) :
+    path = str(tmp_path / "planner.sock")
+
+    async def scenario() :
+        async with _serving(path) :
+            return await asyncio.gather(_replies(path, _message("a", 0, 2, "exhaustive")),
+                                        _replies(path, _message("b", 2, 2, "exhaustive")))
+
+    for replies in _run(scenario()) :
+        assert len(replies) == 4 and replies[-1]["done"] is True
+        assert all(leg["path"] for leg in replies[1:-1])
@@ -0,0 +1,84 @@
+import io
+from contextlib import contextmanager
+from math import pi
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Astar import Astar
+from Path_Algo.Hamiltonian import ExhaustiveSearch, PlannerPool
+from Path_Algo.Stats import SearchStats, trace_to
+
+START = Position(5, 5, pi/2)
+END = Position(100, 150, 0)
+
+
+def _stats(expanded : int, max_open : int, total : float) -> SearchStats :
+    stats = SearchStats()
+    stats.expanded, stats.generated, stats.collision_checks, stats.reopened = expanded, 2 * expanded, 3, 1
+    stats.max_open = max_open
+    stats.times.update(collision=total / 4, heuristic=total / 4, total=total)
+    return stats
+
+
+def test_merge_sums_counters_and_keeps_the_largest_open_set() :
+    merged = SearchStats.empty().merge(_stats(10, 7, 2.0)).merge(_stats(5, 9, 1.0))
+    assert merged.searches == 2
+    assert (merged.expanded, merged.generated, merged.collision_checks, merged.reopened) == (15, 30, 6, 2)
+    assert merged.max_open == 9
+    assert merged.times == pytest.approx({"collision": 0.75, "heuristic": 0.75, "total": 3.0})
+    assert merged.other == pytest.approx(1.5)
+
+
+def test_to_dict() :
+    d = _stats(10, 7, 2.0).to_dict()
+    assert d == pytest.approx({"searches": 1, "expanded": 10, "generated": 20, "collision_checks": 3, "reopened": 1,
+                               "max_open": 7, "collision_s": 0.5, "heuristic_s": 0.5, "total_s": 2.0, "other_s": 1.0})
+    assert SearchStats.empty().to_dict()["searches"] == 0
+
+
+def test_search_counts_its_work() :
+    astar = Astar(Map(generate(3, 2).obstacles()))
+    astar.timing = True
+    assert astar.search(START, END)
+    stats = astar.stats
+    assert stats.expanded > 0 and stats.generated >= stats.expanded and stats.collision_checks > 0
+    assert stats.max_open > 0
+    assert 0 < stats.times["collision"] < stats.times["total"]
+    assert stats.times["heuristic"] > 0
+    # a new search starts from fresh counters, without the timers once timing is off
+    astar.timing = False
+    astar.search(START, END)
+    assert astar.stats.expanded == stats.expanded
+    assert astar.stats.times["collision"] == 0
+
+
+def test_hooks_wrap_and_trace_the_search() :
+    astar = Astar(Map(generate(3, 2).obstacles()))
+    calls = []
+
+    @contextmanager
+    def wrap() :
+        calls.append("enter")
+        yield
+        calls.append("exit")
+
+    out = io.StringIO()
+    astar.wrap, astar.trace = wrap, trace_to(out)
+    astar.search(START, END)
+    assert calls == ["enter", "exit"]
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "x,y,theta,g,h"
+    assert len(lines) - 1 == astar.expanded
+
+
+def test_exhaustive_search_sums_the_workers() :
+    sc = generate(3, 2)
+    with PlannerPool(2) as pool :
+        search = ExhaustiveSearch(Map(sc.obstacles()), sc.start, pool=pool)
+        search.edge_matrix()
+        # one one-to-many search per row of the matrix
+        assert search.stats.searches == 3
+        assert search.stats.expanded == pool.stats.expanded > 0
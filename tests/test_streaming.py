@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+import pytest
+
+from Benchmarks.Scenarios import generate
+from Grid.Map import Map
+from Path_Algo.Hamiltonian import ExhaustiveSearch, PlannerPool, k_nearest_neighour, stream_nearest_neighbour
+from Path_Algo.Streaming import RouteStream
+
+TIMEOUT = 10
+
+
+# producer handing out the order, then one leg per release of the gate
+def _gated(order : list, legs : list, gate : threading.Semaphore, planned : list) :
+    yield order
+    for leg in legs :
+        assert gate.acquire(timeout=TIMEOUT)
+        planned.append(leg)
+        yield leg
+
+
+def test_order_comes_before_the_legs() :
+    gate, planned = threading.Semaphore(0), []
+    route = RouteStream(_gated([0, 2, 1], [["a"], ["b"]], gate, planned))
+    assert route.order == [0, 2, 1]
+    assert planned == [] and not route.done
+    gate.release()
+    legs = iter(route)
+    assert next(legs) == ["a"]
+    gate.release()
+    assert list(legs) == [["b"]]
+    route.thread.join(TIMEOUT)
+    assert route.done
+
+
+def test_async_iteration() :
+    gate, planned = threading.Semaphore(2), []
+    route = RouteStream(_gated([0, 1, 2], [["a"], []], gate, planned))
+
+    async def drive() :
+        order = await route.wait_order()
+        return order, [path async for path in route]
+
+    assert asyncio.run(drive()) == ([0, 1, 2], [["a"], []])
+
+
+def test_reading_past_the_end_ends_again() :
+    route = RouteStream(path for path in [[0, 1], ["a"]])
+    assert list(route) == [["a"]]
+    assert list(route) == []
+
+
+def test_close_stops_after_the_leg_in_progress() :
+    gate, planned = threading.Semaphore(0), []
+    with RouteStream(_gated([0, 1, 2, 3], [["a"], ["b"], ["c"]], gate, planned)) as route :
+        gate.release()
+        assert next(iter(route)) == ["a"]
+    gate.release(2)
+    route.thread.join(TIMEOUT)
+    assert route.done
+    # "b" was in progress when the stream closed, "c" is never planned
+    assert planned == [["a"], ["b"]]
+    assert list(route) == [["b"]]
+
+
+def test_producer_errors_reach_the_reader() :
+    def broken() :
+        yield [0, 1]
+        yield ["a"]
+        raise RuntimeError("planning failed")
+
+    route = RouteStream(broken())
+    assert route.order == [0, 1]
+    legs = iter(route)
+    assert next(legs) == ["a"]
+    with pytest.raises(RuntimeError, match="planning failed") :
+        next(legs)
+
+
+def test_an_error_before_the_order_is_raised_by_order() :
+    def broken() :
+        raise ValueError("no layout")
+        yield
+
+    with pytest.raises(ValueError, match="no layout") :
+        RouteStream(broken()).order
+
+
+def test_nearest_neighbour_stream_matches_the_list() :
+    sc = generate(2, 3)
+    mp = Map(sc.obstacles())
+    route = stream_nearest_neighbour(mp, sc.start)
+    assert route.order[0] == 0 and sorted(route.order) == list(range(4))
+    streamed = list(route)
+    legs = k_nearest_neighour(Map(sc.obstacles()), sc.start)
+    assert [p[-1].g if p else None for p in streamed] == pytest.approx([p[-1].g if p else None for p in legs])
+    assert all(a[-1].c_pos.getPositionTuple() == b[0].c_pos.getPositionTuple() for a, b in zip(streamed, streamed[1:]))
+
+
+# the stream drives the cheapest order, the legs search would plan for it
+def test_exhaustive_stream_matches_its_best_order() :
+    sc = generate(0, 2)
+    with PlannerPool(2) as pool :
+        search = ExhaustiveSearch(Map(sc.obstacles()), sc.start, pool=pool)
+        route = search.stream()
+        order = route.order
+        streamed = list(route)
+        edges, legs = search.edge_matrix()
+        perm, path = search.tour(edges, legs, top_n=1)
+    assert order == perm
+    assert [p[-1].g for p in streamed] == pytest.approx([p[-1].g for p in path])
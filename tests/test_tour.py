@@ -0,0 +1,91 @@
+import itertools
+import random
+import time
+from math import pi
+
+import pytest
+
+from Commons.Types import Position
+from Grid.Map import Map
+from Path_Algo.Hamiltonian import TourSearch, held_karp
+from Path_Algo.Tour import assignment_bound, double_bridge, insertion, optimise, or_opt, path_cost, two_opt
+
+
+# asymmetric edge matrix, or the distances between random points when symmetric
+def _edges(seed : int, n : int, symmetric : bool = False) -> list :
+    rng = random.Random(seed)
+    if symmetric :
+        pts = [(rng.uniform(0, 200), rng.uniform(0, 200)) for _ in range(n)]
+        return [[((a[0] - b[0])**2 + (a[1] - b[1])**2)**.5 for b in pts] for a in pts]
+    return [[0.0 if r == c else rng.uniform(1, 100) for c in range(n)] for r in range(n)]
+
+
+def _is_tour(perm : list, n : int) -> bool :
+    return perm[0] == 0 and sorted(perm) == list(range(n))
+
+
+CASES = [(seed, n, symmetric) for seed in range(6) for n in (3, 5, 7, 9) for symmetric in (False, True)]
+
+
+@pytest.mark.parametrize("seed, n, symmetric", CASES)
+def test_local_moves_never_make_the_tour_worse(seed, n, symmetric) :
+    edges = _edges(seed, n, symmetric)
+    perm = insertion(edges)
+    assert _is_tour(perm, n)
+    cost = path_cost(edges, perm)
+    for move in (two_opt, or_opt) :
+        move(edges, perm)
+        assert _is_tour(perm, n)
+        assert path_cost(edges, perm) <= cost + 1e-9
+        cost = path_cost(edges, perm)
+
+
+@pytest.mark.parametrize("seed, n, symmetric", CASES)
+def test_optimise_finds_the_held_karp_tour(seed, n, symmetric) :
+    edges = _edges(seed, n, symmetric)
+    best, _ = held_karp(edges)[0]
+    cost, perm = optimise(edges, time.time() + 0.1, seed)
+    assert _is_tour(perm, n)
+    assert cost == pytest.approx(path_cost(edges, perm))
+    assert cost == pytest.approx(best)
+
+
+@pytest.mark.parametrize("seed, n, symmetric", CASES)
+def test_assignment_bound_is_below_the_optimum(seed, n, symmetric) :
+    edges = _edges(seed, n, symmetric)
+    assert assignment_bound(edges) <= held_karp(edges)[0][0] + 1e-9
+
+
+# the Hungarian method against every assignment of successors, returning to 0 for free
+@pytest.mark.parametrize("seed", range(5))
+def test_assignment_bound_is_the_cheapest_assignment(seed) :
+    n = 6
+    edges = _edges(seed, n)
+    cheapest = min(sum(0.0 if j == 0 else edges[i][j] for i, j in enumerate(p))
+                   for p in itertools.permutations(range(n)) if all(i != j for i, j in enumerate(p)))
+    assert assignment_bound(edges) == pytest.approx(cheapest)
+
+
+def test_small_inputs() :
+    assert optimise([]) == (0, [])
+    assert optimise([[0.0]]) == (0, [0])
+    assert optimise([[0.0, 3.0], [1.0, 0.0]]) == (3.0, [0, 1])
+    assert assignment_bound([[0.0]]) == 0.0
+
+
+def test_double_bridge_keeps_node_zero_first() :
+    rng = random.Random(0)
+    perm = list(range(9))
+    for _ in range(20) :
+        kicked = double_bridge(perm, rng)
+        assert _is_tour(kicked, 9) and kicked != perm
+
+
+# past exact nodes the tour comes from optimise, with the assignment bound below it
+def test_tour_search_reports_its_gap() :
+    edges = _edges(1, 9)
+    search = TourSearch(Map([]), Position(5, 5, pi/2), budget=0.1, exact=4)
+    (cost, perm), = search.orders(edges)
+    assert cost == pytest.approx(held_karp(edges)[0][0])
+    assert search.lower_bound == pytest.approx(assignment_bound(edges))
+    assert 0 <= search.gap == pytest.approx(cost / search.lower_bound - 1)